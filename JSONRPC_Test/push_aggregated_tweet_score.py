@@ -4,7 +4,9 @@
 
 import os, sys, json
 from dotenv import load_dotenv
-from web3 import Web3
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scraper"))
+import rpc  # shared pooled JSON-RPC client (scraper/rpc.py)
 
 load_dotenv()
 
@@ -16,7 +18,7 @@ ABI_PATH          = "artifacts/MockFTSO.sol/MockTwitterFTSO.json"
 if not all([RPC_URL, PRIVATE_KEY, TWITTER_FTSO_ADDR]):
     sys.exit("❌ set FLARE_RPC_URL, FLARE_PRIVATE_KEY, TWITTER_FTSO_ADDR in .env")
 
-w3   = Web3(Web3.HTTPProvider(RPC_URL))
+w3   = rpc.get_web3("FLARE_RPC_URL")
 acct = w3.eth.account.from_key(PRIVATE_KEY)
 
 with open(ABI_PATH) as f:
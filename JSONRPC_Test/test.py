@@ -4,8 +4,10 @@ import sys
 import json
 import pandas as pd
 from dotenv import load_dotenv
-from web3 import Web3
-from web3.middleware import geth_poa_middleware
+from web3.middleware import ExtraDataToPOAMiddleware
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scraper"))
+import rpc  # shared pooled JSON-RPC client (scraper/rpc.py)
 
 load_dotenv()
 
@@ -20,9 +22,9 @@ if not all([RPC_URL, PRIVATE_KEY, CONTRACT_ADDR]):
     sys.exit("Missing RPC_URL, PRIVATE_KEY or COMPOSITE_CONTRACT in .env")
 
 # ─── Setup web3 + contract ────────────────────────────────────
-w3 = Web3(Web3.HTTPProvider(RPC_URL))
+w3 = rpc.get_web3("RPC_URL")
 # if you are on a PoA testnet:
-w3.middleware_onion.inject(geth_poa_middleware, layer=0)
+w3.middleware_onion.inject(ExtraDataToPOAMiddleware, layer=0)
 
 acct = w3.eth.account.from_key(PRIVATE_KEY)
 CONTRACT_ADDR = w3.to_checksum_address(CONTRACT_ADDR)
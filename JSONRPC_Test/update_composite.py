@@ -3,11 +3,17 @@
 #
 # Reads macro_proof.json, packs it into the exact IJsonApi.Proof tuple, calls
 # CompositeSentimentConsumer.updateComposite(...), then reads back lastComposite.
+# The update is only sent when the composite it would produce moved at least
+# PUBLISH_DEVIATION points from lastComposite, or PUBLISH_HEARTBEAT seconds
+# passed since the last update (scraper/publish_policy.py); --force sends anyway.
 
 import os, sys, json
-from web3 import Web3
 from dotenv import load_dotenv
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scraper"))
+import rpc  # shared pooled JSON-RPC client (scraper/rpc.py)
+from publish_policy import get_policy
+
 load_dotenv()
 
 RPC_URL             = os.getenv("FLARE_RPC_URL")
@@ -20,7 +26,7 @@ MACRO_PROOF_JSON    = "macro_proof.json"
 if not all([RPC_URL, PRIVATE_KEY, COMPOSITE_ADDR]):
     sys.exit("❌ set FLARE_RPC_URL, FLARE_PRIVATE_KEY and COMPOSITE_ADDR in .env")
 
-w3   = Web3(Web3.HTTPProvider(RPC_URL))
+w3   = rpc.get_web3("FLARE_RPC_URL")
 acct = w3.eth.account.from_key(PRIVATE_KEY)
 
 # --- load ABIs & init contracts ---
@@ -36,9 +42,11 @@ oracle_addr = comp.functions.twitterOracle().call()
 print("Composite.twitterOracle() →", oracle_addr)
 
 # if that matches your MockTwitterFTSO address, load it and read its score:
+tweet_score = None
 try:
     ftso = w3.eth.contract(address=oracle_addr, abi=ftso_abi)
-    print("Oracle tweetScore() →", ftso.functions.tweetScore().call())
+    tweet_score = ftso.functions.tweetScore().call()
+    print("Oracle tweetScore() →", tweet_score)
 except Exception as e:
     print("⚠️ Could not read tweetScore() from oracle:", e)
 
@@ -62,7 +70,7 @@ def send_raw_tx(to, data, gas=300_000, gas_price_gwei=25):
     print("→ mined in block", r.blockNumber)
     return r
 
-def update_composite():
+def update_composite(force=False):
     # 2) load the proof JSON
     proof = json.load(open(MACRO_PROOF_JSON))
 
@@ -72,6 +80,19 @@ def update_composite():
     macro_score   = int.from_bytes(encoded_bytes, "big")
     print("Decoded macro score  →", macro_score)
 
+    # 3b) deviation / heartbeat check: same weighting as the contract, in points
+    policy = get_policy()
+    feed = f"composite@{comp.address}"
+    policy.verify(feed, comp.functions.lastComposite().call() // 10**16)
+    composite = None
+    if tweet_score is not None:
+        composite = (tweet_score * 70 + macro_score * 30) // 100
+        publish, reason = policy.decide(feed, composite)
+        if not (publish or force):
+            print(f"⏭  composite would be {composite}: {reason}; not sending (--force to override)")
+            return None
+        print(f"Composite would be {composite}: {'forced' if force else reason}")
+
     # 4) build the IJsonApi.Proof tuple
     merkle_proof   = []
     att_type       = b"\x00" * 32
@@ -97,11 +118,13 @@ def update_composite():
     call_data = comp.encode_abi("updateComposite", [proof_arg])
 
     # 6) send it on-chain
-    send_raw_tx(comp.address, call_data)
+    receipt = send_raw_tx(comp.address, call_data)
 
     # 7) read back the on-chain composite
     last = comp.functions.lastComposite().call()
     print("→ lastComposite (1e18 scale) =", last)
+    policy.record(feed, last // 10**16, receipt.transactionHash.hex())
+    return receipt
 
 if __name__ == "__main__":
-    update_composite()
+    update_composite(force="--force" in sys.argv[1:])
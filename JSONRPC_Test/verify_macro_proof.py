@@ -1,7 +1,8 @@
 #!/usr/bin/env python3
 import os, sys, json
 from dotenv import load_dotenv
-from web3 import Web3
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scraper"))
+import rpc  # shared pooled JSON-RPC client (scraper/rpc.py)
 load_dotenv()
 
 RPC_URL              = os.getenv("RPC_URL")
@@ -15,7 +16,7 @@ if not os.path.exists(PROOF_PATH):
 if not RPC_URL or not JSONAPI_ADAPTER_ADDR:
     sys.exit("❌ set RPC_URL and JSONAPI_ADAPTER_ADDRESS in .env")
 
-w3 = Web3(Web3.HTTPProvider(RPC_URL))
+w3 = rpc.get_web3("RPC_URL")
 if not w3.is_connected():
     sys.exit("❌ cannot connect RPC")
 
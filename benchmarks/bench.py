@@ -0,0 +1,400 @@
+#!/usr/bin/env python3
+# bench.py
+#
+# Offline benchmarks for the scraper hot paths — no Twitter, OpenAI, Pinata or
+# RPC access needed. Run from the repo root:
+#
+#   python benchmarks/bench.py                          # everything available
+#   python benchmarks/bench.py --only columns,car       # a subset
+#   python benchmarks/bench.py --save-baseline          # record benchmarks/baseline.json
+#   python benchmarks/bench.py --baseline benchmarks/baseline.json   # compare
+#
+# Benchmarks whose dependencies are missing (Firefox/geckodriver, eth-tester,
+# langchain) are reported as skipped rather than failing the run.
+
+import os
+import sys
+import json
+import glob
+import time
+import random
+import tempfile
+import argparse
+import threading
+import functools
+import http.server
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+FIXTURES = Path(__file__).resolve().parent / "fixtures"
+sys.path.insert(0, str(ROOT / "scraper"))
+os.chdir(ROOT)
+
+DEFAULT_BASELINE = Path(__file__).resolve().parent / "baseline.json"
+
+
+class Skip(Exception):
+    pass
+
+
+def _clock(fn, *args, repeat=3, **kwargs):
+    """Best-of-`repeat` wall time of fn(*args) in seconds, plus its last result."""
+    best, result = None, None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn(*args, **kwargs)
+        dt = time.perf_counter() - t0
+        best = dt if best is None else min(best, dt)
+    return best, result
+
+
+# ─── tweet extraction (saved HTML → headless browser) ────────────────────────
+
+def _serve(directory):
+    handler = functools.partial(http.server.SimpleHTTPRequestHandler, directory=directory)
+    handler.log_message = lambda *a, **k: None
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def bench_extract(n_cards=100):
+    try:
+        from selenium import webdriver
+        from selenium.webdriver.firefox.options import Options
+        from selenium.webdriver.common.action_chains import ActionChains
+        from tweet import Tweet
+    except ImportError as e:
+        raise Skip(f"selenium not installed ({e})")
+
+    card = (FIXTURES / "tweet_card.html").read_text()
+    page = (FIXTURES / "timeline.html").read_text()
+    tmp = tempfile.mkdtemp()
+    cards = "\n".join(card.format(i=i, m=i % 60) for i in range(n_cards))
+    Path(tmp, "index.html").write_text(page.replace("{cards}", cards))
+    server = _serve(tmp)
+
+    opts = Options()
+    opts.add_argument("--headless")
+    try:
+        driver = webdriver.Firefox(options=opts)
+    except Exception as e:
+        server.shutdown()
+        raise Skip(f"no headless Firefox available ({type(e).__name__})")
+    try:
+        driver.get(f"http://127.0.0.1:{server.server_address[1]}/index.html")
+        actions = ActionChains(driver)
+        found = driver.find_elements("xpath", '//article[@data-testid="tweet" and not(@disabled)]')
+        t0 = time.perf_counter()
+        parsed = [Tweet(card=c, driver=driver, actions=actions) for c in found]
+        dt = time.perf_counter() - t0
+    finally:
+        driver.quit()
+        server.shutdown()
+    ok = sum(1 for t in parsed if t.record is not None)
+    if ok != n_cards:
+        raise RuntimeError(f"extracted {ok}/{n_cards} fixture tweets")
+    return {
+        "extract.tweets_per_s": (n_cards / dt, "tweets/s"),
+        "extract.ms_per_tweet": (dt / n_cards * 1000, "ms"),
+    }
+
+
+# ─── dataset column building ─────────────────────────────────────────────────
+
+def _fake_records(n, seed=0):
+    from record import TweetRecord
+    rng = random.Random(seed)
+    for i in range(n):
+        yield TweetRecord(
+            name=f"user{i}", handle=f"@user{i}", timestamp="2025-04-27T01:34:40.000Z",
+            verified=rng.random() < 0.2, content=f"$ETH to the moon #{i} " * 3,
+            comments=str(rng.randint(0, 99)), retweets=f"{rng.randint(1, 9)}.{rng.randint(0, 9)}K",
+            likes=str(rng.randint(0, 999)), analytics="3M", tags=["#ETH"], mentions=[],
+            profile_image="https://pbs.twimg.com/p.jpg",
+            tweet_link=f"https://x.com/u/status/{i}", tweet_id=str(i),
+            followers=f"{rng.randint(1, 99)}K",
+        )
+
+
+def bench_columns(sizes=(1_000, 10_000, 100_000)):
+    from record import TweetBuffer
+    out = {}
+    for n in sizes:
+        records = list(_fake_records(n))
+
+        def build():
+            buf = TweetBuffer()
+            for rec in records:
+                buf.append(rec)
+            return buf.to_frame()
+
+        dt, df = _clock(build, repeat=1 if n >= 100_000 else 3)
+        assert len(df) == n
+        out[f"columns.{n}.rows_per_s"] = (n / dt, "tweets/s")
+        out[f"columns.{n}.ms"] = (dt * 1000, "ms")
+    return out
+
+
+# ─── Merkle row commitment ───────────────────────────────────────────────────
+
+def bench_merkle(n=100_000):
+    from record import TweetBuffer
+    from merkle import MerkleTree, verify
+
+    buf = TweetBuffer()
+    for rec in _fake_records(n):
+        buf.append(rec)
+    df = buf.to_frame()
+    df["Deletion Likelihood"] = [i % 100 / 100 for i in range(n)]
+    dt, tree = _clock(MerkleTree.from_frame, df)
+    row = df.iloc[n // 2].to_dict()
+    t0 = time.perf_counter()
+    assert verify(row, tree.proof(n // 2), tree.root)
+    verify_dt = time.perf_counter() - t0
+    return {
+        "merkle.root_100k_ms": (dt * 1000, "ms"),
+        "merkle.rows_per_s": (n / dt, "rows/s"),
+        "merkle.prove_verify_us": (verify_dt * 1e6, "us"),
+    }
+
+
+# ─── CAR building over the sample dumps ──────────────────────────────────────
+
+def bench_car():
+    import car
+    paths = sorted(glob.glob("tweets/*.csv.car"))
+    if not paths:
+        raise Skip("no sample CARs in ./tweets")
+    payloads = []
+    for p in paths:
+        roots, blocks = car.read_car(p)
+        payloads.append((p, roots[0], car.file_bytes(roots[0], blocks)))
+    # a larger synthetic dump so multi-chunk DAG building is exercised too
+    big = b"".join(data for _, _, data in payloads) * 400
+
+    tmp = tempfile.mkdtemp()
+
+    def build_all():
+        total = 0
+        for i, (_, _, data) in enumerate(payloads + [("big", None, big)]):
+            root, blocks = car.build_file(car.fixed_chunks(data))
+            total += car.write_car(os.path.join(tmp, f"{i}.car"), [root], blocks)
+        return total
+
+    dt, total = _clock(build_all)
+
+    # the same big dump as size-capped shards built in a process pool
+    big_path = os.path.join(tmp, "big.csv")
+    with open(big_path, "wb") as f:
+        f.write(big)
+    shard_dt, (shard_root, shards) = _clock(
+        lambda: car.build_shards(big_path, shard_size=max(len(big) // 8, car.CHUNK_SIZE + 64)), repeat=1)
+    if shard_root != car.build_file(car.fixed_chunks(big))[0]:
+        raise RuntimeError("root CID mismatch between sharded and single CAR")
+
+    # a few rows out of the big CAR through the mmap + block index reader
+    from car_reader import CarReader
+
+    def read_head():
+        with CarReader(os.path.join(tmp, f"{len(payloads)}.car"), write_index=False) as reader:
+            return reader.read_frame(nrows=5)
+
+    head_dt, head = _clock(read_head)
+    assert len(head) == 5
+
+    for p, root, data in payloads:
+        rebuilt, _ = car.build_file(car.fixed_chunks(data))
+        if rebuilt != root:
+            raise RuntimeError(f"root CID mismatch rebuilding {p}")
+    return {
+        "car.mb_per_s": (total / dt / 1e6, "MB/s"),
+        "car.ms": (dt * 1000, "ms"),
+        "car.sharded_mb_per_s": (sum(size for *_, size in shards) / shard_dt / 1e6, "MB/s"),
+        "car.read_head_ms": (head_dt * 1000, "ms"),
+    }
+
+
+# ─── scoring through a stub LLM ──────────────────────────────────────────────
+
+class StubAgent:
+    """Stands in for the tool-bound chat model: fixed latency per request, canned submit_scores args."""
+
+    def __init__(self, latency):
+        self.latency = latency
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def invoke(self, messages):
+        with self._lock:
+            self.calls += 1
+        time.sleep(self.latency)
+        n = sum(1 for line in messages[-1][1].split("\n\n") if line.startswith("["))
+        return {"results": [{"i": i, "score": 0.42, "reason": "stub analysis"} for i in range(n)]}
+
+
+def bench_scoring(n=200, latency=0.02):
+    """The scraper's score stage: micro-batches of stage_batch("score") tweets → analyze_tweets → run_batched."""
+    try:
+        from ai_analysis import analyze_tweets
+    except ImportError as e:
+        raise Skip(f"LLM stack not importable ({e})")
+    from pipeline import Pipeline, stage_batch
+
+    agent = StubAgent(latency)
+    texts = [f"#TRUMP/USDT LONG signal #{i}" for i in range(n)]
+    scores = {}
+
+    def score(idxs):
+        for i, (s, _) in zip(idxs, analyze_tweets([texts[i] for i in idxs], agent_executor=agent)):
+            scores[i] = s
+        return idxs
+
+    p = Pipeline().add("score", score, batch=stage_batch("score")).start()
+    t0 = time.perf_counter()
+    for i in range(n):
+        p.put(i)
+    p.close()
+    dt = time.perf_counter() - t0
+    assert len(scores) == n and all(s == 0.42 for s in scores.values())
+    return {
+        "scoring.tweets_per_s": (n / dt, "tweets/s"),
+        "scoring.tweets_per_request": (n / agent.calls, "tweets"),
+        "scoring.stub_latency_ms": (latency * 1000, "ms"),
+    }
+
+
+def bench_local_scorer(n=20_000):
+    import numpy as np
+    from scorer import LocalScorer, CascadeScorer, load_history
+
+    texts, labels = load_history(["tweets", "example2.csv.car"])
+    model = LocalScorer().fit(texts, labels)
+    rng = random.Random(0)
+    words = [w for t in texts for w in t.split()]
+    batch = [" ".join(rng.choices(words, k=25)) for _ in range(n)]
+    t0 = time.perf_counter()
+    scores, conf = model.predict(batch)
+    dt = time.perf_counter() - t0
+    assert np.all((scores >= 0) & (scores <= 1))
+    cascade = CascadeScorer(model, None)
+    return {
+        "scorer.local_tweets_per_s": (n / dt, "tweets/s"),
+        "scorer.fallback_share_pct": (float((conf < cascade.min_confidence).mean() * 100), "%"),
+    }
+
+
+# ─── RPC paths against a local dev chain ─────────────────────────────────────
+
+def _dev_chain():
+    try:
+        from web3 import Web3, EthereumTesterProvider
+        w3 = Web3(EthereumTesterProvider())
+        w3.eth.block_number
+    except Exception as e:
+        raise Skip(f"eth-tester not available ({type(e).__name__}); pip install 'eth-tester[py-evm]'")
+    return w3
+
+
+def _deploy(w3, artifact, *args):
+    with open(artifact) as f:
+        art = json.load(f)
+    factory = w3.eth.contract(abi=art["abi"], bytecode=art["bytecode"])
+    txh = factory.constructor(*args).transact({"from": w3.eth.accounts[0]})
+    addr = w3.eth.wait_for_transaction_receipt(txh).contractAddress
+    return w3.eth.contract(address=addr, abi=art["abi"])
+
+
+def bench_rpc(n=50):
+    w3 = _dev_chain()
+    # eth-tester's first account is the key 0x…01
+    key = "0x" + "00" * 31 + "01"
+    acct = w3.eth.account.from_key(key)
+    ftso = _deploy(w3, "artifacts/MockFTSO.sol/MockTwitterFTSO.json", acct.address)
+    registry = _deploy(w3, "artifacts/AIDatasetRegistry.sol/AIDatasetRegistry.json")
+
+    import ftso_push
+    import store
+    # the modules build their clients lazily; hand them the dev-chain ones
+    ftso_push._client = (w3, acct, ftso)
+    store._chain = (w3, registry, acct.address, key)
+
+    t0 = time.perf_counter()
+    for i in range(n):
+        ftso_push.push_aggregated_score(i % 101)
+    push_dt = (time.perf_counter() - t0) / n
+    assert ftso.functions.tweetScore().call() == (n - 1) % 101
+
+    t0 = time.perf_counter()
+    for i in range(n):
+        store.register_on_chain(f"QmBench{i}", 1000 + i, 0, f"dump {i}", "bench", 0, "[]")
+    register_dt = (time.perf_counter() - t0) / n
+    assert registry.functions.getDatasetCount().call() == n
+    return {
+        "rpc.push_score_ms": (push_dt * 1000, "ms"),
+        "rpc.register_dataset_ms": (register_dt * 1000, "ms"),
+    }
+
+
+BENCHES = {
+    "extract": bench_extract,
+    "columns": bench_columns,
+    "car": bench_car,
+    "merkle": bench_merkle,
+    "scoring": bench_scoring,
+    "local_scorer": bench_local_scorer,
+    "rpc": bench_rpc,
+}
+
+
+def _report(results, baseline):
+    print(f"\n{'metric':<32}{'value':>14}  {'unit':<9}{'baseline':>14}{'change':>10}")
+    print("-" * 81)
+    for name, (value, unit) in results.items():
+        base = baseline.get(name, {}).get("value")
+        if base:
+            change = (value - base) / base * 100
+            # higher is better for rates, lower is better for latencies
+            better = change >= 0 if unit.endswith("/s") else change <= 0
+            mark = "✅" if better else "⚠️"
+            print(f"{name:<32}{value:>14.2f}  {unit:<9}{base:>14.2f}{change:>+9.1f}% {mark}")
+        else:
+            print(f"{name:<32}{value:>14.2f}  {unit:<9}{'—':>14}")
+
+
+def main():
+    p = argparse.ArgumentParser(description="Offline scraper benchmarks")
+    p.add_argument("--only", default=",".join(BENCHES), help="comma-separated: " + ",".join(BENCHES))
+    p.add_argument("--baseline", default=str(DEFAULT_BASELINE), help="JSON results to compare against")
+    p.add_argument("--save-baseline", action="store_true", help="write these results as the new baseline")
+    p.add_argument("--out", help="also write results JSON here")
+    args = p.parse_args()
+
+    results = {}
+    for name in [n.strip() for n in args.only.split(",") if n.strip()]:
+        if name not in BENCHES:
+            sys.exit(f"❌ Unknown benchmark {name!r}")
+        print(f"▶ {name} …", flush=True)
+        try:
+            results.update(BENCHES[name]())
+        except Skip as e:
+            print(f"  ⏭  skipped: {e}")
+
+    baseline = {}
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    _report(results, baseline)
+
+    payload = {k: {"value": v, "unit": u} for k, (v, u) in results.items()}
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(payload, f, indent=2)
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(payload, f, indent=2)
+        print(f"\n💾 Baseline saved to {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,8 +5,11 @@ import json
 import argparse
 from datetime import datetime
 from dotenv import load_dotenv
-from web3 import Web3
-from web3.exceptions import Web3RPCError
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "scraper"))
+import rpc  # shared pooled JSON-RPC client (scraper/rpc.py)
+import multicall
+from blocktime import BlockTimes
 
 load_dotenv()
 
@@ -17,7 +20,7 @@ ABI_PATH         = "artifacts/Governor.sol/TruthAnchorGovernor.json"
 if not all([RPC_URL, GOVERNOR_ADDRESS]):
     sys.exit("❌ Please set RPC_URL and GOVERNOR_ADDRESS in your .env")
 
-w3 = Web3(Web3.HTTPProvider(RPC_URL))
+w3 = rpc.get_web3("RPC_URL")
 if not w3.is_connected():
     sys.exit("❌ Cannot connect to RPC")
 
@@ -26,23 +29,23 @@ with open(ABI_PATH) as f:
     GOV_ABI = json.load(f)["abi"]
 gov = w3.eth.contract(address=GOVERNOR_ADDRESS, abi=GOV_ABI)
 
-def human_time(block_number):
-    try:
-        blk = w3.eth.get_block(block_number)
-        ts  = blk["timestamp"]
-        return datetime.utcfromtimestamp(ts).strftime("%Y-%m-%d %H:%M:%S UTC")
-    except Web3RPCError as e:
-        # Filecoin calibration RPC disallows very old lookbacks
-        return "N/A"
+def human_time(ts_exact):
+    # Filecoin calibration RPC disallows very old lookbacks: those blocks
+    # (and future ones) are estimated from cached block times, marked "~"
+    ts, exact = ts_exact
+    text = datetime.utcfromtimestamp(ts).strftime("%Y-%m-%d %H:%M:%S UTC")
+    return text if exact else f"~{text}"
 
 def check(proposal_id: int):
-    snap     = gov.functions.proposalSnapshot(proposal_id).call()
-    deadline = gov.functions.proposalDeadline(proposal_id).call()
-    current  = w3.eth.block_number
+    (snap, deadline), latest = multicall.read([gov.functions.proposalSnapshot(proposal_id),
+                                               gov.functions.proposalDeadline(proposal_id)],
+                                              latest_block=True)
+    current  = latest["number"]
+    when     = BlockTimes(w3).timestamps([snap, deadline], head=latest)
 
     print(f"Proposal #{proposal_id}")
-    print(f"  Snapshot (voting start) block:   {snap}  → {human_time(snap)}")
-    print(f"  Deadline (voting end) block:     {deadline}  → {human_time(deadline)}")
+    print(f"  Snapshot (voting start) block:   {snap}  → {human_time(when[snap])}")
+    print(f"  Deadline (voting end) block:     {deadline}  → {human_time(when[deadline])}")
     print(f"  Current block:                   {current}")
 
     if current < snap:
@@ -2,7 +2,11 @@
 import os
 import sys
 from dotenv import load_dotenv
-from web3 import Web3
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "scraper"))
+import rpc  # shared pooled JSON-RPC client (scraper/rpc.py)
+import multicall
+from blocktime import BlockTimes
 
 load_dotenv()
 
@@ -13,7 +17,7 @@ ABI_PATH         = "artifacts/Governor.sol/TruthAnchorGovernor.json"
 if not RPC_URL or not GOVERNOR_ADDRESS:
     sys.exit("❌ Please set RPC_URL and GOVERNOR_ADDRESS in your .env")
 
-w3 = Web3(Web3.HTTPProvider(RPC_URL))
+w3 = rpc.get_web3("RPC_URL")
 if not w3.is_connected():
     sys.exit("❌ Cannot connect to RPC")
 
@@ -22,23 +26,23 @@ with open(ABI_PATH) as f:
     ABI = __import__("json").load(f)["abi"]
 gov = w3.eth.contract(address=GOVERNOR_ADDRESS, abi=ABI)
 
-def human_timestamp(block_number):
-    try:
-        blk = w3.eth.get_block(block_number)
-        return f"{blk.timestamp} (unix) → { __import__('time').strftime('%Y-%m-%d %H:%M:%S', __import__('time').gmtime(blk.timestamp)) } UTC"
-    except Exception:
-        return "N/A"
+def human_timestamp(ts_exact):
+    ts, exact = ts_exact
+    text = f"{ts} (unix) → { __import__('time').strftime('%Y-%m-%d %H:%M:%S', __import__('time').gmtime(ts)) } UTC"
+    return text if exact else f"~{text} (estimated)"
 
 def main(proposal_id):
     prop = int(proposal_id)
-    snap = gov.functions.proposalSnapshot(prop).call()
-    dl   = gov.functions.proposalDeadline(prop).call()
-    current = w3.eth.block_number
+    # one round trip for both reads and the head block; timestamps from the block cache
+    (snap, dl), latest = multicall.read([gov.functions.proposalSnapshot(prop),
+                                         gov.functions.proposalDeadline(prop)], latest_block=True)
+    current = latest["number"]
+    when = BlockTimes(w3).timestamps([snap, dl, current], head=latest)
 
     print(f"Proposal #{prop}")
-    print(f"  Snapshot (voting starts) block: {snap}   → {human_timestamp(snap)}")
-    print(f"  Deadline (voting ends) block:  {dl}   → {human_timestamp(dl)}")
-    print(f"  Current block: {current}   → {human_timestamp(current)}\n")
+    print(f"  Snapshot (voting starts) block: {snap}   → {human_timestamp(when[snap])}")
+    print(f"  Deadline (voting ends) block:  {dl}   → {human_timestamp(when[dl])}")
+    print(f"  Current block: {current}   → {human_timestamp(when[current])}\n")
 
     if current < snap:
         print("🔒 Voting has not yet opened.")
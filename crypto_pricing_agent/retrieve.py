@@ -1,13 +1,29 @@
 # example test usage: python retrieve.py Qmhash...
+#                      python retrieve.py Qmhash... --columns Content "Deletion Likelihood"
+#                      python retrieve.py Qmhash... --rows 20 --columns Content
+#
+# --rows previews a dataset without downloading it: the file is read through
+# byte-range requests, preferring trustless ?format=car&dag-scope=entity
+# responses (every block verified against its CID) and falling back to plain
+# HTTP Range requests. CSV previews fetch the first page or two; Parquet and
+# Arrow fetch the footer plus the selected columns of the first row group.
 
+import io
+import os
 import sys
 import logging
 import requests
 import time
 import subprocess
 import shutil
+from collections import OrderedDict
 from pathlib import Path
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scraper"))
+import car  # noqa: E402
+import car_reader  # noqa: E402
+from dataset_io import detect_format, read_dataset  # noqa: E402
+
 logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
 
 GATEWAYS = [
@@ -47,21 +63,229 @@ def fetch_via_local(cid, output_path):
         logging.warning("Local ipfs CLI not found")
     return False
 
+# ─── partial retrieval ───────────────────────────────────────────────────────
+
+PAGE_SIZE = 256 * 1024  # bytes per range request; matches the UnixFS chunk size
+CACHE_PAGES = 16
+
+
+class CarRangeFetcher:
+    """
+    Byte ranges of a UnixFS file via a trustless gateway: each range is one
+    ?format=car&dag-scope=entity&entity-bytes=a:b request. Blocks are checked
+    against their CIDs and reassembled locally, so the gateway is not trusted.
+    """
+
+    def __init__(self, url, cid, timeout=60):
+        self.url = url
+        self.root = car.cid_from_str(cid)
+        self.timeout = timeout
+        self.parents = {}   # verified inner nodes, reused across ranges
+        self.fetched = 0
+
+    def _blocks(self, **params):
+        r = requests.get(self.url, params={"format": "car", **params}, timeout=self.timeout,
+                         headers={"Accept": "application/vnd.ipld.car"}, stream=True)
+        r.raise_for_status()
+        if not r.headers.get("Content-Type", "").startswith("application/vnd.ipld.car"):
+            # the gateway ignored format=car and is sending the file itself
+            r.close()
+            raise ValueError(f"{self.url} does not serve CAR responses")
+        self.fetched += len(r.content)
+        _, pos = car.read_header(r.content)
+        blocks = {}
+        for cid, block, _ in car.iter_blocks(r.content, pos):
+            if not car.verify_block(cid, block):
+                raise ValueError(f"Block {car.cid_to_str(cid)} does not match its CID")
+            blocks[cid] = block
+        return blocks
+
+    def size(self):
+        blocks = self._blocks(**{"dag-scope": "block"})
+        return car.node_size(self.root, blocks[self.root])
+
+    def __call__(self, start, end):
+        blocks = self._blocks(**{"dag-scope": "entity", "entity-bytes": f"{start}:{end - 1}"})
+        lookup = lambda cid: blocks[cid] if cid in blocks else self.parents[cid]  # noqa: E731
+        out = []
+        for cid, block, piece in car.walk_range(self.root, lookup, start, end):
+            if piece is None:
+                self.parents[cid] = block
+            else:
+                out.append(bytes(piece))
+        return b"".join(out)
+
+
+class HttpRangeFetcher:
+    """Byte ranges via plain `Range:` requests, for gateways without CAR responses."""
+
+    def __init__(self, url, timeout=60):
+        self.url = url
+        self.timeout = timeout
+        self.fetched = 0
+        self._size = None
+
+    def _get(self, start, end):
+        r = requests.get(self.url, headers={"Range": f"bytes={start}-{end - 1}"}, timeout=self.timeout)
+        if r.status_code != 206:
+            # a 200 here would be the whole file; stop instead of downloading it
+            r.close()
+            raise ValueError(f"{self.url} does not support range requests ({r.status_code})")
+        self.fetched += len(r.content)
+        self._size = int(r.headers["Content-Range"].rsplit("/", 1)[1])
+        return r.content
+
+    def size(self):
+        if self._size is None:
+            self._get(0, 1)
+        return self._size
+
+    def __call__(self, start, end):
+        return self._get(start, end)
+
+
+class RemoteFile(io.RawIOBase):
+    """Seekable read-only file over a range fetcher, with a small LRU of pages."""
+
+    def __init__(self, fetcher, page_size=PAGE_SIZE, cache_pages=CACHE_PAGES):
+        self.fetcher = fetcher
+        self.size = fetcher.size()
+        self.page_size = page_size
+        self.cache_pages = cache_pages
+        self.pages = OrderedDict()
+        self.pos = 0
+
+    @property
+    def bytes_fetched(self):
+        return self.fetcher.fetched
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self.pos
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        base = {io.SEEK_SET: 0, io.SEEK_CUR: self.pos, io.SEEK_END: self.size}[whence]
+        self.pos = max(0, base + offset)
+        return self.pos
+
+    def _page(self, n):
+        if n in self.pages:
+            self.pages.move_to_end(n)
+        else:
+            start = n * self.page_size
+            end = min(start + self.page_size, self.size)
+            try:
+                self.pages[n] = self.fetcher(start, end)
+            except (KeyError, ValueError, requests.RequestException) as e:
+                # a block missing from / not matching the CAR response, or a dropped request
+                raise RuntimeError(f"Reading bytes {start}-{end} of the dataset failed: "
+                                   f"{type(e).__name__} {e}") from e
+            if len(self.pages) > self.cache_pages:
+                self.pages.popitem(last=False)
+        return self.pages[n]
+
+    def readinto(self, b):
+        out = memoryview(b).cast("B")
+        filled = 0
+        while filled < len(out) and self.pos < self.size:
+            page = self._page(self.pos // self.page_size)
+            skip = self.pos % self.page_size
+            n = min(len(out) - filled, len(page) - skip)
+            out[filled:filled + n] = page[skip:skip + n]
+            filled += n
+            self.pos += n
+        return filled
+
+
+def open_remote(cid, gateways=GATEWAYS, timeout=60):
+    """A RemoteFile for `cid` from the first gateway that serves CAR ranges or byte ranges."""
+    for template in gateways:
+        url = template.format(cid)
+        for fetcher in (CarRangeFetcher(url, cid, timeout), HttpRangeFetcher(url, timeout)):
+            try:
+                remote = RemoteFile(fetcher)
+                logging.info(f"Reading {url} via {type(fetcher).__name__}")
+                return remote
+            except (requests.RequestException, ValueError, LookupError) as e:
+                logging.warning(f"{type(fetcher).__name__} failed on {url}: {e}")
+    raise RuntimeError(f"No gateway served byte ranges for {cid}")
+
+
+def preview(cid, rows=20, columns=None, gateways=GATEWAYS):
+    """(first `rows` rows as a DataFrame, bytes fetched) without downloading the dataset."""
+    remote = open_remote(cid, gateways)
+
+    def opener():
+        remote.seek(0)
+        return io.BufferedReader(_Borrowed(remote), buffer_size=1 << 16)
+
+    df = car_reader.read_frame(opener, nrows=rows, columns=columns)
+    return df, remote.bytes_fetched
+
+
+class _Borrowed(io.RawIOBase):
+    """Delegates to a RemoteFile without closing it, so its page cache outlives each reader."""
+
+    def __init__(self, raw):
+        self.raw = raw
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self.raw.tell()
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        return self.raw.seek(offset, whence)
+
+    def readinto(self, b):
+        return self.raw.readinto(b)
+
+
 def main():
-    if len(sys.argv) != 2:
-        print("Usage: python retrieve.py <CID>")
-        sys.exit(1)
+    import argparse
+    p = argparse.ArgumentParser(description="Download a registered dataset by CID")
+    p.add_argument("cid")
+    p.add_argument("--columns", nargs="+", help="only load these columns after download")
+    p.add_argument("--rows", type=int, help="preview the first N rows via range requests instead of downloading")
+    args = p.parse_args()
+
+    cid = args.cid
+    if args.rows:
+        try:
+            df, fetched = preview(cid, args.rows, args.columns)
+        except RuntimeError as e:
+            logging.error(e)
+            sys.exit(1)
+        print(df)
+        logging.info(f"📦 Fetched {fetched / 1024:.1f} KiB")
+        sys.exit(0)
 
-    cid = sys.argv[1]
     downloads = Path("../downloads")
     downloads.mkdir(exist_ok=True, parents=True)
-    output = downloads / f"{cid}.csv"
+    output = downloads / cid
 
-    if fetch_via_gateway(cid, output) or fetch_via_local(cid, output):
-        sys.exit(0)
+    if not (fetch_via_gateway(cid, output) or fetch_via_local(cid, output)):
+        logging.error("All retrieval attempts failed")
+        sys.exit(1)
+
+    # name the file after what was actually stored (CSV, Parquet or Arrow)
+    fmt = detect_format(output)
+    final = output.with_name(f"{cid}.{fmt}")
+    output.replace(final)
+    logging.info(f"📄 Dataset format: {fmt} → {final}")
 
-    logging.error("All retrieval attempts failed")
-    sys.exit(1)
+    if args.columns:
+        print(read_dataset(final, args.columns))
+    sys.exit(0)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+# USAGE: python governance_status.py 1234 5678            # given proposal IDs
+#        python governance_status.py --from-block 2612103 # open proposals since a block
+#
+# Every proposal's snapshot, deadline, state and Twitter tallies come back in
+# one multicall; block times come from ./cache/blocks.sqlite (estimated, "~",
+# for future blocks and blocks the RPC will not look back into).
+import os
+import sys
+import argparse
+import logging
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "scraper"))
+import governance  # noqa: E402
+
+logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
+
+
+def fmt_time(ts_exact):
+    ts, exact = ts_exact
+    text = datetime.utcfromtimestamp(ts).strftime("%Y-%m-%d %H:%M UTC")
+    return text if exact else f"~{text}"
+
+
+def window(row):
+    head = row["head"]
+    if head < row["snapshot"]:
+        return f"voting opens in {row['snapshot'] - head} blocks"
+    if head <= row["deadline"]:
+        return f"voting OPEN, closes in {row['deadline'] - head} blocks"
+    return "voting closed"
+
+
+def main():
+    p = argparse.ArgumentParser(description="Status of TruthAnchorGovernor proposals")
+    p.add_argument("ids", nargs="*", type=int, help="proposal IDs")
+    p.add_argument("--from-block", type=int, help="also list proposals created since this block")
+    p.add_argument("--all", action="store_true", help="include closed proposals (with --from-block)")
+    args = p.parse_args()
+
+    try:
+        gov = governance.get_governor()
+    except EnvironmentError as e:
+        sys.exit(f"❌ {e}")
+    ids = list(args.ids)
+    if args.from_block is not None:
+        ids += [pid for pid in governance.proposal_ids(gov, args.from_block) if pid not in ids]
+    if not ids:
+        sys.exit("❌ Give proposal IDs or --from-block")
+
+    rows = governance.status(gov, ids)
+    if args.from_block is not None and not args.all:
+        rows = [r for r in rows if r["state"] in governance.OPEN_STATES or r["id"] in args.ids]
+    print(f"Head block: {rows[0]['head'] if rows else '?'}   ({len(rows)} proposals)\n")
+    for r in rows:
+        if r["state"] is None:
+            print(f"#{r['id']}: unknown proposal\n")
+            continue
+        print(f"#{r['id']}  @{r.get('handle', '')}  [{r['state']}]  {window(r)}")
+        print(f"  Snapshot block {r['snapshot']:>10}  → {fmt_time(r['snapshot_time'])}")
+        print(f"  Deadline block {r['deadline']:>10}  → {fmt_time(r['deadline_time'])}")
+        print(f"  Votes for={r.get('votes_for', 0)} against={r.get('votes_against', 0)} "
+              f"abstain={r.get('votes_abstain', 0)}\n")
+
+
+if __name__ == "__main__":
+    main()
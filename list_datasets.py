@@ -3,9 +3,11 @@ import os
 import sys
 import json
 import logging
-from web3 import Web3
 from dotenv import load_dotenv
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "scraper"))
+import rpc  # shared pooled JSON-RPC client (scraper/rpc.py)
+
 logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
 load_dotenv()
 
@@ -16,7 +18,7 @@ ABI_PATH      = "artifacts/AIDatasetRegistry.sol/AIDatasetRegistry.json"
 if not RPC_URL:
     sys.exit("❌ Missing RPC_URL in .env")
 
-w3 = Web3(Web3.HTTPProvider(RPC_URL))
+w3 = rpc.get_web3("RPC_URL")
 if not w3.is_connected():
     sys.exit("❌ Cannot connect to RPC")
 
@@ -46,9 +48,14 @@ def list_datasets(from_block: int = 0, to_block: int = "latest"):
         print(f"  Description:    {a.description}")
         print(f"  Price (wei):    {a.price}")
         print(f"  FilecoinDealId: {a.filecoinDealId}")
+        try:
+            fmt = json.loads(a.preview).get("format", "csv")
+        except (ValueError, AttributeError):
+            fmt = "csv"   # older datasets store the bare preview rows
+        print(f"  Format:         {fmt}")
         print(f"  Preview:        {a.preview}")
-        print(f"  → Fetch full CSV via w3s.link gateway:    {w3s_url}")
-        print(f"  → Or via Pinata gateway:                  {pinata_url}")
+        print(f"  → Fetch full dataset via w3s.link gateway: {w3s_url}")
+        print(f"  → Or via Pinata gateway:                   {pinata_url}")
 
 if __name__ == "__main__":
     import argparse
@@ -3,9 +3,12 @@ import sys
 import argparse
 import getpass
 from twitter_scraper import Twitter_Scraper
+from journal import Journal
+import metrics
 
 import logging
-logging.basicConfig(level=logging.DEBUG, format='%(asctime)s [%(levelname)s] %(message)s')
+logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO").upper(),
+                    format='%(asctime)s [%(levelname)s] %(message)s')
 
 try:
     from dotenv import load_dotenv
@@ -129,8 +132,91 @@ def main():
             help="Scrape top tweets",
         )
 
+        parser.add_argument(
+            "--format",
+            type=str,
+            choices=["csv", "parquet", "arrow"],
+            default=os.getenv("DATASET_FORMAT", "csv"),
+            help="Format of the published dataset (a CSV copy is always kept locally).",
+        )
+
+        parser.add_argument(
+            "--metrics-out",
+            type=str,
+            default=os.getenv("METRICS_OUT"),
+            help="Write per-run timings/counters here (.prom → Prometheus text file, otherwise JSON).",
+        )
+
+        parser.add_argument(
+            "--profile",
+            type=str,
+            default=None,
+            help="Profile the scrape loop into this file (pyinstrument HTML if installed, else cProfile stats).",
+        )
+
+        parser.add_argument(
+            "--resume",
+            nargs="?",
+            const="latest",
+            default=None,
+            help="Resume a crashed run from its journal (default: the most recent one in ./tweets/.journal/).",
+        )
+
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Scrape, score and classify, but pin, push and register nothing (no blockchain config needed).",
+        )
+
+        parser.add_argument(
+            "--scrape-only",
+            action="store_true",
+            help="Only scrape and write the tweet CSV: no LLM, no IPFS, no chain.",
+        )
+
+        parser.add_argument(
+            "--daemon",
+            type=str,
+            default=None,
+            metavar="JOBS_JSON",
+            help="Run as a service: keep the browser and clients warm and run the jobs in this file on their intervals.",
+        )
+
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=int(os.getenv("DAEMON_CONCURRENCY", "1")),
+            help="Daemon mode: jobs running at once (one logged-in browser each).",
+        )
+
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Daemon mode: run every job once, then exit.",
+        )
+
         args = parser.parse_args()
 
+        if args.daemon is not None:
+            journal = None  # one journal per job run
+        elif args.resume is not None:
+            journal = Journal.latest() if args.resume == "latest" else Journal(args.resume)
+            if not journal.state.config:
+                print(f"Journal {journal.path} has no run configuration to resume.")
+                logging.error("Journal is missing its config record.")
+                sys.exit(1)
+            print(f"Resuming run from {journal.path}")
+            # the original run's scrape target wins over anything passed now
+            for key, value in journal.state.config.items():
+                setattr(args, key, value)
+        else:
+            journal = Journal.new()
+            journal.record("config", config={
+                key: getattr(args, key)
+                for key in ("tweets", "no_tweets_limit", "username", "hashtag", "bookmarks",
+                            "query", "latest", "top", "add", "format", "dry_run", "scrape_only")
+            })
+
         USER_MAIL = args.mail
         USER_UNAME = args.user
         USER_PASSWORD = args.password
@@ -146,6 +232,12 @@ def main():
             HEADLESS_MODE = str(input("Headless?[Yes/No]")).lower()
 
         print()
+        if args.daemon is not None:
+            from daemon import serve
+            serve(args.daemon, USER_MAIL, USER_UNAME, USER_PASSWORD, HEADLESS_MODE,
+                  concurrency=args.concurrency, metrics_out=args.metrics_out, once=args.once)
+            sys.exit(0)
+
         logging.info("Starting Twitter scraper with verbose logging.")
         logging.debug(f"Parameters: tweets={args.tweets}, username={args.username}, hashtag={args.hashtag}, query={args.query}")
 
@@ -177,21 +269,30 @@ def main():
                 mail=USER_MAIL,
                 username=USER_UNAME,
                 password=USER_PASSWORD,
-                headlessState=HEADLESS_MODE
-            )
-            scraper.login()
-            scraper.scrape_tweets(
-                max_tweets=args.tweets,
-                no_tweets_limit=args.no_tweets_limit if args.no_tweets_limit is not None else True,
-                scrape_username=args.username,
-                scrape_hashtag=args.hashtag,
-                scrape_bookmarks=args.bookmarks,
-                scrape_query=args.query,
-                scrape_latest=args.latest,
-                scrape_top=args.top,
-                scrape_poster_details="pd" in additional_data,
+                headlessState=HEADLESS_MODE,
+                journal=journal,
+                output_format=args.format,
+                analyze=not args.scrape_only,
+                publish=not (args.dry_run or args.scrape_only),
             )
-            scraper.save_to_csv()
+            try:
+                scraper.login()
+                with metrics.profiled(args.profile):
+                    scraper.scrape_tweets(
+                        max_tweets=args.tweets,
+                        no_tweets_limit=args.no_tweets_limit if args.no_tweets_limit is not None else True,
+                        scrape_username=args.username,
+                        scrape_hashtag=args.hashtag,
+                        scrape_bookmarks=args.bookmarks,
+                        scrape_query=args.query,
+                        scrape_latest=args.latest,
+                        scrape_top=args.top,
+                        scrape_poster_details="pd" in additional_data,
+                    )
+                scraper.save_to_csv()
+            finally:
+                if args.metrics_out:
+                    metrics.export(args.metrics_out)
             if not scraper.interrupted:
                 scraper.driver.close()
         else:
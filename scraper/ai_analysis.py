@@ -1,96 +1,202 @@
 # ai_analysis.py
-from dotenv import load_dotenv
+#
+# Deletion-likelihood scoring through OpenAI function calling. The model must
+# answer by calling `submit_score` with {"score": 0..1[, "reason": "..."]},
+# which is validated here and retried when malformed, so the score never
+# depends on scanning free text.
+#
+#   SCORE_MODEL    chat model (default gpt-4)
+#   SCORE_EXPLAIN  1 = short reason per tweet (default); 0 = score only, the
+#                  fast/cheap mode
+#   SCORE_RETRIES  extra attempts after a malformed answer (default 2)
+#
+# analyze_tweets() scores many tweets per request with `submit_scores`, packed
+# to a token budget by llm_batch (LLM_BATCH_TOKENS / LLM_BATCH_ITEMS).
+
 import os
-from langchain import hub
-from langchain.memory import ConversationBufferMemory
-from langchain_openai import ChatOpenAI
-from langchain.agents import AgentExecutor, create_structured_chat_agent
-from langchain.schema import AIMessage, HumanMessage, SystemMessage
-from langgraph.prebuilt import create_react_agent
-
-# Optional: Attempt to import LangGraph for visualization support
-try:
-    from langgraph import visualize_chain
-except ImportError:
-    def visualize_chain(agent):
-        print("LangGraph not installed or not available.")
-        return
-
-# Load environment variables from .env file
-load_dotenv()
-OPEN_AI_API_KEY = os.environ.get("OPEN_AI_API_KEY")
-
-def initialize_tweet_analyzer():
+import json
+import logging
+import threading
+
+import metrics
+from llm_batch import BATCH_ITEMS, BatchFormatError, align, format_batch, run_batched
+
+SCORE_MODEL = os.getenv("SCORE_MODEL", "gpt-4")
+SCORE_EXPLAIN = os.getenv("SCORE_EXPLAIN", "1").lower() not in ("0", "false", "no")
+SCORE_RETRIES = int(os.getenv("SCORE_RETRIES", "2"))
+
+SYSTEM_PROMPT = (
+    "You rate tweets for the likelihood (0 to 1) that they get deleted because they are "
+    "controversial: scams, misinformation, harassment, market manipulation, regretted hot takes. "
+    "Ordinary news, memes and opinions score low. Always answer by calling submit_score."
+)
+
+
+def score_tool(explain=True):
+    """OpenAI tool definition for the compact per-tweet answer."""
+    properties = {"score": {"type": "number", "minimum": 0, "maximum": 1}}
+    required = ["score"]
+    if explain:
+        properties["reason"] = {"type": "string", "description": "one short sentence"}
+        required.append("reason")
+    return {
+        "type": "function",
+        "function": {
+            "name": "submit_score",
+            "description": "Submit the deletion-likelihood score for the tweet.",
+            "parameters": {
+                "type": "object",
+                "properties": properties,
+                "required": required,
+                "additionalProperties": False,
+            },
+        },
+    }
+
+
+def scores_tool(explain=True):
+    """Batch variant: one {"i", "score"[, "reason"]} entry per numbered tweet."""
+    item = score_tool(explain)["function"]["parameters"]
+    item = dict(item, properties={"i": {"type": "integer"}, **item["properties"]},
+                required=["i"] + item["required"])
+    return {
+        "type": "function",
+        "function": {
+            "name": "submit_scores",
+            "description": "Submit the deletion-likelihood score for every numbered tweet.",
+            "parameters": {
+                "type": "object",
+                "properties": {"results": {"type": "array", "items": item}},
+                "required": ["results"],
+                "additionalProperties": False,
+            },
+        },
+    }
+
+
+class ScoreFormatError(ValueError):
+    """The model's answer did not match the submit_score schema."""
+
+
+def parse_score(answer):
     """
-    Initialize an AI agent using LangChain and LangGraph to analyze tweet content.
-    The agent outputs a deletion likelihood score (0-1) based on controversy and provides
-    suggestions for adapting HTML extraction if needed.
-    
-    NOTE: Please instruct the agent to output a plain string like:
-    "Score: 0.1. <analysis text>".
+    Validate a submit_score answer and return (score, reason).
+
+    Accepts the AIMessage from a tool-bound model, its tool-call args dict,
+    or the same args as a JSON string.
     """
-    system_prompt = (
-        "You are an AI tweet analyzer. Your job is to analyze the tweet content and output "
-        "a likelihood score between 0 and 1 for the tweet being deleted based on its controversial nature. "
-        "If the HTML structure is non-standard, include suggestions for adapting the extraction process. "
-        "Output your answer as a plain string beginning with 'Score:' followed by the numeric value and your analysis notes."
-    )
-    
-    memory = ConversationBufferMemory(memory_key="chat_history", return_messages=True)
-    memory.chat_memory.add_message(SystemMessage(content=system_prompt))
-    
-    # Load a structured chat prompt from the LangChain hub
-    prompt = hub.pull("hwchase17/structured-chat-agent")
-    
-    llm = ChatOpenAI(openai_api_key=OPEN_AI_API_KEY, model="gpt-4")
-    agent = create_structured_chat_agent(llm=llm, tools=[], prompt=prompt)
-    agent_executor = AgentExecutor.from_agent_and_tools(
-        agent=agent,
-        tools=[],  # No additional tools are used in this analysis
-        verbose=True,
-        memory=memory,
-        handle_parsing_errors=True  # Enable handling of output parsing errors
-    )
-    
+    tool_calls = getattr(answer, "tool_calls", None)
+    if tool_calls is not None:
+        if not tool_calls:
+            bad = getattr(answer, "invalid_tool_calls", None)
+            raise ScoreFormatError(f"no valid submit_score call (invalid: {bad!r})")
+        answer = tool_calls[0].get("args", {})
+    elif hasattr(answer, "content"):
+        answer = answer.content
+    if isinstance(answer, str):
+        try:
+            answer = json.loads(answer)
+        except json.JSONDecodeError as e:
+            raise ScoreFormatError(f"answer is not JSON: {answer[:80]!r}") from e
+    if not isinstance(answer, dict) or "score" not in answer:
+        raise ScoreFormatError(f"missing 'score' in {answer!r}")
     try:
-        visualize_chain(agent)
-    except Exception as e:
-        print("LangGraph visualization not available:", e)
-    
-    return agent_executor
+        score = float(answer["score"])
+    except (TypeError, ValueError) as e:
+        raise ScoreFormatError(f"score is not a number: {answer['score']!r}") from e
+    if not 0.0 <= score <= 1.0:
+        raise ScoreFormatError(f"score {score} outside [0, 1]")
+    return score, str(answer.get("reason", "") or "")
+
+
+def parse_scores(answer, n):
+    """Validate a submit_scores answer into n (score, reason) pairs."""
+    tool_calls = getattr(answer, "tool_calls", None)
+    args = tool_calls[0].get("args", {}) if tool_calls else answer
+    if not isinstance(args, dict):
+        raise BatchFormatError(f"no submit_scores call in {answer!r:.120}")
+    return [parse_score(item) for item in align(args.get("results"), n)]
 
-def analyze_tweet(tweet_content, agent_executor=None):
+
+_analyzers = {}
+_analyzers_lock = threading.Lock()
+
+
+def initialize_tweet_analyzer(explain=SCORE_EXPLAIN, batch=False):
+    """
+    Chat model bound to the submit_score tool (or submit_scores for batches,
+    forced), temperature 0, with an output cap sized for the compact answer.
+    Cached per explain/batch mode.
     """
-    Analyze the tweet content and return a deletion likelihood score (0-1)
-    along with the full AI analysis text.
+    with _analyzers_lock:
+        if (explain, batch) not in _analyzers:
+            from dotenv import load_dotenv
+            from langchain_openai import ChatOpenAI
+
+            load_dotenv()
+            per_tweet = 80 if explain else 20
+            tool = scores_tool(explain) if batch else score_tool(explain)
+            llm = ChatOpenAI(
+                openai_api_key=os.environ.get("OPEN_AI_API_KEY"),
+                model=SCORE_MODEL,
+                temperature=0,
+                max_tokens=per_tweet * BATCH_ITEMS if batch else per_tweet,
+            )
+            _analyzers[explain, batch] = llm.bind_tools(
+                [tool], tool_choice={"type": "function", "function": {"name": tool["function"]["name"]}}
+            )
+        return _analyzers[explain, batch]
+
+
+@metrics.timed("llm.analyze_tweet")
+def analyze_tweet(tweet_content, agent_executor=None, explain=None):
     """
-    if agent_executor is None:
-        agent_executor = initialize_tweet_analyzer()
-    
-    query = (
-        f"Analyze this tweet and output a deletion likelihood score (0 to 1) "
-        f"for it being deleted due to controversy. Tweet: {tweet_content}"
-    )
-    response = agent_executor.invoke({"input": query})
-    output_text = response.get("output", "")
-    
-    # If the output is a dictionary, convert it to a plain string.
-    if isinstance(output_text, dict):
-        score = output_text.get("Score", 0.0)
-        analysis = output_text.get("Analysis notes", "")
-        output_text = f"Score: {score}. {analysis}"
-    
-    # Naively parse the output to extract a score between 0 and 1.
-    score = None
-    for part in output_text.split():
+    Analyze the tweet content and return (deletion likelihood 0-1, reason).
+
+    `agent_executor` is anything with .invoke(messages) returning a
+    submit_score answer (see parse_score); defaults to the OpenAI model.
+    """
+    explain = SCORE_EXPLAIN if explain is None else explain
+    runnable = agent_executor or initialize_tweet_analyzer(explain)
+    messages = [("system", SYSTEM_PROMPT), ("human", f"Tweet: {tweet_content}")]
+    error = None
+    for attempt in range(1 + SCORE_RETRIES):
         try:
-            val = float(part)
-            if 0 <= val <= 1:
-                score = val
-                break
-        except Exception:
-            continue
-    if score is None:
-        score = 0.0  # Fallback if no valid score is found
-    
-    return score, output_text
+            score, reason = parse_score(runnable.invoke(messages))
+            return score, reason or f"Score: {score}"
+        except ScoreFormatError as e:
+            error = e
+            metrics.inc("llm.analyze_tweet.invalid")
+            logging.warning(f"Malformed score answer (attempt {attempt + 1}): {e}")
+            messages = messages + [("human", "Invalid answer. Call submit_score with a number between 0 and 1.")]
+    # give up on this tweet rather than the run; flagged in the analysis text
+    logging.error(f"No valid score after {1 + SCORE_RETRIES} attempts: {error}")
+    return 0.0, f"unscored: {error}"
+
+
+@metrics.timed("llm.analyze_tweets")
+def analyze_tweets(tweet_contents, agent_executor=None, explain=None):
+    """
+    Score many tweets with token-budgeted submit_scores requests and return
+    a list of (score, reason) aligned with the input. Batches that fail
+    validation are split and retried; a tweet that still fails comes back
+    as (0.0, "unscored: ...") like analyze_tweet.
+    """
+    explain = SCORE_EXPLAIN if explain is None else explain
+    runnable = agent_executor or initialize_tweet_analyzer(explain, batch=True)
+
+    def call(batch):
+        messages = [("system", SYSTEM_PROMPT.replace("submit_score", "submit_scores")),
+                    ("human", format_batch(batch))]
+        return parse_scores(runnable.invoke(messages), len(batch))
+
+    results = run_batched(list(tweet_contents), call, model=SCORE_MODEL, name="llm.analyze_tweets")
+    out = []
+    for result in results:
+        if result is None:
+            metrics.inc("llm.analyze_tweet.invalid")
+            out.append((0.0, "unscored: no valid answer in batch"))
+        else:
+            score, reason = result
+            out.append((score, reason or f"Score: {score}"))
+    return out
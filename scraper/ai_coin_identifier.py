@@ -1,47 +1,104 @@
 # ai_coin_identifier.py
+#
+# Coin labels per tweet through OpenAI function calling. Tweets are sent in
+# token-budgeted batches (llm_batch) and the model answers with one
+# {"i": index, "coin": symbol} entry per tweet.
 
-from dotenv import load_dotenv
 import os
-from langchain import hub
-from langchain.memory import ConversationBufferMemory
-from langchain_openai import ChatOpenAI
-from langchain.schema import SystemMessage
-from langchain.agents import AgentExecutor, create_structured_chat_agent
-from langgraph.prebuilt import create_react_agent
+import threading
+from collections import Counter
 
-load_dotenv()
-OPENAI_API_KEY = os.getenv("OPEN_AI_API_KEY")
+import metrics
+from llm_batch import BatchFormatError, align, format_batch, run_batched
 
-def initialize_coin_agent():
-    system_prompt = (
-        "You are an AI that reads a batch of tweet texts and tells me, in a single "
-        "token, which cryptocurrency they are referring to. "
-        "Valid outputs are exactly one of: "
-        "C2FLR, testXRP, testLTC, testXLM, testDOGE, testADA, testALGO, testBTC, "
-        "testETH, testFIL, testARB, testAVAX, testBNB, testMATIC, testSOL, testUSDC, "
-        "testUSDT, testXDC, testPOL.\n\n"
-        "Respond with exactly the one symbol, no punctuation."
-    )
-    memory = ConversationBufferMemory(memory_key="chat_history", return_messages=True)
-    memory.chat_memory.add_message(SystemMessage(content=system_prompt))
-    prompt = hub.pull("hwchase17/structured-chat-agent")
-    llm = ChatOpenAI(openai_api_key=OPENAI_API_KEY, model="gpt-4")
-    agent = create_structured_chat_agent(llm=llm, tools=[], prompt=prompt)
-    executor = AgentExecutor.from_agent_and_tools(
-      agent=agent,
-      tools=[],
-      verbose=False,
-      memory=memory,
-      handle_parsing_errors=True
-    )
-    return executor
+COIN_MODEL = os.getenv("COIN_MODEL", "gpt-4")
+COINS = (
+    "C2FLR", "testXRP", "testLTC", "testXLM", "testDOGE", "testADA", "testALGO", "testBTC",
+    "testETH", "testFIL", "testARB", "testAVAX", "testBNB", "testMATIC", "testSOL", "testUSDC",
+    "testUSDT", "testXDC", "testPOL",
+)
+
+SYSTEM_PROMPT = (
+    "You label numbered tweets with the cryptocurrency each one is about. "
+    "Use exactly one of the allowed symbols per tweet; pick the closest one when unsure. "
+    "Always answer by calling submit_coins with one entry per tweet."
+)
+
+COIN_TOOL = {
+    "type": "function",
+    "function": {
+        "name": "submit_coins",
+        "description": "Submit the coin symbol for every numbered tweet.",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "labels": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "i": {"type": "integer"},
+                            "coin": {"type": "string", "enum": list(COINS)},
+                        },
+                        "required": ["i", "coin"],
+                        "additionalProperties": False,
+                    },
+                },
+            },
+            "required": ["labels"],
+            "additionalProperties": False,
+        },
+    },
+}
 
 _coin_agent = None
+_coin_agent_lock = threading.Lock()
+
 
-def identify_coin(tweet_texts):
+def initialize_coin_agent():
+    """Chat model bound to the submit_coins tool (forced), built once."""
     global _coin_agent
-    if _coin_agent is None:
-        _coin_agent = initialize_coin_agent()
-    joined = "\n\n---\n\n".join(tweet_texts[:20])
-    resp = _coin_agent.invoke({"input": f"Tweets:\n{joined}"})
-    return resp.get("output", "").strip()
+    with _coin_agent_lock:
+        if _coin_agent is None:
+            # imported here: langchain/openai dominate startup time otherwise
+            from dotenv import load_dotenv
+            from langchain_openai import ChatOpenAI
+
+            load_dotenv()
+            llm = ChatOpenAI(openai_api_key=os.getenv("OPEN_AI_API_KEY"), model=COIN_MODEL, temperature=0)
+            _coin_agent = llm.bind_tools(
+                [COIN_TOOL], tool_choice={"type": "function", "function": {"name": "submit_coins"}}
+            )
+        return _coin_agent
+
+
+def parse_labels(answer, n):
+    """submit_coins answer → list of n symbols, or BatchFormatError."""
+    calls = getattr(answer, "tool_calls", None)
+    args = calls[0].get("args", {}) if calls else answer
+    if not isinstance(args, dict):
+        raise BatchFormatError(f"no submit_coins call in {answer!r:.120}")
+    labels = [item.get("coin") for item in align(args.get("labels"), n)]
+    bad = [c for c in labels if c not in COINS]
+    if bad:
+        raise BatchFormatError(f"unknown coin symbols {bad[:3]}")
+    return labels
+
+
+@metrics.timed("llm.identify_coins")
+def identify_coins(tweet_texts, agent=None):
+    """One coin symbol per tweet, aligned with the input ("" if unlabelled)."""
+    agent = agent or initialize_coin_agent()
+
+    def call(batch):
+        messages = [("system", SYSTEM_PROMPT), ("human", format_batch(batch))]
+        return parse_labels(agent.invoke(messages), len(batch))
+
+    labels = run_batched(list(tweet_texts), call, model=COIN_MODEL, name="llm.identify_coin")
+    return [label or "" for label in labels]
+
+
+def identify_coin(tweet_texts, agent=None):
+    """The single symbol a group of tweets is about: the most common label."""
+    labels = [c for c in identify_coins(tweet_texts, agent) if c]
+    return Counter(labels).most_common(1)[0][0] if labels else ""
@@ -0,0 +1,113 @@
+# analytics.py
+#
+# Vectorized per-coin sentiment / engagement metrics over a tweet dump.
+# USAGE: python scraper/analytics.py tweets/2025-04-27_02-34-50_tweets_1-5.csv [...]
+
+import numpy as np
+import pandas as pd
+
+from record import COUNT_MULTIPLIERS, COUNT_RE, FIELDS
+
+COUNT_COLUMNS = ("comments", "retweets", "likes", "analytics", "following", "followers")
+
+# Deletion-likelihood buckets reported per coin: [0, 0.33), [0.33, 0.66), [0.66, 1]
+SCORE_BINS = (0.33, 0.66)
+
+
+def parse_counts(values) -> pd.Series:
+    """
+    Vectorized version of record.parse_count: "1,234" / "1.2K" / "3M" → int64.
+    Unparseable entries become 0.
+    """
+    s = pd.Series(values)
+    if pd.api.types.is_integer_dtype(s.dtype):
+        return s.astype("int64")
+    parts = s.astype(str).str.extract(COUNT_RE)
+    num = pd.to_numeric(parts[0].str.replace(",", "", regex=False), errors="coerce")
+    mult = parts[1].str.upper().map(COUNT_MULTIPLIERS)
+    return (num * mult).round().fillna(0).astype("int64")
+
+
+def load_dump(path) -> pd.DataFrame:
+    """
+    Read a tweets CSV into the column names coin_aggregates expects. Dumps
+    carry no follower counts, so their aggregates have no followers/strength.
+    """
+    df = pd.read_csv(path)
+    rename = {csv_name: field for field, csv_name, _ in FIELDS if csv_name}
+    rename.update({"Deletion Likelihood": "score", "Coin": "coin", "Cluster ID": "cluster"})
+    df = df.rename(columns=rename)
+    for col in COUNT_COLUMNS:
+        if col in df:
+            df[col] = parse_counts(df[col])
+    return df
+
+
+def coin_aggregates(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    One groupby pass over (coin, score, counts…) rows. Returns one row per coin with:
+      tweets, mean_score, weighted_score (engagement-weighted), norm_score (int 0–100),
+      followers, strength (= tweets × followers; both only with a `followers`
+      column), comments/retweets/likes/analytics totals, and the share of
+      tweets in each deletion-likelihood bucket.
+    With a `cluster` column (near-duplicate cluster ids) it also reports
+    clusters, dup_share (share of tweets that repeat another one: the spam
+    signal) and dedup_score (mean score with every cluster counted once).
+    Other missing count columns count as zero; a frame without a `coin`
+    column is one "ALL" group.
+    """
+    n = len(df)
+    zeros = np.zeros(n, dtype=np.int64)
+    score = df["score"].to_numpy(dtype=np.float64)
+    counts = {c: (df[c].to_numpy(dtype=np.int64) if c in df else zeros) for c in COUNT_COLUMNS}
+    weight = 1 + counts["comments"] + counts["retweets"] + counts["likes"]
+
+    work = pd.DataFrame({
+        "coin": df["coin"].to_numpy() if "coin" in df else np.full(n, "ALL", dtype=object),
+        "score": score,
+        "weight": weight,
+        "weighted": score * weight,
+        "low": score < SCORE_BINS[0],
+        "medium": (score >= SCORE_BINS[0]) & (score < SCORE_BINS[1]),
+        "high": score >= SCORE_BINS[1],
+        **{c: counts[c] for c in ("followers", "comments", "retweets", "likes", "analytics")},
+    })
+    out = work.groupby("coin", sort=False).agg(
+        tweets=("score", "size"),
+        mean_score=("score", "mean"),
+        weight=("weight", "sum"),
+        weighted=("weighted", "sum"),
+        followers=("followers", "sum"),
+        comments=("comments", "sum"),
+        retweets=("retweets", "sum"),
+        likes=("likes", "sum"),
+        analytics=("analytics", "sum"),
+        share_low=("low", "mean"),
+        share_medium=("medium", "mean"),
+        share_high=("high", "mean"),
+    )
+    out["weighted_score"] = out.pop("weighted") / out.pop("weight")
+    out["norm_score"] = (out["mean_score"] * 100).astype(int)
+    if "followers" in df:
+        out["strength"] = out["tweets"] * out["followers"]
+    else:
+        # a zero would read as "no reach"; without the column there is no figure at all
+        out = out.drop(columns="followers")
+    if "cluster" in df:
+        work["cluster"] = df["cluster"].to_numpy()
+        per_cluster = work.groupby(["coin", "cluster"], sort=False)["score"].mean()
+        by_coin = per_cluster.groupby(level=0, sort=False)
+        out["clusters"] = by_coin.size()
+        out["dup_share"] = 1 - out["clusters"] / out["tweets"]
+        out["dedup_score"] = by_coin.mean()
+    return out
+
+
+if __name__ == "__main__":
+    import argparse
+    p = argparse.ArgumentParser(description="Per-coin aggregates over tweet dumps")
+    p.add_argument("files", nargs="+", help="tweet CSV dumps")
+    args = p.parse_args()
+    frame = pd.concat([load_dump(f) for f in args.files], ignore_index=True)
+    pd.set_option("display.width", 200)
+    print(coin_aggregates(frame))
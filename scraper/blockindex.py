@@ -0,0 +1,83 @@
+# blockindex.py
+#
+# Local index of the blocks we have already stored on StorAcha, and in which
+# CAR. New shards leave those blocks out; the CARs holding them are listed in
+# the upload's shard list instead, so the DAG still resolves. A CAR only
+# counts once upload_car confirmed it, so a failed upload never hides blocks.
+#
+#   index = BlockIndex()
+#   fresh = [(cid, b) for cid, b in blocks if not index.stored(cid)]
+#   index.add_car(car_cid, path, size, [cid for cid, _ in fresh])
+#   ...upload...; index.mark_stored([car_cid])
+#
+#   BLOCK_INDEX  SQLite file (default ./cache/block_index.sqlite)
+
+import os
+import sqlite3
+import threading
+
+INDEX_PATH = os.getenv("BLOCK_INDEX", "./cache/block_index.sqlite")
+
+
+class BlockIndex:
+    def __init__(self, path=INDEX_PATH):
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.executescript(
+            "CREATE TABLE IF NOT EXISTS cars ("
+            " car TEXT PRIMARY KEY, path TEXT, size INTEGER, stored INTEGER DEFAULT 0);"
+            "CREATE TABLE IF NOT EXISTS blocks ("
+            " cid BLOB, car TEXT, PRIMARY KEY (cid, car));"
+        )
+        self._lock = threading.Lock()
+
+    def close(self):
+        self._db.close()
+
+    def stored_cars(self, cids):
+        """{cid: car_cid} for the given blocks that sit in a confirmed CAR."""
+        cids = list(cids)
+        out = {}
+        with self._lock:
+            for i in range(0, len(cids), 500):
+                part = cids[i:i + 500]
+                marks = ",".join("?" * len(part))
+                out.update(self._db.execute(
+                    f"SELECT b.cid, MIN(b.car) FROM blocks b JOIN cars c ON c.car = b.car "
+                    f"WHERE c.stored = 1 AND b.cid IN ({marks}) GROUP BY b.cid", part).fetchall())
+        return {bytes(cid): car for cid, car in out.items()}
+
+    def stored(self, cid):
+        return bool(self.stored_cars([cid]))
+
+    def car(self, car_cid):
+        """(car_cid, path, size) of a known CAR, as make_car lists shards."""
+        with self._lock:
+            row = self._db.execute("SELECT car, path, size FROM cars WHERE car = ?",
+                                   (car_cid,)).fetchone()
+        return tuple(row) if row else None
+
+    def add_car(self, car_cid, path, size, cids):
+        with self._lock, self._db:
+            self._db.execute("INSERT OR IGNORE INTO cars (car, path, size) VALUES (?, ?, ?)",
+                             (car_cid, path, size))
+            self._db.executemany("INSERT OR IGNORE INTO blocks VALUES (?, ?)",
+                                 [(bytes(cid), car_cid) for cid in cids])
+
+    def mark_stored(self, car_cids):
+        with self._lock, self._db:
+            self._db.executemany("UPDATE cars SET stored = 1 WHERE car = ?",
+                                 [(c,) for c in car_cids])
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_index():
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = BlockIndex()
+        return _index
@@ -0,0 +1,148 @@
+# blocktime.py
+#
+# Persistent block → timestamp cache. Block timestamps never change, so each
+# one is fetched at most once (missing blocks in one JSON-RPC batch) and kept
+# in SQLite across runs. Blocks the RPC will not look back into (Filecoin
+# calibration refuses old lookbacks) and future blocks are estimated by
+# interpolating between known blocks, or from the average block time.
+#
+#   times = BlockTimes(w3)
+#   ts, exact = times.timestamps([snapshot, deadline], head=latest)[snapshot]
+#
+#   BLOCK_CACHE       SQLite file (default ./cache/blocks.sqlite)
+#   BLOCK_TIME        seconds per block when the cache can't tell (default 30)
+
+import os
+import sqlite3
+import logging
+import threading
+
+import metrics
+import rpc
+
+CACHE_PATH = os.getenv("BLOCK_CACHE", "./cache/blocks.sqlite")
+BLOCK_TIME = float(os.getenv("BLOCK_TIME", "30"))
+
+
+class BlockTimes:
+    def __init__(self, w3, path=CACHE_PATH, block_time=BLOCK_TIME, chain_id=None):
+        self.w3 = w3
+        self.block_time = block_time
+        self.chain_id = chain_id if chain_id is not None else w3.eth.chain_id
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("CREATE TABLE IF NOT EXISTS blocks ("
+                         "chain INTEGER, number INTEGER, timestamp INTEGER, "
+                         "PRIMARY KEY (chain, number))")
+        self._lock = threading.Lock()
+
+    def close(self):
+        self._db.close()
+
+    def add(self, number, timestamp):
+        self.add_many({number: timestamp})
+
+    def add_many(self, known):
+        with self._lock, self._db:
+            self._db.executemany("INSERT OR REPLACE INTO blocks VALUES (?, ?, ?)",
+                                 [(self.chain_id, n, ts) for n, ts in known.items()])
+
+    def cached(self, numbers):
+        numbers = list(numbers)
+        if not numbers:
+            return {}
+        marks = ",".join("?" * len(numbers))
+        with self._lock:
+            rows = self._db.execute(
+                f"SELECT number, timestamp FROM blocks WHERE chain = ? AND number IN ({marks})",
+                [self.chain_id, *numbers]).fetchall()
+        return dict(rows)
+
+    def _neighbours(self, number):
+        with self._lock:
+            below = self._db.execute(
+                "SELECT number, timestamp FROM blocks WHERE chain = ? AND number < ? "
+                "ORDER BY number DESC LIMIT 1", (self.chain_id, number)).fetchone()
+            above = self._db.execute(
+                "SELECT number, timestamp FROM blocks WHERE chain = ? AND number > ? "
+                "ORDER BY number ASC LIMIT 1", (self.chain_id, number)).fetchone()
+            span = self._db.execute(
+                "SELECT MIN(number), MAX(number) FROM blocks WHERE chain = ?",
+                (self.chain_id,)).fetchone()
+        return below, above, span
+
+    def average_block_time(self):
+        """Seconds per block over the widest cached span (BLOCK_TIME if too few blocks)."""
+        _, _, (lo, hi) = self._neighbours(0)
+        if lo is None or hi == lo:
+            return self.block_time
+        ts = self.cached([lo, hi])
+        return max((ts[hi] - ts[lo]) / (hi - lo), 1e-3)
+
+    def estimate(self, number):
+        """
+        Timestamp for `number` from known blocks: linear interpolation when
+        cached blocks bracket it, else extrapolation at the average block time.
+        """
+        below, above, _ = self._neighbours(number)
+        if below and above:
+            (n0, t0), (n1, t1) = below, above
+            return int(round(t0 + (t1 - t0) * (number - n0) / (n1 - n0)))
+        anchor = below or above
+        if anchor is None:
+            raise LookupError("no cached blocks to estimate from")
+        return int(round(anchor[1] + (number - anchor[0]) * self.average_block_time()))
+
+    def timestamps(self, numbers, head=None):
+        """
+        {number: (timestamp, exact)} for every requested block. Past blocks
+        missing from the cache are fetched in one batch (with the head block
+        unless `head`, a {"number", "timestamp"} dict, is given) and stored;
+        future blocks and blocks the RPC refuses are estimated, not stored.
+        """
+        numbers = sorted(set(int(n) for n in numbers))
+        found = self.cached(numbers)
+        metrics.inc("blocktime.hits", len(found))
+        missing = [n for n in numbers if n not in found and (head is None or n <= head["number"])]
+        if missing or head is None:
+            fetched, latest = self._fetch(missing, with_head=head is None)
+            head = head or latest
+            found.update(fetched)
+            self.add_many(fetched)
+        if head is not None:
+            self.add(head["number"], head["timestamp"])
+        out = {}
+        for n in numbers:
+            if n in found:
+                out[n] = (found[n], True)
+            else:
+                metrics.inc("blocktime.estimated")
+                out[n] = (self.estimate(n), False)
+        return out
+
+    def _fetch(self, numbers, with_head=False):
+        """Fetch block headers in one JSON-RPC batch; refused lookbacks are skipped."""
+        requests = [("eth_getBlockByNumber", [hex(n), False]) for n in numbers]
+        if with_head:
+            requests.append(("eth_getBlockByNumber", ["latest", False]))
+        metrics.inc("blocktime.fetched", len(numbers))
+        try:
+            with metrics.timed("rpc.get_blocks"):
+                responses = rpc.send_batch(self.w3, requests)
+        except Exception as e:
+            logging.warning(f"Block batch failed ({e}); estimating {len(numbers)} timestamps")
+            return {}, None
+        head = None
+        if with_head:
+            block = responses.pop().get("result")
+            if block:
+                head = {"number": int(block["number"], 16), "timestamp": int(block["timestamp"], 16)}
+        fetched = {}
+        for n, response in zip(numbers, responses):
+            block = response.get("result")
+            if block:
+                fetched[n] = int(block["timestamp"], 16)
+            else:
+                logging.info(f"Block {n} unavailable ({response.get('error', 'not found')}); estimating")
+        return fetched, head
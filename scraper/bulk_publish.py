@@ -0,0 +1,252 @@
+# bulk_publish.py
+#
+# Publish a directory of dataset dumps: pin → CAR → upload → deal → register
+# for every file not yet published, as a pipeline with bounded concurrency per
+# stage. Completed steps go to an append-only manifest, so a rerun skips
+# finished files and resumes half-published ones at the step that failed.
+#
+#   python scraper/bulk_publish.py tweets/ --pattern "*.csv"
+#
+#   PIPELINE_PUBLISH_<STAGE>_WORKERS  concurrency per stage (PIN, CAR, UPLOAD,
+#                                     DEAL, REGISTER; see pipeline.STAGE_DEFAULTS)
+#   PUBLISH_MANIFEST                  manifest file (default <dir>/.publish-manifest.jsonl)
+#   DATASET_PRICE_WEI                 registry price per dataset (default 0)
+
+import os
+import sys
+import json
+import glob
+import time
+import hashlib
+import logging
+import threading
+from datetime import datetime
+
+import metrics
+from pipeline import Pipeline, stage_batch
+
+
+class Manifest:
+    """
+    Append-only JSON-lines record of finished publish steps, keyed by file
+    content (sha256), so a renamed file is not republished and an edited one
+    is. Records are fsync'd like the scrape journal.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.steps = {}    # sha256 → {step: result}
+        self.hashes = {}   # (path, size, mtime_ns) → sha256, to skip rehashing
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                for n, line in enumerate(f, 1):
+                    try:
+                        self._apply(json.loads(line))
+                    except json.JSONDecodeError:
+                        logging.warning(f"Ignoring unreadable manifest line {n} in {path}")
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._fp = open(path, "a", encoding="utf-8")
+
+    def _apply(self, rec):
+        if rec.get("kind") == "file":
+            self.hashes[(rec["path"], rec["size"], rec["mtime_ns"])] = rec["sha256"]
+        elif rec.get("kind") == "step":
+            self.steps.setdefault(rec["sha256"], {})[rec["step"]] = rec.get("result")
+
+    def record(self, kind, **fields):
+        rec = {"kind": kind, **fields}
+        with self._lock:
+            self._fp.write(json.dumps(rec, ensure_ascii=False, default=str) + "\n")
+            self._fp.flush()
+            os.fsync(self._fp.fileno())
+            self._apply(rec)
+
+    def sha256(self, path):
+        st = os.stat(path)
+        key = (path, st.st_size, st.st_mtime_ns)
+        if key not in self.hashes:
+            h = hashlib.sha256()
+            with open(path, "rb") as f:
+                for piece in iter(lambda: f.read(1 << 20), b""):
+                    h.update(piece)
+            self.record("file", path=path, size=st.st_size, mtime_ns=st.st_mtime_ns,
+                        sha256=h.hexdigest())
+        return self.hashes[key]
+
+    def done(self, sha, step):
+        return step in self.steps.get(sha, {})
+
+    def result(self, sha, step):
+        return self.steps.get(sha, {}).get(step)
+
+    def close(self):
+        with self._lock:
+            self._fp.close()
+
+
+def find_unpublished(folder, manifest, pattern="*.csv"):
+    """Dataset files in `folder` whose registration is not in the manifest."""
+    paths = sorted(p for p in glob.glob(os.path.join(folder, pattern))
+                   if os.path.isfile(p) and not p.endswith(".car"))
+    return [p for p in paths if not manifest.done(manifest.sha256(p), "register")]
+
+
+class BulkPublisher:
+    def __init__(self, manifest, store=None):
+        if store is None:
+            import store
+        self.store = store
+        self.manifest = manifest
+        self.items = []
+
+    # each stage passes the item on; a failed item keeps flowing but is skipped
+    def _step(self, item, step, fn, *args):
+        if item.get("failed"):
+            return None
+        sha = item["sha256"]
+        if self.manifest.done(sha, step):
+            metrics.inc(f"publish.{step}.skipped")
+            return self.manifest.result(sha, step)
+        t0 = time.perf_counter()
+        try:
+            result = fn(*args)
+        except Exception as e:
+            metrics.inc(f"publish.{step}.errors")
+            logging.error(f"🚨 {step} failed for {item['path']}: {e}")
+            item["failed"] = f"{step}: {e}"
+            return None
+        metrics.observe(f"publish.{step}", time.perf_counter() - t0)
+        self.manifest.record("step", sha256=sha, step=step, path=item["path"], result=result)
+        return result
+
+    def _pin(self, item):
+        item["cid"] = self._step(item, "pin", self.store.pin_to_pinata, item["path"])
+        return item
+
+    def _car(self, item):
+        out = self._step(item, "car", self.store.make_car, item["path"])
+        if out is not None:
+            item["root"], item["shards"] = out
+        return item
+
+    def _upload(self, item):
+        if not item.get("failed"):
+            self._step(item, "upload", self.store.upload_car, item["root"], item["shards"])
+        return item
+
+    def _deal(self, item):
+        def deals():
+            responses = [self.store.create_deal(item["root"], cid)
+                         for cid, *_ in self.store.new_shards(item["shards"])]
+            try:
+                return responses[0][0]["p"]["out"]["dealId"]
+            except (LookupError, TypeError):
+                logging.warning(f"⚠️ Could not parse dealId for {item['path']}; defaulting to 0")
+                return 0
+
+        if not item.get("failed"):
+            item["deal_id"] = self._step(item, "deal", deals)
+        return item
+
+    def _entry(self, item):
+        from dataset_io import detect_format, preview_json, read_dataset
+        from merkle import dataset_root
+
+        df = read_dataset(item["path"])
+        return {
+            "root_cid": item["cid"],
+            "size": sum(size for *_, size in item["shards"]),
+            "deal_id": item["deal_id"],
+            "title": f"Twitter dump {os.path.basename(item['path'])}",
+            "description": f"{len(df)} tweets @ {datetime.now().isoformat()}",
+            "price": int(os.getenv("DATASET_PRICE_WEI", "0")),
+            "preview": preview_json(df, detect_format(item["path"]), merkle_root=dataset_root(item["path"])),
+        }
+
+    def _register(self, items):
+        todo = [i for i in items if not i.get("failed")
+                and not self.manifest.done(i["sha256"], "register")]
+        if not todo:
+            return items
+        t0 = time.perf_counter()
+        try:
+            # one mirror sync, one estimate batch and one send batch for all of them
+            sent = self.store.register_many([self._entry(i) for i in todo])
+        except Exception as e:
+            metrics.inc("publish.register.errors")
+            logging.error(f"🚨 register failed for {len(todo)} file(s): {e}")
+            for item in todo:
+                item["failed"] = f"register: {e}"
+            return items
+        metrics.observe("publish.register", time.perf_counter() - t0)
+        mirror = self.store.get_mirror()
+        for item in todo:
+            txh = sent.get(item["cid"])
+            # no tx hash: either already on chain (in the mirror) or rejected
+            if txh is None and item["cid"] not in mirror:
+                item["failed"] = "register: transaction rejected"
+                continue
+            self.manifest.record("step", sha256=item["sha256"], step="register",
+                                 path=item["path"], result=txh)
+        return items
+
+    def run(self, paths):
+        """Publish `paths` through the staged pipeline; returns the throughput report."""
+        pipeline = (Pipeline()
+                    .add("publish_pin", self._pin)
+                    .add("publish_car", self._car)
+                    .add("publish_upload", self._upload)
+                    .add("publish_deal", self._deal)
+                    .add("publish_register", self._register, batch=stage_batch("publish_register")))
+        t0 = time.perf_counter()
+        pipeline.start()
+        for path in paths:
+            item = {"path": path, "sha256": self.manifest.sha256(path), "bytes": os.path.getsize(path)}
+            self.items.append(item)
+            pipeline.put(item)
+        pipeline.close()
+        return self.report(time.perf_counter() - t0)
+
+    def report(self, elapsed):
+        done = [i for i in self.items if not i.get("failed")]
+        total = sum(i["bytes"] for i in done)
+        return {
+            "files": len(self.items),
+            "published": len(done),
+            "failed": {i["path"]: i["failed"] for i in self.items if i.get("failed")},
+            "bytes": total,
+            "seconds": elapsed,
+            "mb_per_s": total / elapsed / 1e6 if elapsed else 0.0,
+            "files_per_min": len(done) / elapsed * 60 if elapsed else 0.0,
+        }
+
+
+def publish_dir(folder, pattern="*.csv", manifest_path=None):
+    manifest = Manifest(manifest_path or os.getenv(
+        "PUBLISH_MANIFEST", os.path.join(folder, ".publish-manifest.jsonl")))
+    try:
+        paths = find_unpublished(folder, manifest, pattern)
+        logging.info(f"📚 {len(paths)} unpublished file(s) in {folder}")
+        return BulkPublisher(manifest).run(paths)
+    finally:
+        manifest.close()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO").upper(),
+                        format="%(asctime)s [%(levelname)s] %(message)s")
+    p = argparse.ArgumentParser(description="Publish every unpublished dataset in a directory")
+    p.add_argument("folder", nargs="?", default="./tweets/")
+    p.add_argument("--pattern", default="*.csv", help="glob for dataset files (default *.csv)")
+    p.add_argument("--manifest", help="manifest path (default <folder>/.publish-manifest.jsonl)")
+    args = p.parse_args()
+
+    rep = publish_dir(args.folder, args.pattern, args.manifest)
+    print(f"✅ Published {rep['published']}/{rep['files']} file(s), {rep['bytes'] / 1e6:.1f} MB "
+          f"in {rep['seconds']:.1f}s ({rep['mb_per_s']:.2f} MB/s, {rep['files_per_min']:.1f} files/min)")
+    for path, why in rep["failed"].items():
+        print(f"❌ {path}: {why}")
+    sys.exit(1 if rep["failed"] else 0)
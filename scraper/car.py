@@ -0,0 +1,549 @@
+# car.py
+#
+# Minimal CARv1 / UnixFS (dag-pb) support in pure Python: enough to read the
+# dataset CARs in ./tweets and to rebuild them byte-for-byte the way
+# `ipfs add` (CIDv0, 256 KiB chunks, balanced 174-link layout) +
+# `ipfs dag export` do, without an IPFS daemon.
+
+import os
+import hashlib
+
+CHUNK_SIZE = 262_144
+MAX_LINKS = 174
+
+DAG_PB = 0x70
+RAW = 0x55
+CAR_CODEC = 0x0202
+SHA2_256 = 0x12
+
+_B58 = "123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz"
+_B32 = "abcdefghijklmnopqrstuvwxyz234567"
+
+
+# ─── varints / multiformats ──────────────────────────────────────────────────
+
+def encode_varint(n: int) -> bytes:
+    out = bytearray()
+    while True:
+        b = n & 0x7F
+        n >>= 7
+        if n:
+            out.append(b | 0x80)
+        else:
+            out.append(b)
+            return bytes(out)
+
+
+def decode_varint(buf, pos=0):
+    """Return (value, new_pos)."""
+    n = shift = 0
+    while True:
+        b = buf[pos]
+        pos += 1
+        n |= (b & 0x7F) << shift
+        if not b & 0x80:
+            return n, pos
+        shift += 7
+
+
+def sha256_multihash(data) -> bytes:
+    return bytes([SHA2_256, 32]) + hashlib.sha256(data).digest()
+
+
+def cid_v0(block) -> bytes:
+    return sha256_multihash(block)
+
+
+def cid_v1(block, codec=DAG_PB) -> bytes:
+    return encode_varint(1) + encode_varint(codec) + sha256_multihash(block)
+
+
+def read_cid(buf, pos=0):
+    """Parse a binary CID starting at pos. Return (cid_bytes, new_pos)."""
+    if buf[pos] == SHA2_256 and buf[pos + 1] == 32:
+        return bytes(buf[pos:pos + 34]), pos + 34
+    start = pos
+    _version, pos = decode_varint(buf, pos)
+    _codec, pos = decode_varint(buf, pos)
+    _mh_code, pos = decode_varint(buf, pos)
+    mh_len, pos = decode_varint(buf, pos)
+    pos += mh_len
+    return bytes(buf[start:pos]), pos
+
+
+def cid_codec(cid: bytes) -> int:
+    if len(cid) == 34 and cid[0] == SHA2_256:
+        return DAG_PB
+    _version, pos = decode_varint(cid)
+    codec, _ = decode_varint(cid, pos)
+    return codec
+
+
+def cid_to_str(cid: bytes) -> str:
+    """Qm… (base58btc) for CIDv0, b… (base32 lower) for CIDv1."""
+    if len(cid) == 34 and cid[0] == SHA2_256:
+        n = int.from_bytes(cid, "big")
+        out = ""
+        while n:
+            n, r = divmod(n, 58)
+            out = _B58[r] + out
+        return "1" * (len(cid) - len(cid.lstrip(b"\0"))) + out
+    bits = "".join(f"{b:08b}" for b in cid)
+    bits += "0" * (-len(bits) % 5)
+    return "b" + "".join(_B32[int(bits[i:i + 5], 2)] for i in range(0, len(bits), 5))
+
+
+def cid_from_str(s: str) -> bytes:
+    if s.startswith("Qm"):
+        n = 0
+        for c in s:
+            n = n * 58 + _B58.index(c)
+        return n.to_bytes(34, "big")
+    if s.startswith("b"):
+        bits = "".join(f"{_B32.index(c):05b}" for c in s[1:])
+        return bytes(int(bits[i:i + 8], 2) for i in range(0, len(bits) - len(bits) % 8, 8))
+    raise ValueError(f"Unsupported CID encoding: {s}")
+
+
+# ─── protobuf (dag-pb / unixfs) ──────────────────────────────────────────────
+
+def _pb_bytes(field, data) -> bytes:
+    return encode_varint(field << 3 | 2) + encode_varint(len(data)) + bytes(data)
+
+
+def _pb_varint(field, n) -> bytes:
+    return encode_varint(field << 3) + encode_varint(n)
+
+
+def _pb_fields(buf):
+    """Yield (field_number, value) for a protobuf message (varint/bytes only)."""
+    pos = 0
+    while pos < len(buf):
+        key, pos = decode_varint(buf, pos)
+        field, wire = key >> 3, key & 7
+        if wire == 0:
+            value, pos = decode_varint(buf, pos)
+        elif wire == 2:
+            n, pos = decode_varint(buf, pos)
+            value, pos = buf[pos:pos + n], pos + n
+        else:
+            raise ValueError(f"Unsupported protobuf wire type {wire}")
+        yield field, value
+
+
+def encode_leaf(chunk) -> bytes:
+    """dag-pb node wrapping a UnixFS File leaf, as `ipfs add` writes with CIDv0."""
+    unixfs = _pb_varint(1, 2) + _pb_bytes(2, chunk) + _pb_varint(3, len(chunk))
+    return _pb_bytes(1, unixfs)
+
+
+def encode_parent(children) -> bytes:
+    """children: [(cid, tsize, filesize)] → dag-pb UnixFS File node linking them."""
+    links = b"".join(
+        _pb_bytes(2, _pb_bytes(1, cid) + _pb_bytes(2, b"") + _pb_varint(3, tsize))
+        for cid, tsize, _ in children
+    )
+    unixfs = _pb_varint(1, 2) + _pb_varint(3, sum(fs for _, _, fs in children))
+    unixfs += b"".join(_pb_varint(4, fs) for _, _, fs in children)
+    return links + _pb_bytes(1, unixfs)
+
+
+def decode_node(block):
+    """dag-pb block → (links [(cid, tsize)], unixfs_type, inline_data, blocksizes)."""
+    links, data = [], b""
+    for field, value in _pb_fields(block):
+        if field == 2:
+            cid, tsize = b"", 0
+            for f, v in _pb_fields(value):
+                if f == 1:
+                    cid = bytes(v)
+                elif f == 3:
+                    tsize = v
+            links.append((cid, tsize))
+        elif field == 1:
+            data = value
+    ftype, inline, blocksizes = None, b"", []
+    for field, value in _pb_fields(data):
+        if field == 1:
+            ftype = value
+        elif field == 2:
+            inline = value
+        elif field == 4:
+            blocksizes.append(value)
+    return links, ftype, inline, blocksizes
+
+
+# ─── FastCDC content-defined chunking ────────────────────────────────────────
+# Chunk boundaries depend on the content around them rather than on offsets,
+# so an insertion only changes the chunks it touches and the rest of a file
+# re-hashes to blocks that already exist.
+
+CDC_AVG_SIZE = 16_384
+
+
+def _gear_table():
+    import numpy as np
+    return np.array([int.from_bytes(hashlib.sha256(bytes([i])).digest()[:8], "big")
+                     for i in range(256)], dtype=np.uint64)
+
+
+def _top_mask(bits):
+    return ((1 << bits) - 1) << (64 - bits)
+
+
+def gear_hashes(data):
+    """
+    Gear rolling hash after every byte: h_i = (h_{i-1} << 1) + G[b_i] mod 2^64.
+    The shift pushes a byte out after 64 steps, so h_i is a sum over the last
+    64 bytes and can be computed for all positions in 64 vector passes.
+    """
+    import numpy as np
+
+    g = _gear_table()[np.frombuffer(bytes(data), dtype=np.uint8)]
+    h = g.copy()
+    for k in range(1, min(64, len(g))):
+        h[k:] += g[:-k] << np.uint64(k)
+    return h
+
+
+def fastcdc_chunks(data, avg_size=CDC_AVG_SIZE, min_size=None, max_size=None):
+    """
+    Split `data` with FastCDC normalized chunking: before avg_size a cut needs
+    one more zero hash bit than after it, which keeps chunk sizes close to
+    avg_size; min/max (default avg/4, avg*4) bound them.
+    """
+    import numpy as np
+
+    min_size = min_size or max(64, avg_size // 4)
+    max_size = max_size or avg_size * 4
+    n = len(data)
+    if n <= min_size:
+        return [bytes(data)]
+    bits = max(1, avg_size.bit_length() - 1)
+    h = gear_hashes(data)
+    # offsets of bytes after which a cut is allowed, under each mask
+    strict = np.flatnonzero((h & np.uint64(_top_mask(bits + 1))) == 0)
+    loose = np.flatnonzero((h & np.uint64(_top_mask(bits - 1))) == 0)
+    view = memoryview(data)
+    chunks = []
+    start = 0
+    while start < n:
+        if n - start <= min_size:
+            end = n
+        else:
+            lo, mid, hi = start + min_size, start + avg_size, min(start + max_size, n)
+            end = hi
+            i = np.searchsorted(strict, lo - 1)
+            if i < len(strict) and strict[i] < min(mid, hi) - 1:
+                end = int(strict[i]) + 1
+            else:
+                j = np.searchsorted(loose, min(mid, hi) - 1)
+                if j < len(loose) and loose[j] < hi - 1:
+                    end = int(loose[j]) + 1
+        chunks.append(bytes(view[start:end]))
+        start = end
+    return chunks
+
+
+# ─── UnixFS file DAG ─────────────────────────────────────────────────────────
+
+def fixed_chunks(data, size=CHUNK_SIZE):
+    for i in range(0, max(len(data), 1), size):
+        yield data[i:i + size]
+
+
+def build_leaves(chunks, raw_leaves=False):
+    """
+    Return (blocks, level): leaf blocks and their (cid, tsize, filesize) links.
+    raw_leaves stores chunks as raw CIDv1 blocks, as `ipfs add --raw-leaves`.
+    """
+    blocks = []
+    level = []
+    for chunk in chunks:
+        if raw_leaves:
+            block = bytes(chunk)
+            cid = cid_v1(block, RAW)
+        else:
+            block = encode_leaf(chunk)
+            cid = cid_v0(block)
+        blocks.append((cid, block))
+        level.append((cid, len(block), len(chunk)))
+    return blocks, level
+
+
+def build_parents(level, max_links=MAX_LINKS, cid_version=0):
+    """
+    Build the balanced parent layers over leaf links `level`.
+    Return (root_cid, parent_blocks), root last.
+    """
+    blocks = []
+    while len(level) > 1:
+        parents = []
+        for i in range(0, len(level), max_links):
+            group = level[i:i + max_links]
+            block = encode_parent(group)
+            cid = cid_v1(block) if cid_version else cid_v0(block)
+            blocks.append((cid, block))
+            parents.append((cid, len(block) + sum(t for _, t, _ in group),
+                            sum(fs for _, _, fs in group)))
+        level = parents
+    return level[0][0], blocks
+
+
+def build_file(chunks, max_links=MAX_LINKS, raw_leaves=False):
+    """
+    Build a balanced UnixFS file DAG over `chunks`.
+    Return (root_cid, blocks) with blocks as [(cid, bytes)], root last.
+    With raw_leaves the DAG is CIDv1 throughout (a single chunk is its own
+    raw root).
+    """
+    leaves, level = build_leaves(chunks, raw_leaves)
+    root, parents = build_parents(level, max_links, cid_version=1 if raw_leaves else 0)
+    return root, leaves + parents
+
+
+def build_file_from_path(path, chunk_size=CHUNK_SIZE):
+    with open(path, "rb") as f:
+        data = f.read()
+    return build_file(fixed_chunks(data, chunk_size))
+
+
+# ─── CARv1 ───────────────────────────────────────────────────────────────────
+
+def _cbor_head(major, n) -> bytes:
+    if n < 24:
+        return bytes([major << 5 | n])
+    for ai, width in ((24, 1), (25, 2), (26, 4), (27, 8)):
+        if n < 1 << (8 * width):
+            return bytes([major << 5 | ai]) + n.to_bytes(width, "big")
+    raise ValueError("CBOR length too large")
+
+
+def encode_header(roots) -> bytes:
+    """dag-cbor {"roots": [CID…], "version": 1}."""
+    out = _cbor_head(5, 2)
+    out += _cbor_head(3, 5) + b"roots" + _cbor_head(4, len(roots))
+    for cid in roots:
+        payload = b"\0" + cid
+        out += b"\xd8\x2a" + _cbor_head(2, len(payload)) + payload
+    out += _cbor_head(3, 7) + b"version" + b"\x01"
+    return encode_varint(len(out)) + out
+
+
+def _cbor_decode(buf, pos):
+    ib = buf[pos]
+    pos += 1
+    major, ai = ib >> 5, ib & 31
+    if ai < 24:
+        n = ai
+    else:
+        width = {24: 1, 25: 2, 26: 4, 27: 8}[ai]
+        n = int.from_bytes(buf[pos:pos + width], "big")
+        pos += width
+    if major == 0:
+        return n, pos
+    if major in (2, 3):
+        raw = bytes(buf[pos:pos + n])
+        return (raw.decode() if major == 3 else raw), pos + n
+    if major == 4:
+        items = []
+        for _ in range(n):
+            item, pos = _cbor_decode(buf, pos)
+            items.append(item)
+        return items, pos
+    if major == 5:
+        d = {}
+        for _ in range(n):
+            k, pos = _cbor_decode(buf, pos)
+            d[k], pos = _cbor_decode(buf, pos)
+        return d, pos
+    if major == 6:
+        value, pos = _cbor_decode(buf, pos)
+        return (value[1:] if n == 42 else value), pos
+    raise ValueError(f"Unsupported CBOR major type {major}")
+
+
+def read_header(buf):
+    """Return (header_dict, offset_of_first_block)."""
+    hlen, pos = decode_varint(buf)
+    header, _ = _cbor_decode(buf, pos)
+    return header, pos + hlen
+
+
+def iter_blocks(buf, pos):
+    """Yield (cid, block_memoryview, block_offset) for every section after pos."""
+    view = memoryview(buf)
+    while pos < len(buf):
+        slen, pos = decode_varint(buf, pos)
+        end = pos + slen
+        cid, data_pos = read_cid(buf, pos)
+        yield cid, view[data_pos:end], data_pos
+        pos = end
+
+
+def read_car(path):
+    """Return (roots, {cid: block_bytes})."""
+    with open(path, "rb") as f:
+        buf = f.read()
+    header, pos = read_header(buf)
+    return header["roots"], {cid: bytes(b) for cid, b, _ in iter_blocks(buf, pos)}
+
+
+def write_car(path, roots, blocks):
+    """Write a CARv1 with the given roots and (cid, bytes) blocks; return its size."""
+    size = 0
+    with open(path, "wb") as out:
+        size += out.write(encode_header(roots))
+        for cid, block in blocks:
+            size += out.write(encode_varint(len(cid) + len(block)))
+            size += out.write(cid)
+            size += out.write(block)
+    return size
+
+
+def car_cid(path) -> str:
+    """CIDv1 of a CAR file itself (codec 0x0202), as `ipfs-car hash` prints it."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for piece in iter(lambda: f.read(1 << 20), b""):
+            h.update(piece)
+    return cid_to_str(encode_varint(1) + encode_varint(CAR_CODEC) + bytes([SHA2_256, 32]) + h.digest())
+
+
+def file_bytes(root, blocks):
+    """Reassemble a UnixFS file from its root CID and a {cid: block} map."""
+    out = bytearray()
+    stack = [root]
+    while stack:
+        cid = stack.pop()
+        block = blocks[cid]
+        if cid_codec(cid) == RAW:
+            out += block
+            continue
+        links, _ftype, inline, _ = decode_node(block)
+        if links:
+            stack.extend(c for c, _ in reversed(links))
+        else:
+            out += inline
+    return bytes(out)
+
+
+# ─── sharded CARs ────────────────────────────────────────────────────────────
+# A large file's DAG is split across size-capped CARs the way the w3up client
+# shards uploads: leaf shards carry no root, a final shard holds the parent
+# nodes with the root in its header. Leaf shards are independent, so they are
+# hashed and written in parallel worker processes.
+
+SHARD_SIZE = 127 * 1024 * 1024
+# varint + CIDv0 + dag-pb/unixfs framing around each leaf chunk, rounded up
+_LEAF_OVERHEAD = 64
+
+
+def _write_leaf_shard(path, start, stop, chunk_size, out):
+    """Worker: leaves for chunks [start, stop) of `path` → one rootless CAR."""
+    with open(path, "rb") as f:
+        f.seek(start * chunk_size)
+        data = f.read((stop - start) * chunk_size)
+    blocks, level = build_leaves(fixed_chunks(data, chunk_size))
+    size = write_car(out, [], blocks)
+    return out, car_cid(out), size, level
+
+
+def build_shards(path, out_prefix=None, shard_size=SHARD_SIZE, chunk_size=CHUNK_SIZE, workers=None):
+    """
+    Write the UnixFS DAG of `path` as CARs of at most ~shard_size bytes.
+    Return (root_cid, [(car_cid, car_path, size)]) with the root shard last.
+    A file that fits in one shard gives a single CAR, identical to build_file.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    out_prefix = out_prefix or path
+    total = os.path.getsize(path)
+    n_chunks = max(1, -(-total // chunk_size))
+    per_shard = max(1, shard_size // (chunk_size + _LEAF_OVERHEAD))
+    if n_chunks <= per_shard:
+        root, blocks = build_file_from_path(path, chunk_size)
+        out = f"{out_prefix}.car"
+        size = write_car(out, [root], blocks)
+        return root, [(car_cid(out), out, size)]
+
+    ranges = [(i, min(i + per_shard, n_chunks)) for i in range(0, n_chunks, per_shard)]
+    with ProcessPoolExecutor(max_workers=min(workers or os.cpu_count() or 1, len(ranges))) as pool:
+        done = list(pool.map(_write_leaf_shard, *zip(*[
+            (path, a, b, chunk_size, f"{out_prefix}.{n}.car") for n, (a, b) in enumerate(ranges)])))
+    level = [link for *_, links in done for link in links]
+    root, parents = build_parents(level)
+    out = f"{out_prefix}.{len(ranges)}.car"
+    size = write_car(out, [root], parents)
+    return root, [(cid, p, s) for p, cid, s, _ in done] + [(car_cid(out), out, size)]
+
+
+def write_shards(root, blocks, out_prefix, shard_size=SHARD_SIZE):
+    """
+    Pack (cid, bytes) blocks, in order, into CARs of at most ~shard_size
+    bytes; only the last one names `root`. Return
+    [(car_cid, car_path, size, [block cids])].
+    """
+    groups, group, size = [], [], 0
+    for cid, block in blocks:
+        framed = len(encode_varint(len(cid) + len(block))) + len(cid) + len(block)
+        if group and size + framed > shard_size:
+            groups.append(group)
+            group, size = [], 0
+        group.append((cid, block))
+        size += framed
+    if group:
+        groups.append(group)
+    out = []
+    for n, group in enumerate(groups):
+        path = f"{out_prefix}.car" if len(groups) == 1 else f"{out_prefix}.{n}.car"
+        written = write_car(path, [root] if n == len(groups) - 1 else [], group)
+        out.append((car_cid(path), path, written, [cid for cid, _ in group]))
+    return out
+
+
+# ─── byte ranges of a UnixFS file ────────────────────────────────────────────
+
+def node_size(cid, block):
+    """File bytes under one DAG node (raw block, dag-pb leaf or parent)."""
+    if cid_codec(cid) == RAW:
+        return len(block)
+    links, _ftype, inline, blocksizes = decode_node(block)
+    return sum(blocksizes) if links else len(inline)
+
+
+def walk_range(root, get_block, start, end):
+    """
+    Yield (cid, block, piece) for the blocks needed to read file bytes
+    [start, end) below `root`, in DFS order: parents with piece None, then
+    the overlapping part of each leaf's data. `get_block(cid)` supplies blocks;
+    children outside the range are never requested.
+    """
+    stack = [(root, 0)]
+    while stack:
+        cid, offset = stack.pop()
+        block = get_block(cid)
+        if cid_codec(cid) == RAW:
+            data = block
+        else:
+            links, _ftype, data, blocksizes = decode_node(block)
+            if links:
+                yield cid, block, None
+                children = []
+                for (child, _), size in zip(links, blocksizes):
+                    if offset < end and offset + size > start:
+                        children.append((child, offset))
+                    offset += size
+                stack.extend(reversed(children))
+                continue
+        yield cid, block, data[max(start - offset, 0):max(end - offset, 0)]
+
+
+def read_range(root, get_block, start, end):
+    return b"".join(bytes(piece) for _, _, piece in walk_range(root, get_block, start, end)
+                    if piece is not None)
+
+
+def verify_block(cid, block):
+    """Whether `block` hashes to `cid` (sha2-256 multihash)."""
+    return cid[-32:] == hashlib.sha256(block).digest() and cid[-34] == SHA2_256
@@ -0,0 +1,261 @@
+# car_reader.py
+#
+# Random access into dataset CARs without loading them. The CAR is
+# memory-mapped; a CARv2-style IndexSorted index (multihash digest → section
+# offset) is built on first open and kept next to it as <car>.idx. Blocks are
+# memoryviews into the map, and the UnixFS payload is exposed as a seekable
+# file, so pandas/pyarrow pull only the blocks they read: a few rows touch a
+# few blocks, a full scan runs in constant memory.
+#
+#   with CarReader("tweets/2025-04-27_02-34-50_tweets_1-5.csv.car") as r:
+#       head = r.read_frame(nrows=5)
+#       for frame in r.iter_frames(chunksize=50_000):
+#           ...
+
+import io
+import os
+import mmap
+import bisect
+import struct
+import logging
+
+import car
+from dataset_io import detect_format
+
+INDEX_SORTED = 0x0400  # CARv2 index codec
+
+
+def encode_index(entries):
+    """
+    {digest: offset} → IndexSorted bytes, as go-car writes it: codec varint,
+    bucket count, then per digest width the entry width, byte length and
+    sorted digest||offset(u64le) entries.
+    """
+    widths = {}
+    for digest, offset in entries.items():
+        widths.setdefault(len(digest), []).append(digest + struct.pack("<Q", offset))
+    out = [car.encode_varint(INDEX_SORTED), struct.pack("<i", len(widths))]
+    for width in sorted(widths):
+        body = b"".join(sorted(widths[width]))
+        out.append(struct.pack("<Iq", width + 8, len(body)) + body)
+    return b"".join(out)
+
+
+def decode_index(buf):
+    codec, pos = car.decode_varint(buf)
+    if codec != INDEX_SORTED:
+        raise ValueError(f"Unsupported CAR index codec {codec:#x}")
+    (buckets,), pos = struct.unpack_from("<i", buf, pos), pos + 4
+    entries = {}
+    for _ in range(buckets):
+        width, length = struct.unpack_from("<Iq", buf, pos)
+        pos += 12
+        for at in range(pos, pos + length, width):
+            entries[bytes(buf[at:at + width - 8])] = struct.unpack_from("<Q", buf, at + width - 8)[0]
+        pos += length
+    return entries
+
+
+def _digest(cid):
+    """The multihash digest of a binary CID (what CARv2 indexes by)."""
+    if len(cid) == 34 and cid[0] == car.SHA2_256:
+        return bytes(cid[2:])
+    _version, pos = car.decode_varint(cid)
+    _codec, pos = car.decode_varint(cid, pos)
+    _code, pos = car.decode_varint(cid, pos)
+    length, pos = car.decode_varint(cid, pos)
+    return bytes(cid[pos:pos + length])
+
+
+class CarReader:
+    def __init__(self, path, index_path=None, write_index=True):
+        self.path = path
+        self.index_path = index_path or f"{path}.idx"
+        self._f = open(path, "rb")
+        self._mm = mmap.mmap(self._f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.buf = memoryview(self._mm)
+        header, self.data_start = car.read_header(self.buf)
+        self.roots = header["roots"]
+        self.index = self._load_index()
+        if self.index is None:
+            self.index = self.build_index()
+            if write_index:
+                try:
+                    with open(self.index_path, "wb") as f:
+                        f.write(encode_index(self.index))
+                except OSError as e:
+                    logging.warning(f"Could not write CAR index {self.index_path}: {e}")
+        self._layout = None
+
+    def close(self):
+        self._f.close()
+        try:
+            self.buf.release()
+            self._mm.close()
+        except BufferError:
+            # a caller still holds a block view; the map goes when that does
+            pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _load_index(self):
+        try:
+            if os.path.getmtime(self.index_path) < os.path.getmtime(self.path):
+                return None
+            with open(self.index_path, "rb") as f:
+                return decode_index(f.read())
+        except (OSError, ValueError, struct.error):
+            return None
+
+    def build_index(self):
+        """One pass over section headers only: {digest: offset from data start}."""
+        entries = {}
+        pos = self.data_start
+        end = len(self.buf)
+        while pos < end:
+            length, data = car.decode_varint(self.buf, pos)
+            cid, _ = car.read_cid(self.buf, data)
+            entries[_digest(cid)] = pos - self.data_start
+            pos = data + length
+        return entries
+
+    def __contains__(self, cid):
+        return _digest(cid) in self.index
+
+    def block(self, cid):
+        """The block for a binary CID, as a memoryview into the mapped CAR."""
+        pos = self.data_start + self.index[_digest(cid)]
+        length, data = car.decode_varint(self.buf, pos)
+        _, start = car.read_cid(self.buf, data)
+        return self.buf[start:data + length]
+
+    # ─── UnixFS payload ───────────────────────────────────────────────────────
+
+    def layout(self):
+        """[(payload offset, leaf cid, leaf size)] in file order; parents only are decoded."""
+        if self._layout is None:
+            out = []
+            stack = [(self.roots[0], None)]
+            offset = 0
+            while stack:
+                cid, size = stack.pop()
+                if car.cid_codec(cid) == car.RAW:
+                    size = len(self.block(cid)) if size is None else size
+                    out.append((offset, cid, size))
+                    offset += size
+                    continue
+                links, _ftype, inline, blocksizes = car.decode_node(self.block(cid))
+                if not links:
+                    out.append((offset, cid, len(inline)))
+                    offset += len(inline)
+                    continue
+                sizes = blocksizes if len(blocksizes) == len(links) else [None] * len(links)
+                stack.extend(reversed([(c, s) for (c, _), s in zip(links, sizes)]))
+            self._layout = out
+        return self._layout
+
+    def leaf_data(self, cid):
+        """The file bytes a leaf holds, as a memoryview (no copy)."""
+        block = self.block(cid)
+        if car.cid_codec(cid) == car.RAW:
+            return block
+        return car.decode_node(block)[2]
+
+    def open(self):
+        """The payload as a seekable binary file (io.BufferedReader)."""
+        return io.BufferedReader(PayloadFile(self), buffer_size=1 << 16)
+
+    def format(self):
+        with self.open() as f:
+            return detect_format(f)
+
+    def read_frame(self, nrows=None, columns=None):
+        """DataFrame of the payload (CSV/Parquet/Arrow), reading only what's needed."""
+        return read_frame(self.open, nrows, columns)
+
+    def iter_frames(self, chunksize=50_000, columns=None, limit=None):
+        """Yield DataFrames of up to `chunksize` rows; memory stays bounded by one chunk."""
+        return iter_frames(self.open, chunksize, columns, limit)
+
+
+# ─── frames over any seekable payload ────────────────────────────────────────
+# `opener()` returns a fresh seekable binary file; CarReader passes its mapped
+# payload, retrieve.py a file that fetches byte ranges from a gateway.
+
+def read_frame(opener, nrows=None, columns=None):
+    import pandas as pd
+
+    frames = list(iter_frames(opener, chunksize=nrows or 65_536, columns=columns, limit=nrows))
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=columns)
+
+
+def iter_frames(opener, chunksize=50_000, columns=None, limit=None):
+    with opener() as f:
+        fmt = detect_format(f)
+    seen = 0
+    if fmt == "csv":
+        import pandas as pd
+        with opener() as f:
+            for frame in pd.read_csv(f, chunksize=chunksize, usecols=columns, nrows=limit):
+                yield frame
+        return
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    with opener() as f:
+        if fmt == "parquet":
+            batches = pq.ParquetFile(f).iter_batches(batch_size=chunksize, columns=columns)
+        else:
+            reader = pa.ipc.open_file(f)
+            batches = (reader.get_batch(i) for i in range(reader.num_record_batches))
+        for batch in batches:
+            if columns and fmt == "arrow":
+                batch = batch.select(columns)
+            if limit is not None and seen + batch.num_rows > limit:
+                batch = batch.slice(0, limit - seen)
+            seen += batch.num_rows
+            yield batch.to_pandas()
+            if limit is not None and seen >= limit:
+                return
+
+
+class PayloadFile(io.RawIOBase):
+    """Seekable raw file over a CarReader's UnixFS payload; reads copy straight from the map."""
+
+    def __init__(self, reader):
+        self.reader = reader
+        self.leaves = reader.layout()
+        self.starts = [off for off, _, _ in self.leaves]
+        self.size = self.leaves[-1][0] + self.leaves[-1][2] if self.leaves else 0
+        self.pos = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self.pos
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        base = {io.SEEK_SET: 0, io.SEEK_CUR: self.pos, io.SEEK_END: self.size}[whence]
+        self.pos = max(0, base + offset)
+        return self.pos
+
+    def readinto(self, b):
+        out = memoryview(b).cast("B")
+        filled = 0
+        while filled < len(out) and self.pos < self.size:
+            i = bisect.bisect_right(self.starts, self.pos) - 1
+            start, cid, size = self.leaves[i]
+            data = self.reader.leaf_data(cid)
+            skip = self.pos - start
+            n = min(len(out) - filled, size - skip)
+            out[filled:filled + n] = data[skip:skip + n]
+            filled += n
+            self.pos += n
+        return filled
@@ -0,0 +1,244 @@
+import os
+import sys
+import json
+
+import pytest
+
+# scraper modules use flat imports (they run as `python scraper`), so make the
+# package directory importable when the tests are collected by pytest.
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _quantities(value):
+    """eth-tester results carry plain ints; a node sends hex quantities."""
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, int):
+        return hex(value)
+    if isinstance(value, list):
+        return [_quantities(v) for v in value]
+    if isinstance(value, dict):
+        return {k: v if k in ("id", "code") else _quantities(v) for k, v in value.items()}
+    return value
+
+
+class DevRPC:
+    """
+    JSON-RPC over HTTP in front of an eth-tester chain, for tests of code
+    that talks to a real RPC URL. Records every request body it receives;
+    `fail` makes the next N requests return HTTP `fail_status` (503).
+    """
+
+    def __init__(self):
+        import http.server
+        import threading
+        from web3 import EthereumTesterProvider, Web3
+
+        self.w3 = Web3(EthereumTesterProvider())
+        self.requests = []
+        self.fail = 0
+        self.fail_status = 503
+        self._lock = threading.Lock()
+        dev = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                status, out = dev._dispatch(body)
+                data = json.dumps(out).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+        self.server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+
+    def _dispatch(self, body):
+        from web3 import Web3
+
+        with self._lock:
+            self.requests.append(body)
+            if self.fail:
+                self.fail -= 1
+                return self.fail_status, {"error": "unavailable"}
+            calls = body if isinstance(body, list) else [body]
+            out = []
+            for req in calls:
+                try:
+                    resp = dict(self.w3.manager._make_request(req["method"], req.get("params", [])))
+                except Exception as e:
+                    # eth-tester raises on reverts where a node answers with an error object
+                    resp = {"error": {"code": 3, "message": str(e)}}
+                resp.update(id=req.get("id"), jsonrpc="2.0")
+                out.append(_quantities(json.loads(Web3.to_json(resp))))
+        return 200, out if isinstance(body, list) else out[0]
+
+    def deploy(self, artifact, *args):
+        """Deploy a Hardhat artifact (path relative to the repo root) from account 0."""
+        with open(os.path.join(ROOT, artifact)) as f:
+            art = json.load(f)
+        factory = self.w3.eth.contract(abi=art["abi"], bytecode=art["bytecode"])
+        txh = factory.constructor(*args).transact({"from": self.w3.eth.accounts[0]})
+        address = self.w3.eth.wait_for_transaction_receipt(txh).contractAddress
+        return self.w3.eth.contract(address=address, abi=art["abi"])
+
+    def calls(self):
+        """Flat list of JSON-RPC method names received, batches expanded."""
+        return [r["method"] for body in self.requests
+                for r in (body if isinstance(body, list) else [body])]
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class LocalGateway:
+    """
+    Stand-in IPFS HTTP gateway over in-memory UnixFS DAGs: plain GETs with
+    Range support, and trustless ?format=car responses for dag-scope=block,
+    dag-scope=entity (with entity-bytes) and dag-scope=all. `car=False`
+    rejects format=car like a gateway without trustless support. Counts the
+    body bytes it sends in `sent`.
+    """
+
+    def __init__(self, car=True):
+        import http.server
+        import threading
+        from urllib.parse import parse_qs, urlparse
+
+        self.dags = {}
+        self.car = car
+        self.sent = 0
+        self.requests = []
+        gw = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _reply(self, status, body=b"", headers=()):
+                self.send_response(status)
+                for k, v in headers:
+                    self.send_header(k, v)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                if self.command != "HEAD":
+                    self.wfile.write(body)
+                    gw.sent += len(body)
+
+            def do_HEAD(self):
+                self.do_GET()
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                gw.requests.append((self.command, self.path, self.headers.get("Range")))
+                cid = url.path.rsplit("/", 1)[-1]
+                if cid not in gw.dags:
+                    return self._reply(404)
+                query = {k: v[0] for k, v in parse_qs(url.query).items()}
+                if query.get("format") == "car":
+                    if not gw.car:
+                        return self._reply(400, b"format=car not supported")
+                    return self._reply(200, gw.car_for(cid, query),
+                                       [("Content-Type", "application/vnd.ipld.car")])
+                data = gw.dags[cid][2]
+                rng = self.headers.get("Range")
+                if not rng:
+                    return self._reply(200, data)
+                first, last = rng.split("=", 1)[1].split("-")
+                if not first:
+                    first, last = max(len(data) - int(last), 0), len(data) - 1
+                first, last = int(first), min(int(last or len(data) - 1), len(data) - 1)
+                self._reply(206, data[first:last + 1],
+                            [("Content-Range", f"bytes {first}-{last}/{len(data)}")])
+
+        self.server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+        self.template = self.url + "/ipfs/{}"
+
+    def add(self, data, raw_leaves=False):
+        import car
+
+        chunks = car.fastcdc_chunks(data) if raw_leaves else car.fixed_chunks(data)
+        root, blocks = car.build_file(chunks, raw_leaves=raw_leaves)
+        cid = car.cid_to_str(root)
+        self.dags[cid] = (root, dict(blocks), data)
+        return cid
+
+    def car_for(self, cid, query):
+        import os
+        import tempfile
+        import car
+
+        root, blocks, data = self.dags[cid]
+        scope = query.get("dag-scope", "all")
+        if scope == "block":
+            picked = [(root, blocks[root])]
+        else:
+            start, end = 0, len(data)
+            if scope == "entity" and "entity-bytes" in query:
+                first, last = query["entity-bytes"].split(":")
+                start = int(first)
+                end = len(data) if last == "*" else int(last) + 1
+            picked = [(c, b) for c, b, _ in car.walk_range(root, blocks.__getitem__, start, end)]
+        fd, path = tempfile.mkstemp(suffix=".car")
+        os.close(fd)
+        try:
+            car.write_car(path, [root], picked)
+            with open(path, "rb") as f:
+                return f.read()
+        finally:
+            os.remove(path)
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def gateway():
+    server = LocalGateway()
+    yield server
+    server.close()
+
+
+@pytest.fixture
+def dev_rpc():
+    pytest.importorskip("eth_tester")
+    server = DevRPC()
+    yield server
+    server.close()
+
+
+@pytest.fixture
+def governor(dev_rpc):
+    """TruthAnchorGovernor with two Twitter-handle proposals; (HTTP contract, proposal IDs)."""
+    import rpc
+
+    w3 = dev_rpc.w3
+    me = w3.eth.accounts[0]
+    token = dev_rpc.deploy("artifacts/Governance_token.sol/TruthToken.json", me, me)
+    timelock = dev_rpc.deploy("artifacts/Timelock_Controller.sol/MyTimelockController.json", 0, [], [])
+    gov = dev_rpc.deploy("artifacts/Governor.sol/TruthAnchorGovernor.json", token.address, timelock.address)
+    token.functions.delegate(me).transact({"from": me})
+    w3.testing.mine(1)  # votes count from the block after delegation
+    ids = []
+    for handle in ("flarenetworks", "filecoin"):
+        ids.append(gov.functions.proposeTwitterHandle(handle).call({"from": me}))
+        gov.functions.proposeTwitterHandle(handle).transact({"from": me})
+    # the same contract, read through the pooled HTTP client
+    http = rpc.get_web3(urls=[dev_rpc.url])
+    return http.eth.contract(address=gov.address, abi=gov.abi), ids
@@ -0,0 +1,157 @@
+# daemon.py
+#
+# Long-running service mode: `python scraper --daemon jobs.json`.
+# Imports, ABIs, browsers and Twitter sessions are set up once; after that
+# each scheduled job only scrapes, scores and publishes.
+
+import signal
+import logging
+import threading
+
+import metrics
+from journal import Journal
+from scheduler import Scheduler, load_jobs
+
+# Per-job keys understood by ScraperWorker.run (see sample-jobs.json).
+JOB_DEFAULTS = {
+    "tweets": 50,
+    "query": None,
+    "hashtag": None,
+    "username": None,
+    "latest": True,
+    "top": False,
+    "poster_details": False,
+    "format": "csv",
+    "publish_dataset": True,
+    "ftso": None,  # this job's MockTwitterFTSO address (default TWITTER_FTSO_ADDR)
+}
+
+
+class ScraperWorker:
+    """A Twitter_Scraper with a logged-in browser, reused across jobs."""
+
+    def __init__(self, mail, username, password, headless, proxy=None, metrics_out=None):
+        self.mail = mail
+        self.username = username
+        self.password = password
+        self.headless = headless
+        self.proxy = proxy
+        self.metrics_out = metrics_out
+        self.scraper = None
+        self.broken = False
+
+    def _ensure_scraper(self):
+        if self.scraper is None:
+            from twitter_scraper import Twitter_Scraper
+            self.scraper = Twitter_Scraper(
+                mail=self.mail, username=self.username, password=self.password,
+                headlessState=self.headless, proxy=self.proxy,
+            )
+            self.scraper.login()
+        return self.scraper
+
+    def run(self, job):
+        params = {**JOB_DEFAULTS, **job.params}
+        try:
+            scraper = self._ensure_scraper()
+        except (Exception, SystemExit):
+            # never logged in: drop the browser so the next job starts clean
+            self.broken = True
+            raise
+        journal = Journal.new(name=job.name)
+        journal.record("config", config={
+            "tweets": params["tweets"], "no_tweets_limit": False,
+            "username": params["username"], "hashtag": params["hashtag"],
+            "bookmarks": False, "query": params["query"],
+            "latest": params["latest"], "top": params["top"],
+            "add": "pd" if params["poster_details"] else "", "format": params["format"],
+        })
+        scraper.journal = journal
+        scraper.output_format = params["format"]
+        # each job is its own feed, so jobs never judge deviation against another's score
+        scraper.feed = job.name
+        scraper.ftso_address = params["ftso"]
+        try:
+            scraper.scrape_tweets(
+                max_tweets=params["tweets"],
+                scrape_username=params["username"],
+                scrape_hashtag=params["hashtag"],
+                scrape_query=params["query"],
+                scrape_latest=params["latest"],
+                scrape_top=params["top"],
+                scrape_poster_details=params["poster_details"],
+            )
+            if not scraper.data:
+                logging.warning(f"{job.name}: no tweets scraped; nothing to publish")
+                return
+            scraper.save_to_csv(publish_dataset=params["publish_dataset"])
+        except Exception:
+            if not self._browser_alive():
+                self.broken = True
+            raise
+        finally:
+            journal.close()
+            if self.metrics_out:
+                # refreshed after every job so the textfile collector sees live numbers
+                metrics.export(self.metrics_out)
+        if not self._browser_alive():
+            self.broken = True
+
+    def _browser_alive(self):
+        try:
+            self.scraper.driver.current_url
+            return True
+        except Exception:
+            return False
+
+    def close(self):
+        if self.scraper is not None:
+            try:
+                self.scraper.driver.quit()
+            finally:
+                self.scraper = None
+
+
+def warm_up(publish_dataset=True):
+    """
+    Import the heavy modules and build the web3 clients up front. They are
+    lazy for one-off runs; a daemon would rather fail fast on bad config.
+    """
+    with metrics.timed("daemon.warm_up"):
+        import pandas  # noqa: F401
+        import twitter_scraper  # noqa: F401
+        import ai_analysis  # noqa: F401
+        import ai_coin_identifier  # noqa: F401
+        import ftso_push
+        import ftso_price
+        ftso_push.get_client()
+        ftso_price.get_consumer()
+        if publish_dataset:
+            import store
+            store.get_chain()
+
+
+def serve(jobs_path, mail, username, password, headless, concurrency=1,
+          metrics_out=None, once=False):
+    jobs = load_jobs(jobs_path)
+    publish = any(j.params.get("publish_dataset", JOB_DEFAULTS["publish_dataset"]) for j in jobs)
+    warm_up(publish)
+    logging.info(f"Daemon: {len(jobs)} jobs, concurrency={concurrency}: {jobs}")
+
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+
+    def make_worker():
+        return ScraperWorker(mail, username, password, headless, metrics_out=metrics_out)
+
+    scheduler = Scheduler(jobs, make_worker, concurrency=concurrency)
+    try:
+        scheduler.run(stop, max_runs=1 if once else None)
+    except KeyboardInterrupt:
+        print("\nDaemon stopped.")
+        stop.set()
+    for row in scheduler.status():
+        logging.info(f"Daemon job status: {row}")
+    # release the pooled RPC connections opened by warm_up
+    import rpc
+    rpc.close()
@@ -0,0 +1,178 @@
+# dataset_io.py
+#
+# Writes/reads tweet datasets as CSV, zstd-compressed Parquet or Arrow IPC.
+# Parquet/Arrow need pyarrow (pip install pyarrow).
+
+import ast
+import json
+import os
+
+import pandas as pd
+
+FORMATS = ("csv", "parquet", "arrow")
+EXTENSIONS = {"csv": ".csv", "parquet": ".parquet", "arrow": ".arrow"}
+
+# Column name → Arrow type name. Fixed so every dump has the same schema
+# regardless of which columns happened to be empty in a run.
+SCHEMA_COLUMNS = (
+    ("Name",                "string"),
+    ("Handle",              "string"),
+    ("Timestamp",           "string"),
+    ("Verified",            "bool"),
+    ("Content",             "string"),
+    ("Comments",            "int64"),
+    ("Retweets",            "int64"),
+    ("Likes",               "int64"),
+    ("Analytics",           "int64"),
+    ("Tags",                "list<string>"),
+    ("Mentions",            "list<string>"),
+    ("Profile Image",       "string"),
+    ("Tweet Link",          "string"),
+    ("Tweet ID",            "string"),
+    ("IPFS Screenshot",     "string"),
+    ("Deletion Likelihood", "float64"),
+    ("Coin",                "string"),
+    ("Cluster ID",          "int64"),
+)
+ZSTD_LEVEL = int(os.getenv("DATASET_ZSTD_LEVEL", "9"))
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+        import pyarrow.ipc
+    except ImportError:
+        raise ImportError("Parquet/Arrow output needs pyarrow: pip install pyarrow")
+    return pyarrow
+
+
+def arrow_schema():
+    pa = _pyarrow()
+    types = {
+        "string": pa.string(),
+        "bool": pa.bool_(),
+        "int64": pa.int64(),
+        "float64": pa.float64(),
+        "list<string>": pa.list_(pa.string()),
+    }
+    return pa.schema([(name, types[t]) for name, t in SCHEMA_COLUMNS])
+
+
+def _as_list(value):
+    # Tags/Mentions come back from a CSV as their repr, e.g. "['#ETH']"
+    if isinstance(value, str):
+        try:
+            value = ast.literal_eval(value)
+        except (ValueError, SyntaxError):
+            return [value] if value else []
+    if value is None or (isinstance(value, float) and pd.isna(value)):
+        return []
+    return [str(v) for v in value]
+
+
+def to_table(df: pd.DataFrame):
+    """DataFrame → pyarrow Table with the fixed dataset schema."""
+    pa = _pyarrow()
+    schema = arrow_schema()
+    arrays = []
+    for field in schema:
+        if field.name not in df:
+            arrays.append(pa.nulls(len(df), type=field.type))
+            continue
+        col = df[field.name]
+        if pa.types.is_list(field.type):
+            col = col.map(_as_list)
+        elif pa.types.is_string(field.type):
+            col = col.where(col.isna(), col.astype(str))
+        arrays.append(pa.array(col, type=field.type, from_pandas=True))
+    return pa.Table.from_arrays(arrays, schema=schema)
+
+
+def write_dataset(df: pd.DataFrame, base_path: str, fmt: str = "csv") -> str:
+    """Write df to base_path + the format's extension and return the path."""
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown dataset format {fmt!r}; expected one of {FORMATS}")
+    path = base_path + EXTENSIONS[fmt]
+    if fmt == "csv":
+        df.to_csv(path, index=False, encoding="utf-8")
+    elif fmt == "parquet":
+        pa = _pyarrow()
+        pa.parquet.write_table(to_table(df), path, compression="zstd",
+                               compression_level=ZSTD_LEVEL)
+    else:
+        pa = _pyarrow()
+        table = to_table(df)
+        options = pa.ipc.IpcWriteOptions(compression="zstd")
+        with pa.OSFile(path, "wb") as sink:
+            with pa.ipc.new_file(sink, table.schema, options=options) as writer:
+                writer.write_table(table)
+    return path
+
+
+def detect_format(source) -> str:
+    """
+    Sniff a dataset format from its magic bytes (falls back to csv). `source`
+    is a path, or a binary file positioned at the start of the payload.
+    """
+    if hasattr(source, "read"):
+        head = source.read(6)
+    else:
+        with open(source, "rb") as f:
+            head = f.read(6)
+    if head[:4] == b"PAR1":
+        return "parquet"
+    if head == b"ARROW1":
+        return "arrow"
+    return "csv"
+
+
+def read_dataset(path: str, columns=None) -> pd.DataFrame:
+    """Read any dataset format; Parquet/Arrow only decode the requested columns."""
+    path = os.fspath(path)
+    fmt = detect_format(path)
+    if fmt == "parquet":
+        return _pyarrow().parquet.read_table(path, columns=columns).to_pandas()
+    if fmt == "arrow":
+        pa = _pyarrow()
+        with pa.memory_map(path, "r") as source:
+            table = pa.ipc.open_file(source).read_all()
+        return (table.select(columns) if columns else table).to_pandas()
+    return pd.read_csv(path, usecols=columns)
+
+
+def preview_json(df: pd.DataFrame, fmt: str, rows: int = 2, merkle_root: str = None) -> str:
+    """The registry `preview` string: format tag, the first rows and the row commitment."""
+    preview = {
+        "format": fmt,
+        "rows": json.loads(df.head(rows).to_json(orient="records")),
+    }
+    if merkle_root:
+        preview["merkle_root"] = merkle_root
+    return json.dumps(preview)
+
+
+ID_PREFIX = "tweet_id:"  # how record.to_frame writes Tweet IDs
+
+
+def id_order(value) -> tuple:
+    """
+    Sort key for a Tweet ID: numeric IDs (bare or "tweet_id:N") compare as
+    numbers, by length first; anything else sorts after them as text.
+    """
+    value = str(value)
+    digits = value[len(ID_PREFIX):] if value.startswith(ID_PREFIX) else value
+    return (0, len(digits), digits) if digits.isdigit() else (1, 0, value)
+
+
+def sort_rows(df: pd.DataFrame, key: str = "Tweet ID") -> pd.DataFrame:
+    """
+    df with its rows in a stable order by `key` (id_order), index reset.
+    Overlapping scrapes then share runs of identical rows, which
+    content-defined chunking turns into shared blocks. A frame without the key
+    column is returned as is.
+    """
+    if key not in df:
+        return df
+    keys = [id_order(v) for v in df[key].tolist()]
+    return df.iloc[sorted(range(len(df)), key=keys.__getitem__)].reset_index(drop=True)
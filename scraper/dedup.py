@@ -0,0 +1,119 @@
+# dedup.py
+#
+# Near-duplicate tweet clustering with MinHash + LSH banding. Copy-trading
+# signals and spam campaigns repeat the same text with different numbers,
+# links or mentions; after normalisation they land in the same cluster, and
+# only the first member (the representative) is sent to the LLM.
+#
+#   index = NearDupIndex()
+#   cid = index.add(idx, text)        # cluster id == representative's idx
+
+import re
+import zlib
+import threading
+
+import numpy as np
+
+import metrics
+
+NUM_PERM = 64
+BANDS = 16            # 16 bands × 4 rows: pairs above ~0.5 Jaccard collide
+THRESHOLD = 0.6       # estimated Jaccard needed to join a cluster
+
+_MERSENNE = (1 << 61) - 1
+_URL = re.compile(r"https?://\S+|www\.\S+")
+_MENTION = re.compile(r"@\w+")
+_NUMBER = re.compile(r"\d+(?:[.,]\d+)*[x×%k]?\b")
+_JUNK = re.compile(r"[^\w#$/]+")
+
+
+def normalize(text):
+    """Lowercase, drop links and @mentions, fold every number to 0."""
+    text = _URL.sub(" ", str(text).lower())
+    text = _MENTION.sub(" ", text)
+    text = _NUMBER.sub("0", text)
+    return " ".join(_JUNK.sub(" ", text).split())
+
+
+def shingles(text, k=2):
+    """Word k-grams of the normalised text (single words for short tweets)."""
+    words = normalize(text).split()
+    if len(words) < k:
+        return set(words)
+    return {" ".join(words[i:i + k]) for i in range(len(words) - k + 1)}
+
+
+class MinHasher:
+    def __init__(self, num_perm=NUM_PERM, seed=1):
+        rng = np.random.RandomState(seed)
+        self.a = rng.randint(1, _MERSENNE, size=num_perm, dtype=np.int64).astype(np.uint64)
+        self.b = rng.randint(0, _MERSENNE, size=num_perm, dtype=np.int64).astype(np.uint64)
+
+    def signature(self, tokens):
+        if not tokens:
+            return np.full(len(self.a), np.iinfo(np.uint64).max, dtype=np.uint64)
+        h = np.fromiter((zlib.crc32(t.encode()) for t in tokens), dtype=np.uint64, count=len(tokens))
+        # (a·h + b) mod p for every (perm, token) pair; a·h may wrap mod
+        # 2^64 first, which is still a good enough hash family here
+        perm = (np.outer(self.a, h) + self.b[:, None]) % np.uint64(_MERSENNE)
+        return perm.min(axis=1)
+
+
+class NearDupIndex:
+    """Incremental LSH index: each added text joins a cluster or starts one."""
+
+    def __init__(self, num_perm=NUM_PERM, bands=BANDS, threshold=THRESHOLD):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.hasher = MinHasher(num_perm)
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.threshold = threshold
+        self._buckets = [dict() for _ in range(bands)]
+        self._sigs = {}
+        self.cluster_of = {}
+        self.members = {}
+        self._lock = threading.Lock()
+
+    def _band_keys(self, sig):
+        return [sig[i * self.rows:(i + 1) * self.rows].tobytes() for i in range(self.bands)]
+
+    def add(self, key, text):
+        """Index `text` under `key`; return its cluster id."""
+        tokens = shingles(text)
+        sig = self.hasher.signature(tokens)
+        with self._lock:
+            if key in self.cluster_of:
+                return self.cluster_of[key]
+            keys = self._band_keys(sig)
+            best, best_sim = None, 0.0
+            if tokens:
+                candidates = set()
+                for band, k in zip(self._buckets, keys):
+                    candidates.update(band.get(k, ()))
+                for other in candidates:
+                    sim = float(np.mean(self._sigs[other] == sig))
+                    if sim > best_sim:
+                        best, best_sim = other, sim
+            if best is not None and best_sim >= self.threshold:
+                cluster = self.cluster_of[best]
+                metrics.inc("dedup.duplicates")
+            else:
+                cluster = key
+                self.members[cluster] = []
+            self.cluster_of[key] = cluster
+            self.members[cluster].append(key)
+            self._sigs[key] = sig
+            if tokens:
+                for band, k in zip(self._buckets, keys):
+                    band.setdefault(k, []).append(key)
+            return cluster
+
+    def is_representative(self, key):
+        return self.cluster_of.get(key, key) == key
+
+    def size(self, key):
+        return len(self.members.get(self.cluster_of.get(key, key), [key]))
+
+    def __len__(self):
+        return len(self.cluster_of)
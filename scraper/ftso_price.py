@@ -1,34 +1,62 @@
 import os
 import json
+import threading
 from datetime import datetime
-from dotenv import load_dotenv
-from web3 import Web3
 
-load_dotenv()
+import metrics
 
-RPC_URL         = os.getenv("COSTON2_RPC_URL")
-CONSUMER_ADDR   = os.getenv("FTSO_CONSUMER_ADDRESS")
-ABI_PATH        = os.getenv("FTSO_CONSUMER_ABI_PATH", "artifacts/FTSOConsumer.sol/FTSOConsumer.json")
+# Built on first use (get_consumer) so importing needs no COSTON2 config.
+# Both clients ride the shared pooled provider in rpc.py (COSTON2_RPC_URL may
+# list several comma-separated URLs for failover).
+_consumer = None
+_async_consumer = None
+_consumer_lock = threading.Lock()
 
-if not all([RPC_URL, CONSUMER_ADDR]):
-    raise EnvironmentError("COSTON2_RPC_URL & FTSO_CONSUMER_ADDRESS must be set")
 
-w3_price = Web3(Web3.HTTPProvider(RPC_URL))
+def _consumer_config():
+    from dotenv import load_dotenv
 
-with open(ABI_PATH) as f:
-    consumer_abi = json.load(f)["abi"]
+    load_dotenv()
+    consumer_addr = os.getenv("FTSO_CONSUMER_ADDRESS")
+    abi_path = os.getenv("FTSO_CONSUMER_ABI_PATH", "artifacts/FTSOConsumer.sol/FTSOConsumer.json")
+    if not all([os.getenv("COSTON2_RPC_URL"), consumer_addr]):
+        raise EnvironmentError("COSTON2_RPC_URL & FTSO_CONSUMER_ADDRESS must be set")
+    with open(abi_path) as f:
+        consumer_abi = json.load(f)["abi"]
+    return consumer_addr, consumer_abi
 
-_consumer = w3_price.eth.contract(
-    address=w3_price.to_checksum_address(CONSUMER_ADDR),
-    abi=consumer_abi
-)
 
-def fetch_all_feeds():
-    """
-    Returns dict: symbol → (price_float, iso_timestamp_str)
-    where price_float is price / 1e18 and ISO timestamp is UTC.
-    """
-    symbols_b32, prices_raw, tss_raw = _consumer.functions.fetchAllFeeds().call()
+def get_consumer():
+    """Return the FTSOConsumer contract, creating the Web3 client once."""
+    global _consumer
+    with _consumer_lock:
+        if _consumer is None:
+            import rpc
+
+            consumer_addr, consumer_abi = _consumer_config()
+            w3_price = rpc.get_web3("COSTON2_RPC_URL")
+            _consumer = w3_price.eth.contract(
+                address=w3_price.to_checksum_address(consumer_addr),
+                abi=consumer_abi
+            )
+        return _consumer
+
+
+def get_async_consumer():
+    """FTSOConsumer on AsyncWeb3, for reads overlapped with other work (rpc.submit)."""
+    global _async_consumer
+    with _consumer_lock:
+        if _async_consumer is None:
+            import rpc
+
+            consumer_addr, consumer_abi = _consumer_config()
+            aw3 = rpc.get_async_web3("COSTON2_RPC_URL")
+            _async_consumer = aw3.eth.contract(address=aw3.to_checksum_address(consumer_addr),
+                                               abi=consumer_abi)
+        return _async_consumer
+
+
+def _feed_map(symbols_b32, prices_raw, tss_raw):
     mapping = {}
     for b32, raw_p, raw_ts in zip(symbols_b32, prices_raw, tss_raw):
         sym = b32.decode("utf-8").rstrip("\x00")
@@ -37,6 +65,21 @@ def fetch_all_feeds():
         mapping[sym] = (price, iso_ts)
     return mapping
 
+
+@metrics.timed("rpc.fetch_all_feeds")
+def fetch_all_feeds():
+    """
+    Returns dict: symbol → (price_float, iso_timestamp_str)
+    where price_float is price / 1e18 and ISO timestamp is UTC.
+    """
+    return _feed_map(*get_consumer().functions.fetchAllFeeds().call())
+
+
+async def fetch_all_feeds_async():
+    """fetch_all_feeds() as a coroutine on the RPC loop."""
+    with metrics.timed("rpc.fetch_all_feeds"):
+        return _feed_map(*await get_async_consumer().functions.fetchAllFeeds().call())
+
 def get_price_for(symbol: str):
     """
     Fetches all feeds once, then returns (price, ts) for the given symbol.
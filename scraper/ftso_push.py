@@ -1,42 +1,118 @@
 import os
 import json
-from dotenv import load_dotenv
-from web3 import Web3
+import logging
+import threading
 
-load_dotenv()
+import metrics
+from publish_policy import get_policy
 
-RPC_URL          = os.getenv("FLARE_RPC_URL")
-PRIVATE_KEY      = os.getenv("FLARE_PRIVATE_KEY")
-TWITTER_FTSO     = os.getenv("TWITTER_FTSO_ADDR")
-ABI_PATH         = os.getenv("TWITTER_FTSO_ABI_PATH", "artifacts/MockFTSO.sol/MockTwitterFTSO.json")
+# Web3, the account and the contract are built on first use (get_client), so
+# importing this module needs neither web3 nor any FLARE_* configuration.
+_client = None
+_client_lock = threading.Lock()
 
-if not all([RPC_URL, PRIVATE_KEY, TWITTER_FTSO]):
-    raise EnvironmentError("FLARE_RPC_URL, FLARE_PRIVATE_KEY & TWITTER_FTSO_ADDR must be set")
+# nonce lookup → send must not interleave when daemon jobs publish concurrently
+_tx_lock = threading.Lock()
+# decide → send → record must not interleave either, or two jobs both publish
+_publish_lock = threading.Lock()
+# MockTwitterFTSO contracts by address (one per coin/job), on the shared client
+_contracts = {}
+# address → the feed pushing to it, to catch jobs sharing one contract
+_claims = {}
 
-# Web3 setup
-w3_push = Web3(Web3.HTTPProvider(RPC_URL))
-_account = w3_push.eth.account.from_key(PRIVATE_KEY)
 
-with open(ABI_PATH) as f:
-    _ftso_abi = json.load(f)["abi"]
+def get_client():
+    """Return (w3, account, contract) for the Twitter FTSO, creating them once."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            import rpc
+            from dotenv import load_dotenv
 
-_ftso = w3_push.eth.contract(
-    address=w3_push.to_checksum_address(TWITTER_FTSO),
-    abi=_ftso_abi
-)
+            load_dotenv()
+            rpc_url = os.getenv("FLARE_RPC_URL")
+            private_key = os.getenv("FLARE_PRIVATE_KEY")
+            twitter_ftso = os.getenv("TWITTER_FTSO_ADDR")
+            abi_path = os.getenv("TWITTER_FTSO_ABI_PATH", "artifacts/MockFTSO.sol/MockTwitterFTSO.json")
+            if not all([rpc_url, private_key, twitter_ftso]):
+                raise EnvironmentError("FLARE_RPC_URL, FLARE_PRIVATE_KEY & TWITTER_FTSO_ADDR must be set")
 
-def push_aggregated_score(score: int) -> str:
+            # pooled keep-alive session with failover across comma-separated URLs
+            w3 = rpc.get_web3("FLARE_RPC_URL")
+            account = w3.eth.account.from_key(private_key)
+            with open(abi_path) as f:
+                abi = json.load(f)["abi"]
+            ftso = w3.eth.contract(address=w3.to_checksum_address(twitter_ftso), abi=abi)
+            _client = (w3, account, ftso)
+        return _client
+
+
+def get_contract(address=None):
+    """The Twitter FTSO at `address` (default TWITTER_FTSO_ADDR) on the shared client."""
+    w3, _account, default = get_client()
+    if address is None:
+        return default
+    address = w3.to_checksum_address(address)
+    if address == default.address:
+        return default
+    with _client_lock:
+        if address not in _contracts:
+            _contracts[address] = w3.eth.contract(address=address, abi=default.abi)
+        return _contracts[address]
+
+
+@metrics.timed("rpc.push_aggregated_score")
+def push_aggregated_score(score: int, address=None) -> str:
     """
-    Push an integer score (0–100) to your Twitter FTSO contract.
-    Returns the tx hash.
+    Push an integer score (0–100) to your Twitter FTSO contract (`address`,
+    default TWITTER_FTSO_ADDR). Returns the tx hash.
     """
-    tx = _ftso.functions.setTweetScore(score).build_transaction({
-        "from":     _account.address,
-        "gas":      200_000,
-        "gasPrice": w3_push.to_wei(30, "gwei"),
-        "nonce":    w3_push.eth.get_transaction_count(_account.address),
-        "chainId":  w3_push.eth.chain_id,
-    })
-    signed = _account.sign_transaction(tx)
-    txh = w3_push.eth.send_raw_transaction(signed.raw_transaction)
+    w3_push, _account, _ = get_client()
+    _ftso = get_contract(address)
+    with _tx_lock:
+        tx = _ftso.functions.setTweetScore(score).build_transaction({
+            "from":     _account.address,
+            "gas":      200_000,
+            "gasPrice": w3_push.to_wei(30, "gwei"),
+            "nonce":    w3_push.eth.get_transaction_count(_account.address, "pending"),
+            "chainId":  w3_push.eth.chain_id,
+        })
+        signed = _account.sign_transaction(tx)
+        txh = w3_push.eth.send_raw_transaction(signed.raw_transaction)
     return txh.hex()
+
+
+def publish_score(score: int, force: bool = False, feed: str = None, address=None):
+    """
+    Push `score` only when the publish policy asks for it: it moved at least
+    PUBLISH_DEVIATION points from the last published value, or
+    PUBLISH_HEARTBEAT seconds have passed. `feed` names the coin/job the score
+    belongs to; its last published state is kept under its own key, and
+    `address` is its FTSO contract (default TWITTER_FTSO_ADDR). Returns the tx
+    hash, or None when the push was skipped.
+    """
+    ftso = get_contract(address)
+    policy = get_policy()
+    key = f"tweetScore:{feed}@{ftso.address}" if feed else f"tweetScore@{ftso.address}"
+    with _publish_lock:
+        owner = _claims.setdefault(ftso.address, feed)
+        if owner != feed:
+            # the contract holds one score: the two feeds overwrite each other
+            logging.warning(f"⚠️ {feed or 'default'} and {owner or 'default'} both push to {ftso.address}; "
+                            f"give each job its own \"ftso\" address")
+        if key not in policy.verified:
+            if owner == feed:
+                policy.verify(key, ftso.functions.tweetScore().call())
+            else:
+                # another feed's value is on chain; compare against our own record only
+                policy.verified.add(key)
+        publish, reason = policy.decide(key, score)
+        if not (publish or force):
+            metrics.inc("ftso.push.skipped")
+            logging.info(f"Not pushing {feed or 'score'} {score}: {reason}")
+            return None
+        logging.info(f"Pushing {feed or 'score'} {score}: {'forced' if force else reason}")
+        txh = push_aggregated_score(score, ftso.address)
+        policy.record(key, score, txh)
+        metrics.inc("ftso.push.sent")
+        return txh
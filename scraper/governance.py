@@ -0,0 +1,83 @@
+# governance.py
+#
+# Status of TruthAnchorGovernor proposals in one round trip: proposalSnapshot,
+# proposalDeadline, state and twitterProposals for every ID go out as a single
+# multicall together with the head block, and snapshot/deadline times come
+# from the persistent block-time cache (blocktime.py).
+#
+#   gov = governance.get_governor()
+#   for row in governance.status(gov, [id1, id2]): ...
+
+import os
+import json
+import threading
+
+import metrics
+import multicall
+from blocktime import BlockTimes
+
+ABI_PATH = "artifacts/Governor.sol/TruthAnchorGovernor.json"
+# OpenZeppelin IGovernor.ProposalState, in enum order
+STATES = ("Pending", "Active", "Canceled", "Defeated", "Succeeded", "Queued", "Expired", "Executed")
+OPEN_STATES = ("Pending", "Active", "Succeeded", "Queued")
+
+_governor = None
+_governor_lock = threading.Lock()
+
+
+def get_governor():
+    """TruthAnchorGovernor on the shared RPC client (RPC_URL, GOVERNOR_ADDRESS)."""
+    global _governor
+    with _governor_lock:
+        if _governor is None:
+            import rpc
+            from dotenv import load_dotenv
+
+            load_dotenv()
+            address = os.getenv("GOVERNOR_ADDRESS")
+            if not address:
+                raise EnvironmentError("GOVERNOR_ADDRESS must be set")
+            w3 = rpc.get_web3("RPC_URL")
+            with open(ABI_PATH) as f:
+                abi = json.load(f)["abi"]
+            _governor = w3.eth.contract(address=w3.to_checksum_address(address), abi=abi)
+        return _governor
+
+
+def proposal_ids(gov, from_block, to_block="latest"):
+    """IDs of proposals created in a block range (ProposalCreated logs), oldest first."""
+    logs = gov.events.ProposalCreated.get_logs(from_block=from_block, to_block=to_block)
+    return [log["args"]["proposalId"] for log in logs]
+
+
+@metrics.timed("governance.status")
+def status(gov, ids, times=None):
+    """
+    One dict per proposal ID: handle, state, snapshot/deadline blocks with
+    (timestamp, exact) pairs, vote tallies and the head block number.
+    Unknown IDs come back with state None.
+    """
+    ids = list(ids)
+    calls = []
+    for pid in ids:
+        calls += [gov.functions.proposalSnapshot(pid), gov.functions.proposalDeadline(pid),
+                  gov.functions.state(pid), gov.functions.twitterProposals(pid)]
+    values, head = multicall.read(calls, latest_block=True, allow_failure=True)
+    times = times or BlockTimes(gov.w3)
+    # nonexistent proposals revert on state(); their zero blocks need no time
+    blocks = [v for k, v in enumerate(values)
+              if k % 4 < 2 and v is not None and values[k - k % 4 + 2] is not None]
+    when = times.timestamps(blocks, head=head) if blocks else {}
+
+    rows = []
+    for k, pid in enumerate(ids):
+        snap, deadline, state, proposal = values[4 * k:4 * k + 4]
+        row = {"id": pid, "head": head["number"], "state": None if state is None else STATES[state]}
+        if state is not None:
+            row.update(snapshot=snap, snapshot_time=when[snap], deadline=deadline,
+                       deadline_time=when[deadline])
+        if proposal is not None:
+            row.update(handle=proposal[0], votes_for=proposal[1], votes_against=proposal[2],
+                       votes_abstain=proposal[3])
+        rows.append(row)
+    return rows
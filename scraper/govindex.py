@@ -0,0 +1,274 @@
+# govindex.py
+#
+# Local index of TruthAnchorGovernor history. ProposalCreated, VoteCast(WithParams),
+# ProposalQueued, ProposalExecuted and ProposalCanceled logs are pulled with
+# chunked, concurrent eth_getLogs scans (logscan.py) into SQLite, behind a
+# block cursor, so listing every proposal, its tallies or one voter's history
+# is a local query instead of a live call per proposal. Each window of blocks
+# is stored together with the cursor; an interrupted sync resumes where the
+# last window ended.
+#
+#   index = GovernanceIndex(governance.get_governor(), start_block=2612103)
+#   index.sync()
+#   for p in index.proposals(): print(p["handle"], p["votes_for"], p["phase"])
+#
+#   python scraper/govindex.py sync --from-block 2612103
+#   python scraper/govindex.py list [--all]
+#   python scraper/govindex.py show <proposalId>
+#   python scraper/govindex.py voter <address>
+#
+#   GOV_INDEX               SQLite index (default ./cache/governance.sqlite)
+#   GOV_INDEX_CONFIRMATIONS blocks to stay behind the head (default 1)
+#   GOV_INDEX_WINDOW        blocks stored per transaction (default LOG_SPAN × LOG_BATCH × LOG_CONCURRENCY)
+#   GOVERNOR_START_BLOCK    where a fresh cursor starts (default 0; --from-block overrides)
+#   LOG_SPAN, LOG_BATCH, LOG_CONCURRENCY   eth_getLogs chunking (see logscan.py)
+
+import os
+import sqlite3
+import logging
+import threading
+
+import metrics
+import logscan
+
+DB_PATH = os.getenv("GOV_INDEX", "./cache/governance.sqlite")
+CONFIRMATIONS = int(os.getenv("GOV_INDEX_CONFIRMATIONS", "1"))
+WINDOW = int(os.getenv("GOV_INDEX_WINDOW", "0")) or \
+    logscan.LOG_SPAN * logscan.LOG_BATCH * logscan.LOG_CONCURRENCY
+START_BLOCK = int(os.getenv("GOVERNOR_START_BLOCK", "0"))
+
+HANDLE_PREFIX = "Proposal for Twitter handle: "  # description set by proposeTwitterHandle
+SUPPORT = ("against", "for", "abstain")          # GovernorCountingSimple.VoteType
+EVENTS = ("ProposalCreated", "VoteCast", "VoteCastWithParams", "ProposalQueued",
+          "ProposalExecuted", "ProposalCanceled")
+# phases derived locally: Pending/Active from the cursor against voteStart/voteEnd,
+# then Closed (Succeeded/Defeated/Expired need quorum, ask governance.status),
+# unless a Queued/Executed/Canceled event was seen
+
+PROPOSAL_COLUMNS = ("id", "proposer", "handle", "description", "vote_start", "vote_end", "block",
+                    "votes_for", "votes_against", "votes_abstain", "voters",
+                    "queued_block", "eta", "executed_block", "canceled_block")
+
+
+class GovernanceIndex:
+    def __init__(self, gov=None, path=DB_PATH, start_block=None, confirmations=CONFIRMATIONS,
+                 window=WINDOW):
+        if gov is None:
+            import governance
+            gov = governance.get_governor()
+        self.gov = gov
+        self.start_block = START_BLOCK if start_block is None else start_block
+        self.confirmations = confirmations
+        self.window = window
+        self.key = gov.address
+        self.events = {}
+        for name in EVENTS:
+            event = getattr(gov.events, name)()
+            self.events[event.topic] = (name, event)
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        # vote weights and tallies overflow INTEGER (1e18 decimals), so they are TEXT
+        self._db.executescript(
+            "CREATE TABLE IF NOT EXISTS cursor (governor TEXT PRIMARY KEY, block INTEGER);"
+            "CREATE TABLE IF NOT EXISTS proposals ("
+            " governor TEXT, id TEXT, proposer TEXT, handle TEXT, description TEXT,"
+            " vote_start INTEGER, vote_end INTEGER, block INTEGER,"
+            " votes_for TEXT DEFAULT '0', votes_against TEXT DEFAULT '0', votes_abstain TEXT DEFAULT '0',"
+            " voters INTEGER DEFAULT 0, queued_block INTEGER, eta INTEGER, executed_block INTEGER,"
+            " canceled_block INTEGER, PRIMARY KEY (governor, id));"
+            "CREATE TABLE IF NOT EXISTS votes ("
+            " governor TEXT, block INTEGER, log_index INTEGER, proposal TEXT, voter TEXT,"
+            " support INTEGER, weight TEXT, reason TEXT, PRIMARY KEY (governor, block, log_index));"
+            "CREATE INDEX IF NOT EXISTS votes_by_proposal ON votes (governor, proposal);"
+            "CREATE INDEX IF NOT EXISTS votes_by_voter ON votes (governor, voter);"
+        )
+        self._lock = threading.Lock()
+
+    def close(self):
+        self._db.close()
+
+    def cursor(self):
+        """Last block indexed, or None before the first sync."""
+        with self._lock:
+            row = self._db.execute("SELECT block FROM cursor WHERE governor = ?", (self.key,)).fetchone()
+        return row[0] if row else None
+
+    # ─── ingest ─────────────────────────────────────────────────────────────
+
+    @metrics.timed("govindex.sync")
+    def sync(self, to_block=None):
+        """Index the blocks after the cursor up to `to_block` (default head − confirmations); returns events stored."""
+        w3 = self.gov.w3
+        safe = w3.eth.block_number - self.confirmations if to_block is None else to_block
+        last = self.cursor()
+        if last is None:
+            last = self.start_block - 1
+        new = 0
+        for start in range(last + 1, safe + 1, self.window):
+            end = min(start + self.window - 1, safe)
+            logs = logscan.get_logs(w3, self.gov.address, [list(self.events)], start, end)
+            new += self._store(logs, end)
+        if new:
+            logging.info(f"🗳 governance index at block {self.cursor()}: {new} new event(s)")
+        return new
+
+    def _store(self, logs, end):
+        decoded = []
+        for log in logs:
+            name, event = self.events[log["topics"][0]]
+            decoded.append((name, int(log["blockNumber"], 16), int(log["logIndex"], 16),
+                            event.process_log(log)["args"]))
+        # events and cursor move together, so a crash never skips or double-counts a vote
+        with self._lock, self._db:
+            for name, block, idx, args in decoded:
+                getattr(self, f"_on_{name}")(block, idx, args)
+            self._db.execute("INSERT OR REPLACE INTO cursor VALUES (?, ?)", (self.key, end))
+        metrics.inc("govindex.events", len(decoded))
+        return len(decoded)
+
+    def _ensure(self, pid):
+        # votes or queue/execute of a proposal created before start_block
+        self._db.execute("INSERT OR IGNORE INTO proposals (governor, id) VALUES (?, ?)", (self.key, str(pid)))
+
+    def _on_ProposalCreated(self, block, idx, args):
+        description = args["description"]
+        handle = description[len(HANDLE_PREFIX):] if description.startswith(HANDLE_PREFIX) else None
+        self._ensure(args["proposalId"])
+        self._db.execute("UPDATE proposals SET proposer = ?, handle = ?, description = ?, vote_start = ?,"
+                         " vote_end = ?, block = ? WHERE governor = ? AND id = ?",
+                         (args["proposer"], handle, description, args["voteStart"], args["voteEnd"],
+                          block, self.key, str(args["proposalId"])))
+
+    def _on_VoteCast(self, block, idx, args):
+        pid = str(args["proposalId"])
+        cur = self._db.execute("INSERT OR IGNORE INTO votes VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                               (self.key, block, idx, pid, args["voter"], args["support"],
+                                str(args["weight"]), args["reason"]))
+        if not cur.rowcount:
+            return  # already counted
+        self._ensure(pid)
+        column = f"votes_{SUPPORT[args['support']]}"
+        (tally,) = self._db.execute(f"SELECT {column} FROM proposals WHERE governor = ? AND id = ?",
+                                    (self.key, pid)).fetchone()
+        self._db.execute(f"UPDATE proposals SET {column} = ?, voters = voters + 1 WHERE governor = ? AND id = ?",
+                         (str(int(tally) + args["weight"]), self.key, pid))
+
+    _on_VoteCastWithParams = _on_VoteCast
+
+    def _on_ProposalQueued(self, block, idx, args):
+        self._ensure(args["proposalId"])
+        self._db.execute("UPDATE proposals SET queued_block = ?, eta = ? WHERE governor = ? AND id = ?",
+                         (block, args["etaSeconds"], self.key, str(args["proposalId"])))
+
+    def _on_ProposalExecuted(self, block, idx, args):
+        self._ensure(args["proposalId"])
+        self._db.execute("UPDATE proposals SET executed_block = ? WHERE governor = ? AND id = ?",
+                         (block, self.key, str(args["proposalId"])))
+
+    def _on_ProposalCanceled(self, block, idx, args):
+        self._ensure(args["proposalId"])
+        self._db.execute("UPDATE proposals SET canceled_block = ? WHERE governor = ? AND id = ?",
+                         (block, self.key, str(args["proposalId"])))
+
+    # ─── queries (no RPC) ───────────────────────────────────────────────────
+
+    def _phase(self, p, head):
+        if p["executed_block"] is not None:
+            return "Executed"
+        if p["canceled_block"] is not None:
+            return "Canceled"
+        if p["queued_block"] is not None:
+            return "Queued"
+        if p["vote_start"] is None or head is None:
+            return None
+        if head <= p["vote_start"]:
+            return "Pending"
+        return "Active" if head <= p["vote_end"] else "Closed"
+
+    def _proposal_rows(self, where="", params=()):
+        with self._lock:
+            head = self._db.execute("SELECT block FROM cursor WHERE governor = ?", (self.key,)).fetchone()
+            rows = self._db.execute(f"SELECT {', '.join(PROPOSAL_COLUMNS)} FROM proposals "
+                                    f"WHERE governor = ? {where} ORDER BY block, id", (self.key, *params)).fetchall()
+        head = head[0] if head else None
+        out = []
+        for row in rows:
+            p = dict(zip(PROPOSAL_COLUMNS, row))
+            p["id"] = int(p["id"])
+            for k in ("votes_for", "votes_against", "votes_abstain"):
+                p[k] = int(p[k])
+            p["phase"] = self._phase(p, head)
+            out.append(p)
+        return out
+
+    def proposals(self, phases=None):
+        """Every indexed proposal, oldest first, optionally only those in `phases`."""
+        rows = self._proposal_rows()
+        return rows if phases is None else [p for p in rows if p["phase"] in phases]
+
+    def proposal(self, pid):
+        rows = self._proposal_rows("AND id = ?", (str(pid),))
+        return rows[0] if rows else None
+
+    def _vote_rows(self, where, params):
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT v.proposal, p.handle, v.voter, v.support, v.weight, v.reason, v.block "
+                "FROM votes v LEFT JOIN proposals p ON p.governor = v.governor AND p.id = v.proposal "
+                f"WHERE v.governor = ? AND {where} ORDER BY v.block, v.log_index", (self.key, *params)).fetchall()
+        return [{"proposal": int(pid), "handle": handle, "voter": voter, "support": SUPPORT[support],
+                 "weight": int(weight), "reason": reason, "block": block}
+                for pid, handle, voter, support, weight, reason, block in rows]
+
+    def votes(self, pid):
+        """Votes cast on one proposal, in chain order."""
+        return self._vote_rows("v.proposal = ?", (str(pid),))
+
+    def voter_history(self, address):
+        """Every vote cast by `address`, in chain order."""
+        return self._vote_rows("v.voter = ?", (self.gov.w3.to_checksum_address(address),))
+
+
+if __name__ == "__main__":
+    import sys
+    import argparse
+
+    logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO").upper(),
+                        format="%(asctime)s [%(levelname)s] %(message)s")
+    p = argparse.ArgumentParser(description="Local index of TruthAnchorGovernor proposals and votes")
+    sub = p.add_subparsers(dest="cmd", required=True)
+    sp = sub.add_parser("sync", help="index new blocks up to the head")
+    sp.add_argument("--from-block", type=int, help="first block to scan when there is no cursor yet")
+    sub.add_parser("list", help="indexed proposals").add_argument(
+        "--all", action="store_true", help="include executed, canceled and closed proposals")
+    sub.add_parser("show", help="one proposal and its votes").add_argument("id", type=int)
+    sub.add_parser("voter", help="every vote of an address").add_argument("address")
+    args = p.parse_args()
+
+    try:
+        index = GovernanceIndex(start_block=getattr(args, "from_block", None))
+    except EnvironmentError as e:
+        sys.exit(f"❌ {e}")
+    if args.cmd == "sync":
+        index.sync()
+        print(f"Indexed to block {index.cursor()} ({len(index.proposals())} proposals)")
+    elif args.cmd == "list":
+        rows = index.proposals(None if args.all else ("Pending", "Active", "Queued"))
+        print(f"Indexed to block {index.cursor()}   ({len(rows)} proposals)\n")
+        for r in rows:
+            print(f"#{r['id']}  @{r['handle'] or '?'}  [{r['phase']}]  for={r['votes_for']} "
+                  f"against={r['votes_against']} abstain={r['votes_abstain']}  ({r['voters']} voters)")
+    elif args.cmd == "show":
+        r = index.proposal(args.id)
+        if r is None:
+            sys.exit(f"❌ Proposal {args.id} is not in the index (run sync?)")
+        print(f"#{r['id']}  @{r['handle'] or '?'}  [{r['phase']}]  by {r['proposer']}")
+        print(f"  Voting blocks {r['vote_start']} → {r['vote_end']}")
+        print(f"  Votes for={r['votes_for']} against={r['votes_against']} abstain={r['votes_abstain']}\n")
+        for v in index.votes(args.id):
+            print(f"  {v['block']:>10}  {v['voter']}  {v['support']:<8} {v['weight']}  {v['reason']}")
+    else:
+        for v in index.voter_history(args.address):
+            print(f"{v['block']:>10}  #{v['proposal']}  @{v['handle'] or '?'}  {v['support']:<8} {v['weight']}")
+    index.close()
@@ -1,20 +1,21 @@
 import os
 import tempfile
-import requests
 
+import metrics
 
-from dotenv import load_dotenv
 
-load_dotenv()
+def _pinata_jwt():
+    """Pinata credentials are only needed once something is pinned."""
+    from dotenv import load_dotenv
 
-PINATA_API_KEY = os.environ.get("PINATA_API_KEY")
-PINATA_API_SECRET = os.environ.get("PINATA_API_SECRET")
-PINATA_JWT = os.environ.get("PINATA_JWT")
-
-if not PINATA_API_KEY or not PINATA_API_SECRET or not PINATA_JWT:
-    raise Exception("Pinata credentials (PINATA_API_KEY, PINATA_API_SECRET, PINATA_JWT) must be set in the environment.")
+    load_dotenv()
+    jwt = os.environ.get("PINATA_JWT")
+    if not os.environ.get("PINATA_API_KEY") or not os.environ.get("PINATA_API_SECRET") or not jwt:
+        raise Exception("Pinata credentials (PINATA_API_KEY, PINATA_API_SECRET, PINATA_JWT) must be set in the environment.")
+    return jwt
 
 
+@metrics.timed("browser.screenshot")
 def screenshot_element(element, file_path=None):
     """
     Takes a screenshot of a Selenium WebElement and saves it to a file.
@@ -33,12 +34,15 @@ def screenshot_element(element, file_path=None):
         raise Exception("Screenshot file is empty")
     return file_path
 
+@metrics.timed("pinata.pin_screenshot")
 def pin_file_to_ipfs(file_path):
     """
     Pins a file to IPFS using the Pinata API.
     """
+    import requests
+
     url = "https://api.pinata.cloud/pinning/pinFileToIPFS"
-    headers = {"Authorization": f"Bearer {PINATA_JWT}"}
+    headers = {"Authorization": f"Bearer {_pinata_jwt()}"}
     
     with open(file_path, "rb") as file:
         files = {"file": (os.path.basename(file_path), file)}
@@ -0,0 +1,110 @@
+import os
+import json
+import glob
+import logging
+import threading
+from datetime import datetime
+
+JOURNAL_DIR = "./tweets/.journal/"
+
+
+class JournalState:
+    """Everything a run had completed, rebuilt from its journal."""
+
+    def __init__(self):
+        self.config = {}
+        self.rows = {}
+        self.pins = {}
+        self.scores = {}
+        self.analyses = {}
+        self.coins = {}
+        self.steps = {}
+
+    def apply(self, rec):
+        kind = rec.get("kind")
+        if kind == "config":
+            self.config = rec["config"]
+        elif kind == "tweet":
+            self.rows[rec["idx"]] = rec["row"]
+        elif kind == "pin":
+            self.pins[rec["idx"]] = rec["url"]
+        elif kind == "score":
+            self.scores[rec["idx"]] = rec["score"]
+            self.analyses[rec["idx"]] = rec.get("analysis", "")
+        elif kind == "coin":
+            self.coins[rec["idx"]] = rec["coin"]
+        elif kind == "step":
+            self.steps[rec["name"]] = rec.get("result")
+
+    def ordered_rows(self):
+        """Row dicts in capture order, with their pinned screenshot URL applied."""
+        out = []
+        for idx in sorted(self.rows):
+            row = dict(self.rows[idx])
+            if idx in self.pins:
+                row["ipfs_screenshot"] = self.pins[idx]
+            out.append(row)
+        return out
+
+
+class Journal:
+    """
+    Append-only JSON-lines log of a scrape: tweets, pins, scores, coin labels
+    and completed pipeline steps. Each record is flushed and fsync'd before
+    returning so a crash loses at most the record being written.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.state = self.replay(path) if os.path.exists(path) else JournalState()
+        self._lock = threading.Lock()
+        self._fp = open(path, "a", encoding="utf-8")
+        if self._fp.tell() and not self._ends_with_newline(path):
+            # terminate a torn record so the next append starts on its own line
+            self._fp.write("\n")
+
+    @staticmethod
+    def _ends_with_newline(path):
+        with open(path, "rb") as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b"\n"
+
+    @classmethod
+    def new(cls, folder=JOURNAL_DIR, name=None):
+        stamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+        if name:
+            # daemon jobs can start in the same second
+            stamp += "_" + "".join(c if c.isalnum() else "-" for c in name)
+        return cls(os.path.join(folder, f"{stamp}.jsonl"))
+
+    @classmethod
+    def latest(cls, folder=JOURNAL_DIR):
+        paths = sorted(glob.glob(os.path.join(folder, "*.jsonl")))
+        if not paths:
+            raise FileNotFoundError(f"No journal found in {folder}")
+        return cls(paths[-1])
+
+    @staticmethod
+    def replay(path):
+        state = JournalState()
+        with open(path, encoding="utf-8") as f:
+            for n, line in enumerate(f, 1):
+                try:
+                    state.apply(json.loads(line))
+                except json.JSONDecodeError:
+                    # a torn final line from a crash mid-write; everything before it is intact
+                    logging.warning(f"Ignoring unreadable journal line {n} in {path}")
+        return state
+
+    def record(self, kind, **fields):
+        line = json.dumps({"kind": kind, **fields}, ensure_ascii=False, default=str)
+        with self._lock:
+            self._fp.write(line + "\n")
+            self._fp.flush()
+            os.fsync(self._fp.fileno())
+        self.state.apply({"kind": kind, **fields})
+
+    def close(self):
+        with self._lock:
+            self._fp.close()
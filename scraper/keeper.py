@@ -0,0 +1,264 @@
+# keeper.py
+#
+# Grants dataset access to buyers. Tails DatasetAccessRequested from a block
+# cursor kept in SQLite, checks each request's feePaid against the dataset
+# price (RegistryMirror.prices, cached locally) and sends a tick's
+# grantDatasetAccess calls as one batch of signed transactions
+# (store.send_many). grantDatasetAccess is owner-only, so it cannot go through
+# Multicall3; the round trips per tick stay constant however many requests
+# arrive: head block, log batches, one receipt batch, one price multicall,
+# nonce, sends. A grant only counts once its receipt shows success; a reverted
+# or dropped one goes back to pending.
+#
+#   python scraper/keeper.py                  # run until SIGTERM / Ctrl-C
+#   python scraper/keeper.py --once           # one tick
+#   python scraper/keeper.py --from-block N   # where a fresh cursor starts
+#
+#   KEEPER_DB             SQLite state (default ./cache/keeper.sqlite)
+#   KEEPER_INTERVAL       seconds between ticks (default 15)
+#   KEEPER_CONFIRMATIONS  blocks to stay behind the head (default 1)
+#   KEEPER_MAX_GRANTS     grants sent per tick (default 500)
+#   KEEPER_RETRIES        attempts before a grant is marked failed (default 3)
+#   KEEPER_GRANT_GAS      gas limit per grant (default 100000; 0 = estimate each)
+#   KEEPER_RECEIPT_BLOCKS blocks to wait for a grant's receipt before resending it (default 50)
+#   LOG_SPAN, LOG_BATCH   eth_getLogs chunking (see logscan.py)
+
+import os
+import sqlite3
+import logging
+import threading
+
+import metrics
+import logscan
+
+DB_PATH = os.getenv("KEEPER_DB", "./cache/keeper.sqlite")
+INTERVAL = float(os.getenv("KEEPER_INTERVAL", "15"))
+CONFIRMATIONS = int(os.getenv("KEEPER_CONFIRMATIONS", "1"))
+MAX_GRANTS = int(os.getenv("KEEPER_MAX_GRANTS", "500"))
+RETRIES = int(os.getenv("KEEPER_RETRIES", "3"))
+# grantDatasetAccess costs ~50k gas and only reverts for a non-owner, so a
+# fixed limit replaces one eth_estimateGas per grant
+GRANT_GAS = int(os.getenv("KEEPER_GRANT_GAS", "100000")) or None
+RECEIPT_BLOCKS = int(os.getenv("KEEPER_RECEIPT_BLOCKS", "50"))
+
+# request status: pending → sent (tx hash) → granted (receipt status 1)
+#                 | duplicate | underpaid | unknown | failed (RETRIES attempts)
+# a sent grant that reverts or has no receipt after RECEIPT_BLOCKS is pending again
+
+
+class AccessKeeper:
+    def __init__(self, contract=None, mirror=None, path=DB_PATH, confirmations=CONFIRMATIONS,
+                 max_grants=MAX_GRANTS, start_block=None, send=None, gas=GRANT_GAS,
+                 receipt_blocks=RECEIPT_BLOCKS):
+        import store
+
+        self.contract = contract or store.get_chain()[1]
+        self.mirror = mirror or store.get_mirror()
+        self.send = send or store.send_many
+        self.confirmations = confirmations
+        self.max_grants = max_grants
+        self.start_block = start_block
+        self.gas = gas
+        self.receipt_blocks = receipt_blocks
+        self.head = None  # chain head seen by the last poll
+        self.key = f"{self.mirror.chain_id}:{self.contract.address}"
+        self.event = self.contract.events.DatasetAccessRequested()
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.executescript(
+            "CREATE TABLE IF NOT EXISTS cursor (registry TEXT PRIMARY KEY, block INTEGER);"
+            "CREATE TABLE IF NOT EXISTS requests ("
+            " registry TEXT, block INTEGER, log_index INTEGER, dataset TEXT, requester TEXT,"
+            " fee TEXT, status TEXT DEFAULT 'pending', attempts INTEGER DEFAULT 0, tx TEXT,"
+            " sent_block INTEGER, PRIMARY KEY (registry, block, log_index));"
+            "CREATE INDEX IF NOT EXISTS requests_by_status ON requests (registry, status);"
+        )
+        self._lock = threading.Lock()
+
+    def close(self):
+        self._db.close()
+
+    def cursor(self):
+        """Last block scanned, or None before the first poll."""
+        with self._lock:
+            row = self._db.execute("SELECT block FROM cursor WHERE registry = ?", (self.key,)).fetchone()
+        return row[0] if row else None
+
+    def counts(self):
+        with self._lock:
+            return dict(self._db.execute("SELECT status, COUNT(*) FROM requests WHERE registry = ? "
+                                         "GROUP BY status", (self.key,)).fetchall())
+
+    def poll(self):
+        """Store requests from the blocks since the cursor; returns how many were new."""
+        w3 = self.contract.w3
+        self.head = w3.eth.block_number
+        safe = self.head - self.confirmations
+        last = self.cursor()
+        if last is None:
+            last = (self.start_block if self.start_block is not None else safe + 1) - 1
+        if safe <= last:
+            return 0
+        logs = logscan.get_logs(w3, self.contract.address, [self.event.topic], last + 1, safe)
+        rows = []
+        for log in logs:
+            args = self.event.process_log(log)["args"]
+            rows.append((self.key, int(log["blockNumber"], 16), int(log["logIndex"], 16),
+                         args["datasetId"], args["requester"], str(args["feePaid"])))
+        # requests and cursor move together, so a crash never skips or repeats a block
+        with self._lock, self._db:
+            before = self._db.total_changes
+            self._db.executemany("INSERT OR IGNORE INTO requests (registry, block, log_index, "
+                                 "dataset, requester, fee) VALUES (?, ?, ?, ?, ?, ?)", rows)
+            new = self._db.total_changes - before
+            self._db.execute("INSERT OR REPLACE INTO cursor VALUES (?, ?)", (self.key, safe))
+        metrics.inc("keeper.requests", new)
+        return new
+
+    def _set(self, updates, sent_block=None):
+        with self._lock, self._db:
+            self._db.executemany("UPDATE requests SET status = ?, tx = ?, attempts = attempts + ?, "
+                                 "sent_block = ? WHERE registry = ? AND block = ? AND log_index = ?",
+                                 [(s, tx, tried, sent_block if s == "sent" else None, self.key, b, i)
+                                  for s, tx, tried, b, i in updates])
+
+    @staticmethod
+    def _summary(updates):
+        summary = {}
+        for status, *_ in updates:
+            summary[status] = summary.get(status, 0) + 1
+        for status, n in summary.items():
+            metrics.inc(f"keeper.{status}", n)
+        return summary
+
+    def confirm(self):
+        """Check the receipts of sent grants in one batch; returns {status: count} for those settled."""
+        import rpc
+
+        with self._lock:
+            sent = self._db.execute(
+                "SELECT block, log_index, tx, attempts, sent_block FROM requests "
+                "WHERE registry = ? AND status = 'sent'", (self.key,)).fetchall()
+        if not sent:
+            return {}
+        w3 = self.contract.w3
+        if self.head is None:
+            self.head = w3.eth.block_number
+        head = self.head
+        receipts = rpc.send_batch(w3, [("eth_getTransactionReceipt", [tx]) for _, _, tx, _, _ in sent])
+        updates = []
+        for (block, idx, tx, attempts, sent_block), response in zip(sent, receipts):
+            if "error" in response:
+                raise ConnectionError(f"receipt of {tx}: {response['error'].get('message', 'error')}")
+            receipt = response["result"]
+            if receipt is None:
+                if head - sent_block < self.receipt_blocks:
+                    continue  # not mined yet
+                why = f"has no receipt after {head - sent_block} blocks"
+            elif head - int(receipt["blockNumber"], 16) < self.confirmations:
+                continue
+            elif int(receipt["status"], 16) == 1:
+                updates.append(("granted", tx, 0, block, idx))
+                continue
+            else:
+                why = "reverted"
+            # dropped, replaced or reverted: sent again on this or a later tick, then given up
+            logging.warning(f"⚠️ grant {tx} {why}; {'giving up' if attempts >= RETRIES else 'retrying'}")
+            updates.append(("failed" if attempts >= RETRIES else "pending", None, 0, block, idx))
+        self._set(updates)
+        return self._summary(updates)
+
+    def grant(self):
+        """Check and grant up to max_grants pending requests; returns {status: count} for this pass."""
+        with self._lock:
+            pending = self._db.execute(
+                "SELECT block, log_index, dataset, requester, fee, attempts FROM requests "
+                "WHERE registry = ? AND status = 'pending' ORDER BY block, log_index LIMIT ?",
+                (self.key, self.max_grants)).fetchall()
+            granted = set(self._db.execute(
+                "SELECT dataset, requester FROM requests WHERE registry = ? AND status = 'granted'",
+                (self.key,)).fetchall())
+            # a grant in flight may still revert: its pair's other requests wait for the receipt
+            in_flight = set(self._db.execute(
+                "SELECT dataset, requester FROM requests WHERE registry = ? AND status = 'sent'",
+                (self.key,)).fetchall())
+        if not pending:
+            return {}
+        prices = self.mirror.prices([p[2] for p in pending])
+        updates, todo = [], []
+        for block, idx, dataset, requester, fee, attempts in pending:
+            if (dataset, requester) in granted:
+                updates.append(("duplicate", None, 0, block, idx))
+            elif (dataset, requester) in in_flight:
+                continue
+            elif dataset not in prices:
+                updates.append(("unknown", None, 0, block, idx))
+            elif int(fee) < prices[dataset]:
+                logging.warning(f"⚠️ {requester} paid {fee} wei for {dataset} (price {prices[dataset]}); not granting")
+                updates.append(("underpaid", None, 0, block, idx))
+            else:
+                in_flight.add((dataset, requester))
+                todo.append((block, idx, dataset, requester, attempts))
+
+        fns = self.contract.functions
+        sent = self.send([fns.grantDatasetAccess(d, r)._encode_transaction_data() for _, _, d, r, _ in todo],
+                         [f"grantDatasetAccess({d}, {r})" for _, _, d, r, _ in todo],
+                         gas=self.gas) if todo else []
+        for (block, idx, _, _, attempts), txh in zip(todo, sent):
+            if txh:
+                # counted as granted once confirm() sees its receipt
+                updates.append(("sent", txh, 1, block, idx))
+            else:
+                # rejected or would revert: retried on the next ticks, then given up
+                updates.append(("failed" if attempts + 1 >= RETRIES else "pending", None, 1, block, idx))
+        if todo and self.head is None:
+            self.head = self.contract.w3.eth.block_number
+        self._set(updates, sent_block=self.head)
+        return self._summary(updates)
+
+    @metrics.timed("keeper.tick")
+    def tick(self):
+        new = self.poll()
+        summary = self.confirm()
+        for status, n in self.grant().items():
+            summary[status] = summary.get(status, 0) + n
+        if new or summary:
+            logging.info(f"🔑 block {self.cursor()}: {new} new request(s), {summary or 'nothing to grant'}")
+        return summary
+
+    def run(self, interval=INTERVAL, stop=None):
+        stop = stop or threading.Event()
+        while not stop.is_set():
+            try:
+                self.tick()
+            except Exception as e:
+                # RPC hiccups: the cursor only moved for what was stored
+                metrics.inc("keeper.errors")
+                logging.error(f"🚨 keeper tick failed: {e}")
+            stop.wait(interval)
+
+
+if __name__ == "__main__":
+    import signal
+    import argparse
+
+    logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO").upper(),
+                        format="%(asctime)s [%(levelname)s] %(message)s")
+    p = argparse.ArgumentParser(description="Grant paid dataset access requests")
+    p.add_argument("--once", action="store_true", help="run one tick and exit")
+    p.add_argument("--from-block", type=int, help="first block to scan when there is no cursor yet")
+    p.add_argument("--interval", type=float, default=INTERVAL)
+    args = p.parse_args()
+
+    keeper = AccessKeeper(start_block=args.from_block)
+    if args.once:
+        print(keeper.tick())
+    else:
+        stop = threading.Event()
+        signal.signal(signal.SIGTERM, lambda *a: stop.set())
+        try:
+            keeper.run(args.interval, stop)
+        except KeyboardInterrupt:
+            pass
+    keeper.close()
@@ -0,0 +1,149 @@
+# llm_batch.py
+#
+# Token-aware batching for per-tweet LLM calls (scoring, coin labels).
+# Tweets are packed into requests up to a prompt-token budget measured with
+# tiktoken; a batch whose answer is malformed or misaligned is split in half
+# and retried, down to single tweets, so results always line up with the
+# input and nothing is dropped silently. Transport, auth and rate-limit
+# errors are raised instead: splitting would only multiply the requests (the
+# OpenAI client already backs off and retries those).
+#
+#   labels = run_batched(texts, call)     # call(list_of_texts) → list aligned
+#
+#   LLM_BATCH_TOKENS  prompt-token budget per request (default 3000)
+#   LLM_BATCH_ITEMS   max tweets per request (default 40; bounds output size)
+
+import os
+import logging
+import functools
+
+import metrics
+
+BATCH_TOKENS = int(os.getenv("LLM_BATCH_TOKENS", "3000"))
+BATCH_ITEMS = int(os.getenv("LLM_BATCH_ITEMS", "40"))
+# "[12] " prefix + newline separators around every tweet in a batch prompt
+ITEM_OVERHEAD = 6
+
+
+class BatchFormatError(ValueError):
+    """A batch answer did not contain exactly one valid label per tweet."""
+
+
+@functools.lru_cache(maxsize=8)
+def _encoding(model):
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+    try:
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            return tiktoken.get_encoding("cl100k_base")
+    except Exception as e:
+        # the BPE files are downloaded on first use; offline, estimate instead
+        logging.warning(f"tiktoken encoding unavailable ({e}); estimating tokens from length")
+        return None
+
+
+def count_tokens(text, model="gpt-4"):
+    """Prompt tokens for `text`; ~4 chars/token when tiktoken is missing."""
+    enc = _encoding(model)
+    if enc is None:
+        return len(text) // 4 + 1
+    return len(enc.encode(text, disallowed_special=()))
+
+
+def truncate(text, max_tokens, model="gpt-4"):
+    enc = _encoding(model)
+    if enc is None:
+        return text[:max_tokens * 4]
+    tokens = enc.encode(text, disallowed_special=())
+    return text if len(tokens) <= max_tokens else enc.decode(tokens[:max_tokens])
+
+
+def pack(token_counts, budget=BATCH_TOKENS, max_items=BATCH_ITEMS):
+    """
+    Greedily pack items (in order) into batches of indices whose token sum,
+    with per-item overhead, stays within `budget`. An item larger than the
+    budget gets a batch of its own.
+    """
+    batches, current, used = [], [], 0
+    for i, n in enumerate(token_counts):
+        cost = n + ITEM_OVERHEAD
+        if current and (used + cost > budget or len(current) >= max_items):
+            batches.append(current)
+            current, used = [], 0
+        current.append(i)
+        used += cost
+    if current:
+        batches.append(current)
+    return batches
+
+
+def format_batch(texts):
+    """Number tweets so the model can answer per index."""
+    return "\n\n".join(f"[{i}] {t}" for i, t in enumerate(texts))
+
+
+def align(items, n, key="i"):
+    """
+    Map a list of {"i": index, ...} answers onto positions 0..n-1, raising
+    BatchFormatError unless every index appears exactly once.
+    """
+    if not isinstance(items, list):
+        raise BatchFormatError(f"expected a list of answers, got {type(items).__name__}")
+    out = [None] * n
+    for item in items:
+        try:
+            i = int(item[key])
+        except (KeyError, TypeError, ValueError):
+            raise BatchFormatError(f"answer without a valid {key!r}: {item!r}")
+        if not 0 <= i < n or out[i] is not None:
+            raise BatchFormatError(f"unexpected or repeated index {i}")
+        out[i] = item
+    missing = [i for i, v in enumerate(out) if v is None]
+    if missing:
+        raise BatchFormatError(f"no answer for {len(missing)} of {n} tweets (e.g. {missing[:5]})")
+    return out
+
+
+def run_batched(texts, call, budget=BATCH_TOKENS, max_items=BATCH_ITEMS, model="gpt-4",
+                retries=1, name="llm.batch"):
+    """
+    Run `call(batch_texts) -> list` over token-budgeted batches and return a
+    list aligned with `texts`. A batch whose answer fails validation
+    (ValueError, e.g. BatchFormatError) is halved and retried; a single tweet
+    that still fails after `retries` extra attempts gets None. Any other error
+    from `call` propagates. Oversized tweets are truncated to the budget.
+    """
+    texts = [truncate(t, budget - ITEM_OVERHEAD, model) for t in texts]
+    counts = [count_tokens(t, model) for t in texts]
+    results = [None] * len(texts)
+
+    def run(idxs, attempt=0):
+        batch = [texts[i] for i in idxs]
+        try:
+            with metrics.timed(name):
+                labels = call(batch)
+            if len(labels) != len(batch):
+                raise BatchFormatError(f"{len(labels)} labels for {len(batch)} tweets")
+        except ValueError as e:
+            metrics.inc(f"{name}.failures")
+            if len(idxs) > 1:
+                logging.warning(f"{name}: batch of {len(idxs)} failed ({e}); splitting")
+                mid = len(idxs) // 2
+                run(idxs[:mid])
+                run(idxs[mid:])
+            elif attempt < retries:
+                run(idxs, attempt + 1)
+            else:
+                logging.error(f"{name}: giving up on one tweet: {e}")
+            return
+        metrics.inc(f"{name}.tweets", len(batch))
+        for i, label in zip(idxs, labels):
+            results[i] = label
+
+    for idxs in pack(counts, budget, max_items):
+        run(idxs)
+    return results
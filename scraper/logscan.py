@@ -0,0 +1,73 @@
+# logscan.py
+#
+# eth_getLogs over long block ranges. Public Flare/Coston2 nodes cap a query
+# at a few dozen blocks, so the range is cut into LOG_SPAN-block chunks and
+# LOG_BATCH chunks go out per JSON-RPC batch, LOG_CONCURRENCY batches at a
+# time. A chunk the node refuses (too many results, range too large) is split
+# in half and asked again in the next wave.
+#
+#   topic = registry.events.DatasetAccessRequested().topic
+#   logs = logscan.get_logs(w3, registry.address, [topic], from_block, to_block)
+#   for log in logs: registry.events.DatasetAccessRequested().process_log(log)
+#
+#   LOG_SPAN   blocks per eth_getLogs (default 30, the Flare public RPC limit)
+#   LOG_BATCH  eth_getLogs per round trip (default 10)
+#   LOG_CONCURRENCY  round trips in flight (default 4)
+
+import os
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+import metrics
+import rpc
+
+LOG_SPAN = int(os.getenv("LOG_SPAN", "30"))
+LOG_BATCH = int(os.getenv("LOG_BATCH", "10"))
+LOG_CONCURRENCY = int(os.getenv("LOG_CONCURRENCY", "4"))
+
+
+def chunks(from_block, to_block, span=LOG_SPAN):
+    """Inclusive [start, end] block ranges of at most `span` blocks."""
+    return [(b, min(b + span - 1, to_block)) for b in range(from_block, to_block + 1, span)]
+
+
+def get_logs(w3, address, topics, from_block, to_block, span=None, batch=None, concurrency=None):
+    """
+    Raw logs (JSON-RPC dicts) of `address` matching `topics` in blocks
+    [from_block, to_block], ordered by (block, log index). `address` may be a
+    list. Raises ConnectionError if a single block cannot be read.
+    """
+    span = span or LOG_SPAN
+    batch = batch or LOG_BATCH
+    concurrency = max(concurrency or LOG_CONCURRENCY, 1)
+    addresses = address if isinstance(address, list) else [address]
+
+    def fetch(part):
+        with metrics.timed("rpc.get_logs"):
+            responses = rpc.send_batch(w3, [("eth_getLogs", [{
+                "address": addresses, "topics": topics,
+                "fromBlock": hex(start), "toBlock": hex(end)}]) for start, end in part])
+        metrics.inc("rpc.get_logs.requests", len(part))
+        return responses
+
+    todo = chunks(from_block, to_block, span)
+    logs = []
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        while todo:
+            wave = [todo[i:i + batch] for i in range(0, min(len(todo), batch * concurrency), batch)]
+            todo = todo[batch * concurrency:]
+            retry = []
+            for part, responses in zip(wave, pool.map(fetch, wave)):
+                for (start, end), response in zip(part, responses):
+                    if "error" not in response:
+                        logs += response["result"]
+                        continue
+                    why = response["error"].get("message", "error")
+                    if start == end:
+                        raise ConnectionError(f"eth_getLogs failed for block {start}: {why}")
+                    mid = (start + end) // 2
+                    logging.debug(f"eth_getLogs {start}-{end} refused ({why}); splitting")
+                    retry += [(start, mid), (mid + 1, end)]
+            todo = retry + todo
+    logs.sort(key=lambda log: (int(log["blockNumber"], 16), int(log["logIndex"], 16)))
+    return logs
@@ -0,0 +1,194 @@
+# merkle.py
+#
+# Merkle commitment over the rows of a dataset, so one tweet (its text,
+# screenshot CID, score…) can be shown to belong to a registered dump without
+# downloading the dump. The root is written next to the dataset as
+# <dataset>.merkle.json and carried in the registry `preview` as merkle_root; a proof is the
+# ~log2(n) sibling hashes from the row's leaf to the root.
+#
+#   tree = MerkleTree.from_frame(df)
+#   proof = tree.proof(17)
+#   verify(df.iloc[17].to_dict(), proof, tree.root)     # → True
+#
+#   python scraper/merkle.py root tweets/2025-04-27_02-34-50_tweets_1-5.csv
+#   python scraper/merkle.py prove tweets/2025-04-27_02-34-50_tweets_1-5.csv 3
+#
+# Row encoding ("netstring-v1"): the columns sorted by name, each written as
+# <len>:<name><len>:<value> with lengths in characters, values as str() and
+# missing values (NaN/None) as "", lists as the repr of their str() items,
+# UTF-8 encoded. Leaves are sha256(0x00 || row), inner nodes
+# sha256(0x01 || left || right) (RFC 6962 domain separation); an unpaired last
+# node moves up a level unchanged.
+
+import os
+import sys
+import json
+import math
+import hashlib
+
+import numpy as np
+from pandas.api.types import infer_dtype
+
+ENCODING = "netstring-v1"
+LEAF = b"\x00"
+NODE = b"\x01"
+EMPTY_ROOT = hashlib.sha256(b"").hexdigest()
+
+
+def _text(value):
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return ""
+    if isinstance(value, (list, tuple, np.ndarray)):
+        # Parquet/Arrow list columns; same text as the CSV repr of the list
+        return str([str(v) for v in value])
+    return str(value)
+
+
+def _field(name, text):
+    return f"{len(name)}:{name}{len(text)}:{text}"
+
+
+def encode_row(row):
+    """Canonical bytes of one row, given as a {column: value} mapping."""
+    return "".join(_field(str(k), _text(row[k])) for k in sorted(row, key=str)).encode("utf-8")
+
+
+def encode_rows(df):
+    """encode_row for every row of a DataFrame, built a column at a time."""
+    fields = []
+    for name in sorted(df.columns, key=str):
+        col = df[name]
+        if col.dtype.kind in "iub" or (col.dtype.kind == "f" and not col.hasnans):
+            texts = list(map(str, col.tolist()))
+        elif col.dtype.kind not in "fc" and infer_dtype(col, skipna=True) in ("string", "empty"):
+            texts = col.fillna("").tolist()
+        else:
+            texts = [_text(v) for v in col.tolist()]
+        head = f"{len(str(name))}:{name}"
+        fields.append([f"{head}{len(t)}:{t}" for t in texts])
+    return [row.encode("utf-8") for row in map("".join, zip(*fields))]
+
+
+def leaf_hash(encoded):
+    return hashlib.sha256(LEAF + encoded).digest()
+
+
+def node_hash(left, right):
+    return hashlib.sha256(NODE + left + right).digest()
+
+
+class MerkleTree:
+    """All levels of the tree, each as one bytes object of 32-byte hashes."""
+
+    def __init__(self, leaves):
+        self.levels = [bytes(leaves)]
+        while len(self.levels[-1]) > 32:
+            level = self.levels[-1]
+            paired = len(level) // 64 * 64
+            up = b"".join([hashlib.sha256(NODE + level[i:i + 64]).digest()
+                           for i in range(0, paired, 64)])
+            self.levels.append(up + level[paired:])
+
+    @classmethod
+    def from_frame(cls, df):
+        return cls(b"".join([leaf_hash(e) for e in encode_rows(df)]))
+
+    def __len__(self):
+        return len(self.levels[0]) // 32
+
+    @property
+    def root(self):
+        return self.levels[-1].hex() if len(self) else EMPTY_ROOT
+
+    def proof(self, index):
+        """[[side, sibling hex]] from leaf `index` up; side is where the sibling sits."""
+        if not 0 <= index < len(self):
+            raise IndexError(f"Row {index} out of range for {len(self)} rows")
+        path = []
+        for level in self.levels[:-1]:
+            sibling = index ^ 1
+            if sibling * 32 < len(level):
+                side = "L" if sibling < index else "R"
+                path.append([side, level[sibling * 32:sibling * 32 + 32].hex()])
+            index //= 2
+        return path
+
+
+def verify(row, proof, root):
+    """Whether `row` ({column: value}) is committed to by `root` through `proof`."""
+    h = leaf_hash(encode_row(row))
+    for side, sibling in proof:
+        sib = bytes.fromhex(sibling)
+        h = node_hash(sib, h) if side == "L" else node_hash(h, sib)
+    return h.hex() == root
+
+
+# ─── commitments next to dataset files ───────────────────────────────────────
+
+def commitment_path(path):
+    return f"{path}.merkle.json"
+
+
+def write_commitment(path, df, tree=None):
+    """Build (unless given) and save the tree root for the dataset at `path`; returns the root."""
+    if tree is None:
+        tree = MerkleTree.from_frame(df)
+    with open(commitment_path(path), "w", encoding="utf-8") as f:
+        json.dump({"root": tree.root, "rows": len(tree), "encoding": ENCODING,
+                   "columns": sorted(map(str, df.columns))}, f)
+    return tree.root
+
+
+def read_commitment(path):
+    with open(commitment_path(path), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def dataset_root(path):
+    """
+    The committed root of a saved dataset, building <path>.merkle.json when it
+    is missing or older than the file. Rows are read back from the file, so the
+    root covers exactly what a consumer parses.
+    """
+    side = commitment_path(path)
+    if os.path.exists(side) and os.path.getmtime(side) >= os.path.getmtime(path):
+        return read_commitment(path)["root"]
+    from dataset_io import read_dataset
+    return write_commitment(path, read_dataset(path))
+
+
+def prove(path, index):
+    """{row, index, proof, root} for one row of a saved dataset, checked against its commitment."""
+    from dataset_io import read_dataset
+
+    df = read_dataset(path)
+    tree = MerkleTree.from_frame(df)
+    if os.path.exists(commitment_path(path)) and read_commitment(path)["root"] != tree.root:
+        raise ValueError(f"{path} no longer matches its Merkle commitment")
+    row = {str(k): _text(v) for k, v in df.iloc[index].to_dict().items()}
+    return {"row": row, "index": index, "proof": tree.proof(index), "root": tree.root}
+
+
+if __name__ == "__main__":
+    import argparse
+
+    p = argparse.ArgumentParser(description="Merkle commitments over dataset rows")
+    sub = p.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("root", help="print (and save) the root of a dataset").add_argument("path")
+    pp = sub.add_parser("prove", help="print the inclusion proof of one row as JSON")
+    pp.add_argument("path")
+    pp.add_argument("index", type=int)
+    vp = sub.add_parser("verify", help="check a proof JSON from `prove`")
+    vp.add_argument("proof", help="proof file, or - for stdin")
+    args = p.parse_args()
+
+    if args.cmd == "root":
+        from dataset_io import read_dataset
+        print(write_commitment(args.path, read_dataset(args.path)))
+    elif args.cmd == "prove":
+        print(json.dumps(prove(args.path, args.index), ensure_ascii=False))
+    else:
+        doc = json.load(sys.stdin if args.proof == "-" else open(args.proof, encoding="utf-8"))
+        ok = verify(doc["row"], doc["proof"], doc["root"])
+        print("✅ row is in the dataset" if ok else "❌ proof does not match the root")
+        sys.exit(0 if ok else 1)
@@ -0,0 +1,195 @@
+# metrics.py
+#
+# Process-wide timers, counters and histograms for a scraper run, exportable
+# as a Prometheus text file or a JSON summary.
+#
+#   with metrics.timed("llm.analyze_tweet"): ...
+#   @metrics.timed("pinata.pin_file")
+#   def pin(...): ...
+#   metrics.inc("tweets.scraped")
+
+import json
+import time
+import bisect
+import logging
+import threading
+import functools
+from contextlib import contextmanager
+
+# Upper bounds (seconds) of the latency histogram buckets.
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+
+class Histogram:
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.min = None
+        self.max = None
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def quantile(self, q):
+        """Bucket upper bound at quantile q (approximate, like Prometheus)."""
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        seen = 0
+        for bound, n in zip(self.buckets + (self.max,), self.counts):
+            seen += n
+            if seen >= target:
+                return min(bound, self.max)
+        return self.max
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "sum": round(self.sum, 6),
+            "mean": round(self.sum / self.count, 6) if self.count else 0.0,
+            "min": self.min,
+            "max": self.max,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+        }
+
+
+class Registry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters = {}
+        self.histograms = {}
+        self.started = time.time()
+
+    def inc(self, name, value=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def observe(self, name, value):
+        with self._lock:
+            hist = self.histograms.get(name)
+            if hist is None:
+                hist = self.histograms[name] = Histogram()
+            hist.observe(value)
+
+    def reset(self):
+        with self._lock:
+            self.counters.clear()
+            self.histograms.clear()
+            self.started = time.time()
+
+    def summary(self):
+        with self._lock:
+            return {
+                "wall_seconds": round(time.time() - self.started, 3),
+                "counters": dict(self.counters),
+                "timers": {k: h.summary() for k, h in self.histograms.items()},
+            }
+
+    def prometheus(self, prefix="scraper"):
+        """Prometheus text exposition format (node_exporter textfile collector)."""
+        lines = []
+        with self._lock:
+            for name, value in sorted(self.counters.items()):
+                metric = f"{prefix}_{_metric_name(name)}_total"
+                lines += [f"# TYPE {metric} counter", f"{metric} {value}"]
+            for name, hist in sorted(self.histograms.items()):
+                metric = f"{prefix}_{_metric_name(name)}_seconds"
+                lines.append(f"# TYPE {metric} histogram")
+                cumulative = 0
+                for bound, n in zip(hist.buckets, hist.counts):
+                    cumulative += n
+                    lines.append(f'{metric}_bucket{{le="{bound}"}} {cumulative}')
+                lines.append(f'{metric}_bucket{{le="+Inf"}} {hist.count}')
+                lines.append(f"{metric}_sum {hist.sum}")
+                lines.append(f"{metric}_count {hist.count}")
+        return "\n".join(lines) + "\n"
+
+
+def _metric_name(name):
+    return "".join(c if c.isalnum() else "_" for c in name).lower()
+
+
+REGISTRY = Registry()
+inc = REGISTRY.inc
+observe = REGISTRY.observe
+
+
+class timed:
+    """
+    Time a block or a function into the `name` histogram. Failures are
+    also counted under `<name>.errors`.
+    """
+
+    def __init__(self, name, registry=REGISTRY):
+        self.name = name
+        self.registry = registry
+
+    def __enter__(self):
+        self._t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.registry.observe(self.name, time.perf_counter() - self._t0)
+        if exc_type is not None and not issubclass(exc_type, KeyboardInterrupt):
+            self.registry.inc(f"{self.name}.errors")
+        return False
+
+    def __call__(self, fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with timed(self.name, self.registry):
+                return fn(*args, **kwargs)
+        return wrapper
+
+
+def export(path, fmt=None, registry=REGISTRY):
+    """Write the run's metrics to `path` (.prom → Prometheus text, otherwise JSON)."""
+    fmt = fmt or ("prometheus" if path.endswith(".prom") else "json")
+    with open(path, "w") as f:
+        if fmt == "prometheus":
+            f.write(registry.prometheus())
+        else:
+            json.dump(registry.summary(), f, indent=2)
+    logging.info(f"📈 Metrics written to {path}")
+
+
+@contextmanager
+def profiled(path=None):
+    """
+    Profile the enclosed block. Uses pyinstrument when installed (HTML
+    report), cProfile otherwise (.pstats). Does nothing when path is None.
+    """
+    if not path:
+        yield
+        return
+    try:
+        from pyinstrument import Profiler
+    except ImportError:
+        Profiler = None
+    if Profiler is not None:
+        profiler = Profiler()
+        profiler.start()
+        try:
+            yield
+        finally:
+            profiler.stop()
+            with open(path, "w") as f:
+                f.write(profiler.output_html())
+            logging.info(f"🔬 pyinstrument profile written to {path}")
+    else:
+        import cProfile
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            profiler.dump_stats(path)
+            logging.info(f"🔬 cProfile stats written to {path} (view with python -m pstats)")
@@ -0,0 +1,133 @@
+# multicall.py
+#
+# Many contract reads in one round trip. Calls are packed into a single
+# Multicall3 aggregate3 eth_call (deployed at the same address on Flare,
+# Coston2, Filecoin and most EVM chains); on a chain without Multicall3 they
+# go out as one JSON-RPC batch of eth_calls instead.
+#
+#   values = multicall.read([gov.functions.state(7), gov.functions.proposalDeadline(7)])
+#   values, latest = multicall.read(calls, latest_block=True)   # + the head block
+#
+#   MULTICALL_ADDRESS  Multicall3 deployment (default the canonical 0xcA11…CA11)
+
+import os
+import logging
+
+import metrics
+import rpc
+
+MULTICALL3 = os.getenv("MULTICALL_ADDRESS", "0xcA11bde05977b3631167028862bE2a173976CA11")
+
+AGGREGATE3_ABI = {
+    "name": "aggregate3",
+    "type": "function",
+    "stateMutability": "payable",
+    "inputs": [{
+        "name": "calls", "type": "tuple[]",
+        "components": [
+            {"name": "target", "type": "address"},
+            {"name": "allowFailure", "type": "bool"},
+            {"name": "callData", "type": "bytes"},
+        ],
+    }],
+    "outputs": [{
+        "name": "returnData", "type": "tuple[]",
+        "components": [
+            {"name": "success", "type": "bool"},
+            {"name": "returnData", "type": "bytes"},
+        ],
+    }],
+}
+
+# (provider id, address) → whether Multicall3 code is deployed there
+_deployed = {}
+
+
+class MulticallError(RuntimeError):
+    """A read in the batch failed and allow_failure was not set."""
+
+
+def is_deployed(w3, address=MULTICALL3):
+    key = (id(w3.provider), address.lower())
+    if key not in _deployed:
+        _deployed[key] = len(w3.eth.get_code(w3.to_checksum_address(address))) > 0
+        if not _deployed[key]:
+            logging.info(f"No Multicall3 at {address}; batching reads as JSON-RPC arrays")
+    return _deployed[key]
+
+
+def _output_types(fn):
+    return [_abi_type(o) for o in fn.abi.get("outputs", [])]
+
+
+def _abi_type(param):
+    if param["type"].startswith("tuple"):
+        inner = ",".join(_abi_type(c) for c in param["components"])
+        return f"({inner}){param['type'][5:]}"
+    return param["type"]
+
+
+def _decode(w3, fn, data):
+    values = w3.codec.decode(_output_types(fn), bytes(data))
+    # same shape as ContractFunction.call(): one output → the bare value
+    return values[0] if len(values) == 1 else list(values)
+
+
+def _result(response):
+    if "error" in response:
+        raise MulticallError(response["error"].get("message", str(response["error"])))
+    return response["result"]
+
+
+def read(calls, latest_block=False, allow_failure=False, address=MULTICALL3, use_multicall=None):
+    """
+    Execute bound ContractFunction reads (contract.functions.name(*args)) in
+    one round trip and return their decoded results in order. Failed reads
+    raise MulticallError, or come back as None with allow_failure. With
+    latest_block, returns (results, {"number", "timestamp"}) for the head
+    block from the same request.
+    """
+    if not calls:
+        return ([], None) if latest_block else []
+    w3 = calls[0].w3
+    if use_multicall is None:
+        use_multicall = is_deployed(w3, address)
+    datas = [fn._encode_transaction_data() for fn in calls]
+    if use_multicall:
+        aggregator = w3.eth.contract(address=w3.to_checksum_address(address), abi=[AGGREGATE3_ABI])
+        packed = [(fn.address, True, data) for fn, data in zip(calls, datas)]
+        agg_data = aggregator.functions.aggregate3(packed)._encode_transaction_data()
+        requests = [("eth_call", [{"to": aggregator.address, "data": agg_data}, "latest"])]
+    else:
+        requests = [("eth_call", [{"to": fn.address, "data": data}, "latest"])
+                    for fn, data in zip(calls, datas)]
+    if latest_block:
+        requests.append(("eth_getBlockByNumber", ["latest", False]))
+
+    with metrics.timed("rpc.multicall"):
+        responses = rpc.send_batch(w3, requests)
+    metrics.inc("rpc.multicall.reads", len(calls))
+
+    if use_multicall:
+        raw = w3.codec.decode(["(bool,bytes)[]"], bytes.fromhex(_result(responses[0])[2:]))[0]
+        outcomes = [(ok, data, "reverted") for ok, data in raw]
+    else:
+        outcomes = []
+        for response in responses[:len(calls)]:
+            if "error" in response:
+                outcomes.append((False, b"", response["error"].get("message", "reverted")))
+            else:
+                outcomes.append((True, bytes.fromhex(response["result"][2:]), None))
+
+    results = []
+    for fn, (ok, data, why) in zip(calls, outcomes):
+        if ok:
+            results.append(_decode(w3, fn, data))
+        elif allow_failure:
+            results.append(None)
+        else:
+            raise MulticallError(f"{fn.fn_name}{tuple(fn.args)} failed: {why}")
+    if not latest_block:
+        return results
+    block = _result(responses[-1])
+    return results, {"number": int(block["number"], 16), "timestamp": int(block["timestamp"], 16)}
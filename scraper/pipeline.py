@@ -0,0 +1,196 @@
+import os
+import time
+import queue
+import logging
+import threading
+
+import metrics
+
+# Sentinel pushed once per worker to shut a stage down after its inbox drains.
+_DONE = object()
+
+# Default worker count / inbox size / micro-batch size per stage. Override
+# with PIPELINE_<STAGE>_WORKERS, PIPELINE_<STAGE>_QUEUE and
+# PIPELINE_<STAGE>_BATCH in the environment.
+STAGE_DEFAULTS = {
+    "pin":      {"workers": 4, "maxsize": 32},
+    "score":    {"workers": 4, "maxsize": 32, "batch": 8},
+    "classify": {"workers": 1, "maxsize": 64, "batch": 16},
+    # bulk_publish.py: network-bound steps get more slots than CAR building
+    "publish_pin":      {"workers": 4, "maxsize": 8},
+    "publish_car":      {"workers": 2, "maxsize": 4},
+    "publish_upload":   {"workers": 2, "maxsize": 4},
+    "publish_deal":     {"workers": 4, "maxsize": 8},
+    "publish_register": {"workers": 1, "maxsize": 32, "batch": 16},
+}
+# How long a batching worker waits for more items before running a short batch.
+BATCH_LINGER = float(os.getenv("PIPELINE_BATCH_LINGER", "0.5"))
+
+
+def stage_settings(name):
+    """Return (workers, maxsize) for a stage, honouring env overrides."""
+    defaults = STAGE_DEFAULTS.get(name, {"workers": 1, "maxsize": 0})
+    key = name.upper()
+    workers = int(os.getenv(f"PIPELINE_{key}_WORKERS", defaults["workers"]))
+    maxsize = int(os.getenv(f"PIPELINE_{key}_QUEUE", defaults["maxsize"]))
+    return max(1, workers), max(0, maxsize)
+
+
+def stage_batch(name):
+    """Return the micro-batch size for a batched stage."""
+    default = STAGE_DEFAULTS.get(name, {}).get("batch", 1)
+    return max(1, int(os.getenv(f"PIPELINE_{name.upper()}_BATCH", default)))
+
+
+class Stage:
+    """
+    A pool of worker threads pulling items from a bounded inbox.
+    Each item is passed through `fn` and forwarded to the next stage.
+    A full inbox blocks the producer, which is how backpressure propagates.
+
+    A batched stage (batch=N) instead collects up to N items, waiting at most
+    `linger` seconds for stragglers; `fn` receives the list and returns a
+    list of outputs, each forwarded on its own.
+    """
+
+    def __init__(self, name, fn, workers=1, maxsize=0, batch=None, linger=BATCH_LINGER):
+        self.name = name
+        self.fn = fn
+        self.workers = max(1, int(workers))
+        self.batch = None if batch is None else max(1, int(batch))
+        self.linger = linger
+        self.inbox = queue.Queue(maxsize=maxsize)
+        self.downstream = None
+        self.processed = 0
+        self.errors = []
+        self._lock = threading.Lock()
+        self._threads = []
+
+    def start(self):
+        for i in range(self.workers):
+            t = threading.Thread(target=self._run, name=f"{self.name}-{i}", daemon=True)
+            t.start()
+            self._threads.append(t)
+
+    def _run(self):
+        if self.batch is not None:
+            return self._run_batches()
+        while True:
+            item = self.inbox.get()
+            if item is _DONE:
+                break
+            t0 = time.perf_counter()
+            try:
+                out = self.fn(item)
+            except Exception as e:
+                metrics.inc(f"pipeline.{self.name}.errors")
+                # Never drop the item: the stage function owns its own fallbacks,
+                # anything escaping it is logged and the item moves on unchanged.
+                logging.error(f"Pipeline stage '{self.name}' failed: {e}")
+                with self._lock:
+                    self.errors.append((item, e))
+                out = item
+            metrics.observe(f"pipeline.{self.name}", time.perf_counter() - t0)
+            with self._lock:
+                self.processed += 1
+            if out is not None and self.downstream is not None:
+                self.downstream.inbox.put(out)
+
+    def _collect(self):
+        """Block for one item, then take more until the batch is full or linger expires."""
+        first = self.inbox.get()
+        if first is _DONE:
+            return [], True
+        items = [first]
+        deadline = time.monotonic() + self.linger
+        while len(items) < self.batch:
+            try:
+                item = self.inbox.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                break
+            if item is _DONE:
+                return items, True
+            items.append(item)
+        return items, False
+
+    def _run_batches(self):
+        done = False
+        while not done:
+            items, done = self._collect()
+            if not items:
+                break
+            t0 = time.perf_counter()
+            try:
+                outs = self.fn(items)
+            except Exception as e:
+                metrics.inc(f"pipeline.{self.name}.errors")
+                logging.error(f"Pipeline stage '{self.name}' failed on a batch of {len(items)}: {e}")
+                with self._lock:
+                    self.errors.extend((item, e) for item in items)
+                outs = items
+            metrics.observe(f"pipeline.{self.name}", time.perf_counter() - t0)
+            metrics.inc(f"pipeline.{self.name}.batches")
+            with self._lock:
+                self.processed += len(items)
+            if self.downstream is not None:
+                for out in outs or ():
+                    if out is not None:
+                        self.downstream.inbox.put(out)
+
+    def stop(self):
+        for _ in self._threads:
+            self.inbox.put(_DONE)
+        for t in self._threads:
+            t.join()
+        self._threads = []
+
+
+class Pipeline:
+    """
+    Linear chain of stages connected by bounded queues.
+
+        p = Pipeline().add("score", fn, workers=4, maxsize=32).add("classify", fn2)
+        p.start(); p.put(item); ...; p.close()
+    """
+
+    def __init__(self):
+        self.stages = []
+        self.running = False
+
+    def add(self, name, fn, workers=None, maxsize=None, batch=None, linger=BATCH_LINGER):
+        """Append a stage; with `batch`, `fn` maps a list of items to a list of outputs."""
+        default_workers, default_maxsize = stage_settings(name)
+        stage = Stage(
+            name, fn,
+            workers=default_workers if workers is None else workers,
+            maxsize=default_maxsize if maxsize is None else maxsize,
+            batch=batch,
+            linger=linger,
+        )
+        if self.stages:
+            self.stages[-1].downstream = stage
+        self.stages.append(stage)
+        return self
+
+    def start(self):
+        for stage in self.stages:
+            stage.start()
+            logging.info(f"Pipeline stage '{stage.name}': workers={stage.workers}, "
+                         f"queue={stage.inbox.maxsize or 'unbounded'}, batch={stage.batch or 1}")
+        self.running = True
+        return self
+
+    def put(self, item):
+        """Feed the first stage; blocks while its inbox is full."""
+        self.stages[0].inbox.put(item)
+
+    def close(self):
+        """Drain every stage in order and stop its workers."""
+        if not self.running:
+            return
+        for stage in self.stages:
+            stage.stop()
+        self.running = False
+
+    def errors(self):
+        return [(s.name, item, e) for s in self.stages for item, e in s.errors]
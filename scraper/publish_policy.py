@@ -0,0 +1,106 @@
+# publish_policy.py
+#
+# Deviation / heartbeat policy for on-chain pushes, the way price oracles
+# decide when to update: a value is only sent when it moved at least
+# DEVIATION from the last published one, or HEARTBEAT seconds have passed
+# since that publish. The last published value per feed is kept locally and
+# reconciled with the chain before the first decision of a process, so a
+# reverted or foreign update is noticed.
+#
+#   policy = get_policy()
+#   policy.verify("tweetScore@0xabc…", on_chain_value)
+#   publish, reason = policy.decide("tweetScore@0xabc…", 57)
+#   ... send ...; policy.record("tweetScore@0xabc…", 57, tx_hash)
+#
+#   PUBLISH_DEVIATION  minimum move, in the feed's own units (default 2)
+#   PUBLISH_HEARTBEAT  seconds after which the value is re-sent anyway (default 3600)
+#   PUBLISH_STATE      state file (default ./cache/published.json)
+
+import os
+import json
+import time
+import logging
+import threading
+
+DEVIATION = float(os.getenv("PUBLISH_DEVIATION", "2"))
+HEARTBEAT = float(os.getenv("PUBLISH_HEARTBEAT", "3600"))
+STATE_PATH = os.getenv("PUBLISH_STATE", "./cache/published.json")
+
+
+class PublishPolicy:
+    def __init__(self, path=STATE_PATH, deviation=DEVIATION, heartbeat=HEARTBEAT, clock=time.time):
+        self.path = path
+        self.deviation = deviation
+        self.heartbeat = heartbeat
+        self.clock = clock
+        self.verified = set()
+        self._lock = threading.RLock()
+        self._state = {}
+        if os.path.exists(path):
+            try:
+                with open(path) as f:
+                    self._state = json.load(f)
+            except (OSError, ValueError) as e:
+                logging.warning(f"Ignoring unreadable publish state {path}: {e}")
+
+    def last(self, feed):
+        """{"value", "published_at", "tx"} of the last publish, or None."""
+        with self._lock:
+            entry = self._state.get(feed)
+            return dict(entry) if entry else None
+
+    def _save(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(self._state, f, indent=2, sort_keys=True)
+        os.replace(tmp, self.path)
+
+    def verify(self, feed, on_chain):
+        """
+        Reconcile the local record with the value on chain. On a mismatch the
+        chain wins and the publish time becomes unknown, so the heartbeat is
+        due and the next decision re-publishes.
+        """
+        with self._lock:
+            entry = self._state.get(feed)
+            if entry is None or entry["value"] != on_chain:
+                if entry is not None:
+                    logging.warning(f"{feed}: local state says {entry['value']}, chain has "
+                                    f"{on_chain}; trusting the chain")
+                self._state[feed] = {"value": on_chain, "published_at": 0, "tx": None}
+                self._save()
+            self.verified.add(feed)
+
+    def decide(self, feed, value):
+        """(publish?, reason) for sending `value` to `feed` now."""
+        with self._lock:
+            entry = self._state.get(feed)
+        if entry is None:
+            return True, "first publish"
+        move = abs(value - entry["value"])
+        if move >= self.deviation and move > 0:
+            return True, f"moved {move:g} (deviation threshold {self.deviation:g})"
+        age = self.clock() - (entry["published_at"] or 0)
+        if age >= self.heartbeat:
+            return True, f"heartbeat ({age:.0f}s since last publish)"
+        return False, (f"moved {move:g} < {self.deviation:g}, "
+                       f"heartbeat due in {self.heartbeat - age:.0f}s")
+
+    def record(self, feed, value, tx=None):
+        with self._lock:
+            self._state[feed] = {"value": value, "published_at": self.clock(), "tx": tx}
+            self._save()
+
+
+_policy = None
+_policy_lock = threading.Lock()
+
+
+def get_policy():
+    """The process-wide policy over STATE_PATH."""
+    global _policy
+    with _policy_lock:
+        if _policy is None:
+            _policy = PublishPolicy()
+        return _policy
@@ -0,0 +1,167 @@
+import re
+
+import numpy as np
+
+COUNT_RE = re.compile(r"^\s*([0-9][0-9,]*(?:\.[0-9]+)?)\s*([KMB]?)\s*$", re.IGNORECASE)
+COUNT_MULTIPLIERS = {"": 1, "K": 1_000, "M": 1_000_000, "B": 1_000_000_000}
+
+
+def parse_count(text) -> int:
+    """
+    Turn a count as Twitter renders it ("0", "1,234", "1.2K", "3M") into an int.
+    Anything unparseable counts as 0.
+    """
+    if isinstance(text, (int, np.integer)):
+        return int(text)
+    if not text:
+        return 0
+    m = COUNT_RE.match(str(text))
+    if not m:
+        return 0
+    value = float(m.group(1).replace(",", ""))
+    return int(round(value * COUNT_MULTIPLIERS[m.group(2).upper()]))
+
+
+# (attribute, CSV column or None if not written, storage kind)
+FIELDS = (
+    ("name",            "Name",            "obj"),
+    ("handle",          "Handle",          "obj"),
+    ("timestamp",       "Timestamp",       "obj"),
+    ("verified",        "Verified",        "bool"),
+    ("content",         "Content",         "obj"),
+    ("comments",        "Comments",        "int"),
+    ("retweets",        "Retweets",        "int"),
+    ("likes",           "Likes",           "int"),
+    ("analytics",       "Analytics",       "int"),
+    ("tags",            "Tags",            "obj"),
+    ("mentions",        "Mentions",        "obj"),
+    ("emojis",          None,              "obj"),
+    ("profile_image",   "Profile Image",   "obj"),
+    ("tweet_link",      "Tweet Link",      "obj"),
+    ("tweet_id",        "Tweet ID",        "obj"),
+    ("user_id",         None,              "obj"),
+    ("following",       None,              "int"),
+    ("followers",       None,              "int"),
+    ("ipfs_screenshot", "IPFS Screenshot", "obj"),
+)
+FIELD_NAMES = tuple(f for f, _, _ in FIELDS)
+_DTYPES = {"obj": object, "bool": np.bool_, "int": np.int64}
+_FIELD_DTYPE = {f: _DTYPES[kind] for f, _, kind in FIELDS}
+
+
+class TweetRecord:
+    """One scraped tweet. Counts are ints, parsed once at capture time."""
+
+    __slots__ = FIELD_NAMES
+
+    def __init__(self, name, handle, timestamp, verified, content,
+                 comments=0, retweets=0, likes=0, analytics=0,
+                 tags=(), mentions=(), emojis=(), profile_image="",
+                 tweet_link="", tweet_id="", user_id=None,
+                 following=0, followers=0, ipfs_screenshot=""):
+        self.name = name
+        self.handle = handle
+        self.timestamp = timestamp
+        self.verified = bool(verified)
+        self.content = content
+        self.comments = parse_count(comments)
+        self.retweets = parse_count(retweets)
+        self.likes = parse_count(likes)
+        self.analytics = parse_count(analytics)
+        self.tags = list(tags)
+        self.mentions = list(mentions)
+        self.emojis = list(emojis)
+        self.profile_image = profile_image
+        self.tweet_link = tweet_link
+        self.tweet_id = tweet_id
+        self.user_id = user_id
+        self.following = parse_count(following)
+        self.followers = parse_count(followers)
+        self.ipfs_screenshot = ipfs_screenshot
+
+    def to_dict(self):
+        return {f: getattr(self, f) for f in FIELD_NAMES}
+
+    @classmethod
+    def from_dict(cls, d):
+        return cls(**{f: d[f] for f in FIELD_NAMES if f in d})
+
+    def __repr__(self):
+        return f"TweetRecord({self.handle} {self.timestamp} {self.content[:40]!r})"
+
+
+class TweetBuffer:
+    """
+    Column-oriented store for scraped tweets. Each field lives in numpy
+    chunks of `chunk_size` rows that are allocated as the scrape grows, so
+    a row costs a few array slots instead of a tuple plus boxed strings,
+    and the DataFrame is assembled per column rather than per row.
+    """
+
+    def __init__(self, chunk_size=1024):
+        self.chunk_size = chunk_size
+        self._chunks = {f: [] for f in FIELD_NAMES}
+        self._len = 0
+
+    def __len__(self):
+        return self._len
+
+    def __iter__(self):
+        for idx in range(self._len):
+            yield self[idx]
+
+    def _locate(self, idx):
+        if idx < 0:
+            idx += self._len
+        if not 0 <= idx < self._len:
+            raise IndexError(idx)
+        return divmod(idx, self.chunk_size)
+
+    def append(self, rec: TweetRecord) -> int:
+        chunk, pos = divmod(self._len, self.chunk_size)
+        if pos == 0:
+            for f in FIELD_NAMES:
+                self._chunks[f].append(np.zeros(self.chunk_size, dtype=_FIELD_DTYPE[f]))
+        for f in FIELD_NAMES:
+            self._chunks[f][chunk][pos] = getattr(rec, f)
+        self._len += 1
+        return self._len - 1
+
+    def get(self, idx, field):
+        chunk, pos = self._locate(idx)
+        value = self._chunks[field][chunk][pos]
+        return value.item() if isinstance(value, np.generic) else value
+
+    def set(self, idx, field, value):
+        chunk, pos = self._locate(idx)
+        self._chunks[field][chunk][pos] = value
+
+    def __getitem__(self, idx) -> TweetRecord:
+        return TweetRecord(**{f: self.get(idx, f) for f in FIELD_NAMES})
+
+    def column(self, field):
+        """The whole column as one array (a view when it fits in one chunk)."""
+        chunks = self._chunks[field]
+        if not chunks:
+            return np.zeros(0, dtype=_FIELD_DTYPE[field])
+        n_full, tail = divmod(self._len, self.chunk_size)
+        parts = chunks[:n_full] + ([chunks[n_full][:tail]] if tail else [])
+        return parts[0] if len(parts) == 1 else np.concatenate(parts)
+
+    def to_frame(self, all_fields=False) -> "pd.DataFrame":
+        """
+        DataFrame in the published CSV layout (or every field, keyed by
+        attribute name, with all_fields=True).
+        """
+        import pandas as pd  # only needed at save time; keeps scraper startup light
+
+        cols = {}
+        for f, csv_name, _ in FIELDS:
+            if all_fields:
+                cols[f] = self.column(f)
+            elif csv_name is not None:
+                cols[csv_name] = self.column(f)
+        df = pd.DataFrame(cols, copy=False)
+        if not all_fields:
+            df["Tweet ID"] = "tweet_id:" + df["Tweet ID"].astype(str)
+        return df
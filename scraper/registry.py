@@ -0,0 +1,113 @@
+# registry.py
+#
+# Local mirror of the dataset IDs registered in AIDatasetRegistry, so
+# duplicate checks need no per-CID datasets() call. datasetIds is append-only,
+# so a sync reads getDatasetCount and only the IDs past the mirrored count,
+# all in one multicall round trip.
+#
+#   mirror = RegistryMirror(contract)
+#   mirror.sync()
+#   new = mirror.unregistered(["Qm…", "Qm…"])
+#   fees = mirror.prices(["Qm…"])        # cached: the registry has no price setter
+#
+#   REGISTRY_CACHE  SQLite file (default ./cache/registry.sqlite)
+
+import os
+import sqlite3
+import logging
+import threading
+
+import metrics
+import multicall
+
+CACHE_PATH = os.getenv("REGISTRY_CACHE", "./cache/registry.sqlite")
+
+
+class RegistryMirror:
+    def __init__(self, contract, path=CACHE_PATH, chain_id=None):
+        self.contract = contract
+        self.chain_id = chain_id if chain_id is not None else contract.w3.eth.chain_id
+        self.key = f"{self.chain_id}:{contract.address}"
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("CREATE TABLE IF NOT EXISTS dataset_ids ("
+                         "registry TEXT, idx INTEGER, id TEXT, PRIMARY KEY (registry, idx))")
+        self._db.execute("CREATE INDEX IF NOT EXISTS dataset_ids_by_id ON dataset_ids (registry, id)")
+        self._db.execute("CREATE TABLE IF NOT EXISTS dataset_prices ("
+                         "registry TEXT, id TEXT, price TEXT, PRIMARY KEY (registry, id))")
+        self._lock = threading.Lock()
+
+    def close(self):
+        self._db.close()
+
+    def __len__(self):
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM dataset_ids WHERE registry = ?",
+                                    (self.key,)).fetchone()[0]
+
+    def __contains__(self, dataset_id):
+        with self._lock:
+            return self._db.execute("SELECT 1 FROM dataset_ids WHERE registry = ? AND id = ?",
+                                    (self.key, dataset_id)).fetchone() is not None
+
+    def ids(self):
+        with self._lock:
+            rows = self._db.execute("SELECT id FROM dataset_ids WHERE registry = ? ORDER BY idx",
+                                    (self.key,)).fetchall()
+        return [r[0] for r in rows]
+
+    def sync(self, batch=500):
+        """Pull IDs registered since the last sync; returns how many were new."""
+        fns = self.contract.functions
+        known = len(self)
+        with metrics.timed("registry.sync"):
+            # through multicall.read: a plain .call() costs an extra eth_chainId
+            count = multicall.read([fns.getDatasetCount()])[0]
+            if count < known:
+                # a different deployment at the same address (dev chains): start over
+                logging.warning(f"Registry {self.key} shrank from {known} to {count}; rebuilding mirror")
+                with self._lock, self._db:
+                    self._db.execute("DELETE FROM dataset_ids WHERE registry = ?", (self.key,))
+                known = 0
+            for start in range(known, count, batch):
+                stop = min(start + batch, count)
+                ids = multicall.read([fns.datasetIds(i) for i in range(start, stop)])
+                with self._lock, self._db:
+                    self._db.executemany("INSERT OR REPLACE INTO dataset_ids VALUES (?, ?, ?)",
+                                         [(self.key, i, d) for i, d in zip(range(start, stop), ids)])
+        metrics.inc("registry.synced_ids", count - known)
+        return count - known
+
+    def unregistered(self, dataset_ids):
+        """The given IDs that are not in the mirror, first occurrence only, in order."""
+        seen = set()
+        out = []
+        for d in dataset_ids:
+            if d not in seen and d not in self:
+                out.append(d)
+            seen.add(d)
+        return out
+
+    def prices(self, dataset_ids):
+        """
+        {id: price in wei} for the given IDs. Prices are fixed at addDataset, so
+        they are cached for good; IDs not cached yet are read with one
+        datasets() multicall. IDs that are not registered are left out.
+        """
+        wanted = list(dict.fromkeys(dataset_ids))
+        with self._lock:
+            known = dict(self._db.execute(
+                f"SELECT id, price FROM dataset_prices WHERE registry = ? AND id IN "
+                f"({','.join('?' * len(wanted))})", (self.key, *wanted)).fetchall()) if wanted else {}
+        out = {d: int(p) for d, p in known.items()}
+        missing = [d for d in wanted if d not in out]
+        if missing:
+            rows = multicall.read([self.contract.functions.datasets(d) for d in missing])
+            fresh = {d: row[4] for d, row in zip(missing, rows) if row[7]}
+            with self._lock, self._db:
+                # TEXT: prices are uint256 and may not fit SQLite's INTEGER
+                self._db.executemany("INSERT OR REPLACE INTO dataset_prices VALUES (?, ?, ?)",
+                                     [(self.key, d, str(p)) for d, p in fresh.items()])
+            out.update(fresh)
+        return out
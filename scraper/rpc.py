@@ -0,0 +1,285 @@
+# rpc.py
+#
+# Shared JSON-RPC layer for every Web3 client in the repo. One provider per
+# endpoint list gives
+#   - a pooled keep-alive aiohttp session, living on a background event loop
+#   - JSON-RPC batch arrays (batch_call, or Web3's own batch_requests())
+#   - failover across comma-separated URLs: RPC_URL="https://a,https://b"
+#   - per-endpoint latency and error metrics (rpc.http.<host>)
+#
+#   w3 = rpc.get_web3("RPC_URL")              # blocking Web3 over the pool
+#   aw3 = rpc.get_async_web3("RPC_URL")       # AsyncWeb3 for coroutines
+#   snap, dl = rpc.batch_call([gov.functions.proposalSnapshot(p),
+#                              gov.functions.proposalDeadline(p)])  # one POST
+#   b1, b2 = rpc.gather(aw3.eth.get_block(1), aw3.eth.get_block(2))   # concurrent
+#
+#   RPC_TIMEOUT    seconds per HTTP request (default 15)
+#   RPC_POOL_SIZE  open connections per process (default 16)
+#   RPC_COOLDOWN   seconds a failed endpoint is tried last (default 30)
+
+import os
+import time
+import asyncio
+import logging
+import threading
+from urllib.parse import urlparse
+
+import metrics
+
+TIMEOUT = float(os.getenv("RPC_TIMEOUT", "15"))
+POOL_SIZE = int(os.getenv("RPC_POOL_SIZE", "16"))
+COOLDOWN = float(os.getenv("RPC_COOLDOWN", "30"))
+
+# ─── background event loop ───────────────────────────────────────────────────
+# Every session and AsyncWeb3 call runs on this one loop, so blocking callers
+# on any thread share the same pooled connections.
+_loop = None
+_loop_thread = None
+_loop_lock = threading.Lock()
+
+
+def _get_loop():
+    global _loop, _loop_thread
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            _loop_thread = threading.Thread(target=_loop.run_forever, name="rpc-loop", daemon=True)
+            _loop_thread.start()
+        return _loop
+
+
+def submit(coro):
+    """Schedule a coroutine on the RPC loop; returns a concurrent Future."""
+    return asyncio.run_coroutine_threadsafe(coro, _get_loop())
+
+
+def run(coro, timeout=None):
+    """Run a coroutine on the RPC loop and block for its result."""
+    loop = _get_loop()
+    if threading.current_thread() is _loop_thread:
+        coro.close()
+        raise RuntimeError("rpc.run() called on the RPC loop; await the coroutine instead")
+    return asyncio.run_coroutine_threadsafe(coro, loop).result(timeout)
+
+
+def gather(*coros):
+    """Run coroutines concurrently on the RPC loop; results in argument order."""
+    async def _all():
+        return await asyncio.gather(*coros)
+    return run(_all())
+
+
+# ─── providers ───────────────────────────────────────────────────────────────
+
+def _async_base():
+    from web3.providers.async_base import AsyncJSONBaseProvider
+    return AsyncJSONBaseProvider
+
+
+def _endpoint_name(url):
+    # host[:port] only, so API keys in paths/queries never reach metric names
+    parsed = urlparse(url)
+    return f"{parsed.hostname}:{parsed.port}" if parsed.port else str(parsed.hostname)
+
+
+def _make_failover_class():
+    import aiohttp
+
+    class FailoverProvider(_async_base()):
+        """
+        AsyncWeb3 provider that posts to the first healthy endpoint and moves
+        on to the next on connection errors, timeouts, 429 and 5xx; other HTTP
+        errors are raised to the caller as aiohttp.ClientResponseError. A
+        failed endpoint is tried last for `cooldown` seconds. Resending a signed
+        transaction to another endpoint is safe: nodes dedupe by hash.
+        """
+
+        def __init__(self, urls, timeout=TIMEOUT, pool_size=POOL_SIZE, cooldown=COOLDOWN, **kwargs):
+            super().__init__(**kwargs)
+            if not urls:
+                raise ValueError("FailoverProvider needs at least one RPC URL")
+            self.urls = list(urls)
+            self.timeout = timeout
+            self.pool_size = pool_size
+            self.cooldown = cooldown
+            self._failed_at = {}
+            self._session = None
+
+        def __str__(self):
+            return f"RPC failover [{', '.join(_endpoint_name(u) for u in self.urls)}]"
+
+        def _session_for_loop(self):
+            if self._session is None or self._session.closed:
+                self._session = aiohttp.ClientSession(
+                    connector=aiohttp.TCPConnector(limit=self.pool_size, keepalive_timeout=60),
+                    timeout=aiohttp.ClientTimeout(total=self.timeout),
+                    headers={"Content-Type": "application/json"},
+                )
+            return self._session
+
+        def endpoint_order(self):
+            """Healthy endpoints in configured order, then cooling ones, oldest failure first."""
+            now = time.monotonic()
+            cooling = {u: t for u, t in self._failed_at.items() if now - t < self.cooldown}
+            healthy = [u for u in self.urls if u not in cooling]
+            return healthy + sorted(cooling, key=cooling.get)
+
+        async def _post(self, data):
+            session = self._session_for_loop()
+            errors = []
+            for url in self.endpoint_order():
+                name = f"rpc.http.{_endpoint_name(url)}"
+                t0 = time.perf_counter()
+                try:
+                    async with session.post(url, data=data) as resp:
+                        resp.raise_for_status()
+                        body = await resp.read()
+                except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    metrics.inc(f"{name}.errors")
+                    if isinstance(e, aiohttp.ClientResponseError) and e.status < 500 and e.status != 429:
+                        # 400/401/403/404…: the request (or its credentials) is at fault, not the node
+                        raise
+                    self._failed_at[url] = time.monotonic()
+                    errors.append(f"{_endpoint_name(url)}: {type(e).__name__} {e}")
+                    if len(errors) < len(self.urls):
+                        metrics.inc("rpc.failovers")
+                        logging.warning(f"RPC {_endpoint_name(url)} failed ({e}); trying next endpoint")
+                    continue
+                metrics.observe(name, time.perf_counter() - t0)
+                self._failed_at.pop(url, None)
+                return body
+            raise ConnectionError("All RPC endpoints failed: " + "; ".join(errors))
+
+        async def make_request(self, method, params):
+            body = await self._post(self.encode_rpc_request(method, params))
+            return self.decode_rpc_response(body)
+
+        async def make_batch_request(self, requests):
+            metrics.inc("rpc.batched_calls", len(requests))
+            body = await self._post(self.encode_batch_rpc_request(requests))
+            response = self.decode_rpc_response(body)
+            if not isinstance(response, list):
+                # a malformed batch comes back as a single error object
+                return response
+            return sorted(response, key=lambda r: r.get("id") or 0)
+
+        async def disconnect(self):
+            if self._session is not None:
+                await self._session.close()
+                self._session = None
+
+    return FailoverProvider
+
+
+def _make_blocking_class():
+    from web3.providers.base import JSONBaseProvider
+
+    class BlockingProvider(JSONBaseProvider):
+        """Sync Web3 provider that forwards every request to a FailoverProvider."""
+
+        def __init__(self, provider, **kwargs):
+            super().__init__(**kwargs)
+            self.provider = provider
+
+        def __str__(self):
+            return str(self.provider)
+
+        def make_request(self, method, params):
+            return run(self.provider.make_request(method, params))
+
+        def make_batch_request(self, requests):
+            return run(self.provider.make_batch_request(requests))
+
+    return BlockingProvider
+
+
+_classes = {}
+_providers = {}
+_web3 = {}
+_async_web3 = {}
+_factory_lock = threading.Lock()
+
+
+def _cls(name, make):
+    if name not in _classes:
+        _classes[name] = make()
+    return _classes[name]
+
+
+def endpoints(env_name):
+    """Comma-separated RPC URLs from the environment (.env honoured)."""
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    urls = [u.strip() for u in (os.getenv(env_name) or "").split(",") if u.strip()]
+    if not urls:
+        raise EnvironmentError(f"{env_name} must be set (comma-separate URLs for failover)")
+    return urls
+
+
+def get_provider(env_name="RPC_URL", urls=None):
+    """One FailoverProvider per endpoint list, shared by sync and async clients."""
+    key = tuple(urls or endpoints(env_name))
+    with _factory_lock:
+        if key not in _providers:
+            _providers[key] = _cls("failover", _make_failover_class)(key)
+        return _providers[key]
+
+
+def get_web3(env_name="RPC_URL", urls=None):
+    """Blocking Web3 whose requests go through the shared pooled provider."""
+    provider = get_provider(env_name, urls)
+    with _factory_lock:
+        if provider not in _web3:
+            from web3 import Web3
+            _web3[provider] = Web3(_cls("blocking", _make_blocking_class)(provider))
+        return _web3[provider]
+
+
+def get_async_web3(env_name="RPC_URL", urls=None):
+    """AsyncWeb3 on the shared provider; await it on the RPC loop (run/submit)."""
+    provider = get_provider(env_name, urls)
+    with _factory_lock:
+        if provider not in _async_web3:
+            from web3 import AsyncWeb3
+            _async_web3[provider] = AsyncWeb3(provider)
+        return _async_web3[provider]
+
+
+def batch_call(calls):
+    """
+    Read several contract functions in one JSON-RPC batch and return their
+    decoded results in order. `calls` are bound ContractFunction objects
+    (contract.functions.name(*args)) on a client from get_web3().
+    """
+    if not calls:
+        return []
+    w3 = calls[0].w3
+    with metrics.timed("rpc.batch_call"), w3.batch_requests() as batch:
+        for fn in calls:
+            batch.add(fn)
+        return batch.execute()
+
+
+def send_batch(w3, requests):
+    """
+    Send (method, params) pairs as one JSON-RPC batch and return the raw
+    responses in order, per-request errors included (nothing is raised for
+    them). Providers without batch support get the requests one by one.
+    """
+    try:
+        responses = w3.provider.make_batch_request(requests)
+    except NotImplementedError:
+        return [w3.provider.make_request(m, p) for m, p in requests]
+    if isinstance(responses, dict):
+        raise ConnectionError(f"Batch rejected: {responses.get('error', responses)}")
+    return responses
+
+
+def close():
+    """Close pooled sessions (tests, daemon shutdown)."""
+    for provider in list(_providers.values()):
+        try:
+            run(provider.disconnect(), timeout=5)
+        except Exception as e:
+            logging.debug(f"Closing {provider}: {e}")
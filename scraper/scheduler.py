@@ -0,0 +1,217 @@
+# scheduler.py
+#
+# Runs recurring jobs on a fixed pool of long-lived workers. Each worker owns
+# its expensive state (a logged-in browser) for the life of the process, so a
+# job only pays for the scrape itself.
+#
+#   sched = Scheduler(load_jobs("jobs.json"), make_worker, concurrency=2)
+#   sched.run(stop_event)
+
+import json
+import time
+import queue
+import random
+import logging
+import threading
+
+import metrics
+
+DEFAULT_INTERVAL = 900
+DEFAULT_JITTER = 60
+
+# Sentinel handed to each worker thread on shutdown.
+_STOP = object()
+
+
+class Job:
+    """One recurring scrape target, e.g. a per-coin search query."""
+
+    __slots__ = ("name", "params", "interval", "jitter", "next_run",
+                 "running", "runs", "failures", "last_error")
+
+    def __init__(self, name, params, interval=DEFAULT_INTERVAL, jitter=DEFAULT_JITTER):
+        if interval <= 0:
+            raise ValueError(f"Job {name!r}: interval must be positive")
+        self.name = name
+        self.params = params
+        self.interval = float(interval)
+        self.jitter = max(0.0, float(jitter))
+        self.next_run = 0.0
+        self.running = False
+        self.runs = 0
+        self.failures = 0
+        self.last_error = None
+
+    def __repr__(self):
+        return f"Job({self.name!r}, every {self.interval:g}s ±{self.jitter:g}s)"
+
+
+def load_jobs(path):
+    """
+    Read a jobs file:
+
+        {"defaults": {"interval": 900, "jitter": 60, "tweets": 50},
+         "jobs": [{"name": "BTC", "query": "(\\"BTC\\" OR bitcoin) lang:en"}, ...]}
+
+    Anything other than name/interval/jitter is passed to the job runner.
+    """
+    with open(path, encoding="utf-8") as f:
+        spec = json.load(f)
+    defaults = spec.get("defaults", {})
+    jobs = []
+    for entry in spec.get("jobs", []):
+        params = {**defaults, **entry}
+        name = params.pop("name", None) or params.get("query") or f"job{len(jobs)}"
+        interval = params.pop("interval", DEFAULT_INTERVAL)
+        jitter = params.pop("jitter", DEFAULT_JITTER)
+        jobs.append(Job(name, params, interval, jitter))
+    if len({j.name for j in jobs}) != len(jobs):
+        raise ValueError(f"{path}: job names must be unique")
+    return jobs
+
+
+def next_run_time(job, started, now, rng=random):
+    """
+    Keep a fixed cadence from the previous start, plus up to `jitter` seconds
+    so jobs sharing an interval drift apart. A run that overran its interval
+    is rescheduled from now rather than fired back-to-back.
+    """
+    due = started + job.interval + rng.uniform(0, job.jitter)
+    if due < now:
+        due = now + rng.uniform(0, job.jitter)
+    return due
+
+
+class Scheduler:
+    """
+    Dispatch due jobs to at most `concurrency` worker threads. A job never
+    overlaps with itself. `worker_factory()` is called lazily, once per worker
+    thread, and must return an object with `run(job)` and `close()`; setting
+    `worker.broken = True` makes the thread close it and build a fresh one
+    before its next job.
+    """
+
+    def __init__(self, jobs, worker_factory, concurrency=1, rng=None, clock=time.monotonic):
+        if not jobs:
+            raise ValueError("No jobs to schedule")
+        self.jobs = list(jobs)
+        self.worker_factory = worker_factory
+        self.concurrency = max(1, int(concurrency))
+        self.rng = rng or random.Random()
+        self.clock = clock
+        self.ready = queue.Queue()
+        self.active = 0
+        self.peak_active = 0
+        self._cond = threading.Condition()
+        self._threads = []
+
+    def _worker_loop(self, slot):
+        worker = None
+        try:
+            while True:
+                job = self.ready.get()
+                if job is _STOP:
+                    break
+                if worker is None:
+                    worker = self.worker_factory()
+                started = self.clock()
+                with self._cond:
+                    self.active += 1
+                    self.peak_active = max(self.peak_active, self.active)
+                logging.info(f"⏱ [{slot}] Running {job.name} (run #{job.runs + 1})")
+                try:
+                    with metrics.timed(f"daemon.job.{job.name}"):
+                        worker.run(job)
+                    job.last_error = None
+                    metrics.inc("daemon.jobs.ok")
+                except (Exception, SystemExit) as e:
+                    # the scraper and store still sys.exit() on hard failures;
+                    # in daemon mode that only fails this run
+                    job.failures += 1
+                    job.last_error = repr(e)
+                    metrics.inc("daemon.jobs.failed")
+                    logging.error(f"Job {job.name} failed: {e!r}")
+                if getattr(worker, "broken", False):
+                    logging.warning(f"[{slot}] Worker is broken; rebuilding before next job")
+                    self._close(worker)
+                    worker = None
+                with self._cond:
+                    job.runs += 1
+                    job.running = False
+                    job.next_run = next_run_time(job, started, self.clock(), self.rng)
+                    self.active -= 1
+                    self._cond.notify_all()
+                logging.info(f"⏱ {job.name} next run in {job.next_run - self.clock():.0f}s")
+        finally:
+            if worker is not None:
+                self._close(worker)
+
+    @staticmethod
+    def _close(worker):
+        try:
+            worker.close()
+        except Exception as e:
+            logging.warning(f"Error closing worker: {e}")
+
+    def run(self, stop=None, max_runs=None):
+        """
+        Schedule until `stop` (a threading.Event) is set, or until every job
+        has been started `max_runs` times. In-flight jobs finish before return.
+        """
+        stop = stop or threading.Event()
+        now = self.clock()
+        for job in self.jobs:
+            # stagger the first round too, so N jobs don't all log in and
+            # hit the same endpoints in the same second
+            job.next_run = now + self.rng.uniform(0, job.jitter)
+        self._threads = [
+            threading.Thread(target=self._worker_loop, args=(i,), name=f"daemon-{i}", daemon=True)
+            for i in range(self.concurrency)
+        ]
+        for t in self._threads:
+            t.start()
+        started = {job.name: 0 for job in self.jobs}
+        try:
+            while not stop.is_set():
+                with self._cond:
+                    now = self.clock()
+                    for job in sorted(self.jobs, key=lambda j: j.next_run):
+                        if job.running or job.next_run > now:
+                            continue
+                        if max_runs is not None and started[job.name] >= max_runs:
+                            continue
+                        job.running = True
+                        started[job.name] += 1
+                        self.ready.put(job)
+                    if max_runs is not None and all(n >= max_runs for n in started.values()) \
+                            and not any(j.running for j in self.jobs):
+                        break
+                    idle = [j.next_run for j in self.jobs if not j.running]
+                    wait = max(0.0, min(idle) - now) if idle else None
+                    # wake up on the next due time, a finished job, or every
+                    # second to notice `stop`
+                    self._cond.wait(timeout=min(wait, 1.0) if wait is not None else 1.0)
+        finally:
+            self.shutdown()
+
+    def shutdown(self):
+        # queued-but-unstarted jobs are dropped; running ones finish
+        while True:
+            try:
+                job = self.ready.get_nowait()
+            except queue.Empty:
+                break
+            job.running = False
+        for _ in self._threads:
+            self.ready.put(_STOP)
+        for t in self._threads:
+            t.join()
+        self._threads = []
+
+    def status(self):
+        now = self.clock()
+        return [
+            {"job": j.name, "runs": j.runs, "failures": j.failures, "running": j.running,
+             "next_in": round(max(0.0, j.next_run - now), 1), "last_error": j.last_error}
+            for j in self.jobs
+        ]
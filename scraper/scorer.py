@@ -0,0 +1,283 @@
+# scorer.py
+#
+# Pluggable deletion-likelihood scorers.
+#
+#   LLMScorer      the GPT model in ai_analysis (network, batched requests)
+#   LocalScorer    hashed bag-of-words logistic model, numpy only, trained on
+#                  the "Deletion Likelihood" column of past dumps
+#   CascadeScorer  local model for every tweet, LLM only where it is unsure
+#
+# Train:  python scraper/scorer.py train tweets/ example2.csv.car
+# Pick:   SCORER=llm|local|cascade (default: cascade when the model file
+#         exists, llm otherwise), SCORER_MODEL, SCORER_MIN_CONFIDENCE
+
+import os
+import re
+import glob
+import zlib
+import logging
+from abc import ABC, abstractmethod
+
+import numpy as np
+
+import metrics
+
+MODEL_PATH = os.getenv("SCORER_MODEL", "./models/deletion_scorer.npz")
+MIN_CONFIDENCE = float(os.getenv("SCORER_MIN_CONFIDENCE", "0.6"))
+N_FEATURES = 1 << 18
+
+_TOKEN = re.compile(r"[#$@]?\w+|[^\w\s]")
+
+
+def tokenize(text):
+    words = _TOKEN.findall(str(text).lower())
+    return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+
+def featurize(texts, n_features=N_FEATURES):
+    """
+    Hash unigrams + bigrams of each text into a CSR matrix given as
+    (indptr, indices, values); values are 1/sqrt(n_tokens) per occurrence.
+    """
+    indptr = [0]
+    indices = []
+    values = []
+    mask = n_features - 1
+    for text in texts:
+        toks = tokenize(text)
+        indices.extend(zlib.crc32(t.encode()) & mask for t in toks)
+        weight = 1.0 / np.sqrt(len(toks)) if toks else 0.0
+        values.extend([weight] * len(toks))
+        indptr.append(len(indices))
+    return (np.asarray(indptr, dtype=np.int64),
+            np.asarray(indices, dtype=np.int64),
+            np.asarray(values, dtype=np.float64))
+
+
+def _row_sums(indptr, per_entry):
+    """Sum per-entry values within each CSR row (empty rows → 0)."""
+    sums = np.zeros(len(indptr) - 1)
+    if len(per_entry):
+        rows = np.repeat(np.arange(len(indptr) - 1), np.diff(indptr))
+        np.add.at(sums, rows, per_entry)
+    return sums
+
+
+def _sigmoid(z):
+    return 1.0 / (1.0 + np.exp(-np.clip(z, -30, 30)))
+
+
+class Scorer(ABC):
+    """score_many(texts) → (scores, confidences, analyses), all len(texts)."""
+
+    name = "base"
+
+    @abstractmethod
+    def score_many(self, texts):
+        """Scores in [0, 1], confidences in [0, 1] and analysis strings for `texts`."""
+
+    def score(self, text):
+        scores, _, analyses = self.score_many([text])
+        return float(scores[0]), analyses[0]
+
+
+class LLMScorer(Scorer):
+    name = "llm"
+
+    def score_many(self, texts):
+        from ai_analysis import analyze_tweets
+
+        results = analyze_tweets(list(texts)) if len(texts) else []
+        scores = np.asarray([s for s, _ in results], dtype=np.float64)
+        return scores, np.ones(len(texts)), [a for _, a in results]
+
+
+class LocalScorer(Scorer):
+    """
+    Logistic regression on hashed n-grams, fitted to soft labels in [0, 1].
+
+    Confidence = (share of the tweet's n-grams seen in training) ×
+    (distance of the score from 0.5, scaled to [0, 1]): unfamiliar text or a
+    coin-flip score both send the tweet to the fallback.
+    """
+
+    name = "local"
+
+    def __init__(self, weights=None, bias=0.0, seen=None, n_features=N_FEATURES):
+        self.n_features = n_features
+        self.weights = np.zeros(n_features) if weights is None else weights
+        self.bias = float(bias)
+        self.seen = np.zeros(n_features, dtype=bool) if seen is None else seen
+
+    def fit(self, texts, labels, epochs=300, lr=2.0, l2=1e-4):
+        labels = np.clip(np.asarray(labels, dtype=np.float64), 0.0, 1.0)
+        indptr, indices, values = featurize(texts, self.n_features)
+        rows = np.repeat(np.arange(len(labels)), np.diff(indptr))
+        n = max(len(labels), 1)
+        self.seen[:] = False
+        self.seen[indices] = True
+        # start from the base rate so an unseen tweet scores like an average one
+        mean = float(np.clip(labels.mean() if len(labels) else 0.5, 1e-3, 1 - 1e-3))
+        self.bias = float(np.log(mean / (1 - mean)))
+        w = np.zeros(self.n_features)
+        for _ in range(epochs):
+            p = _sigmoid(_row_sums(indptr, w[indices] * values) + self.bias)
+            err = p - labels
+            grad = np.bincount(indices, weights=err[rows] * values, minlength=self.n_features) / n
+            w -= lr * (grad + l2 * w)
+            self.bias -= lr * err.mean()
+        self.weights = w
+        return self
+
+    @metrics.timed("scorer.local")
+    def predict(self, texts):
+        """Return (scores, confidences) as float arrays."""
+        indptr, indices, values = featurize(texts, self.n_features)
+        scores = _sigmoid(_row_sums(indptr, self.weights[indices] * values) + self.bias)
+        counts = np.diff(indptr)
+        known = _row_sums(indptr, self.seen[indices].astype(np.float64))
+        coverage = np.divide(known, counts, out=np.zeros(len(counts)), where=counts > 0)
+        confidence = coverage * np.abs(2.0 * scores - 1.0)
+        return scores, confidence
+
+    def score_many(self, texts):
+        scores, confidence = self.predict(texts)
+        analyses = [f"local model: score {s:.2f}, confidence {c:.2f}"
+                    for s, c in zip(scores, confidence)]
+        return scores, confidence, analyses
+
+    def save(self, path=MODEL_PATH):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        nz = np.flatnonzero(self.weights)
+        np.savez_compressed(path, n_features=self.n_features, bias=self.bias,
+                            idx=nz, w=self.weights[nz], seen=np.flatnonzero(self.seen))
+        return path
+
+    @classmethod
+    def load(cls, path=MODEL_PATH):
+        with np.load(path) as z:
+            n = int(z["n_features"])
+            weights = np.zeros(n)
+            weights[z["idx"]] = z["w"]
+            seen = np.zeros(n, dtype=bool)
+            seen[z["seen"]] = True
+            return cls(weights, float(z["bias"]), seen, n)
+
+
+class CascadeScorer(Scorer):
+    """Local model first; tweets below min_confidence go to the fallback."""
+
+    name = "cascade"
+
+    def __init__(self, local, fallback, min_confidence=MIN_CONFIDENCE):
+        self.local = local
+        self.fallback = fallback
+        self.min_confidence = min_confidence
+
+    def score_many(self, texts):
+        scores, confidence, analyses = self.local.score_many(texts)
+        unsure = np.flatnonzero(confidence < self.min_confidence)
+        metrics.inc("scorer.local_hits", len(texts) - len(unsure))
+        metrics.inc("scorer.fallbacks", len(unsure))
+        if len(unsure):
+            fb_scores, fb_conf, fb_analyses = self.fallback.score_many([texts[i] for i in unsure])
+            scores = scores.copy()
+            confidence = confidence.copy()
+            scores[unsure] = fb_scores
+            confidence[unsure] = fb_conf
+            for i, a in zip(unsure, fb_analyses):
+                analyses[i] = a
+        return scores, confidence, analyses
+
+
+def get_scorer(kind=None, model_path=None):
+    """Build the scorer selected by `kind` or $SCORER (llm / local / cascade)."""
+    kind = (kind or os.getenv("SCORER", "auto")).lower()
+    model_path = model_path or MODEL_PATH
+    if kind == "auto":
+        kind = "cascade" if os.path.exists(model_path) else "llm"
+    if kind == "llm":
+        return LLMScorer()
+    local = LocalScorer.load(model_path)
+    if kind == "local":
+        return local
+    if kind == "cascade":
+        return CascadeScorer(local, LLMScorer())
+    raise ValueError(f"Unknown scorer {kind!r}; expected llm, local or cascade")
+
+
+# ─── training data ───────────────────────────────────────────────────────────
+
+def _read_labelled(path):
+    from dataset_io import read_dataset
+
+    if path.endswith(".car"):
+        from car_reader import CarReader
+        with CarReader(path) as reader:
+            df = reader.read_frame()
+    else:
+        df = read_dataset(path)
+    if "Content" not in df or "Deletion Likelihood" not in df:
+        return None
+    return df[["Content", "Deletion Likelihood"]].dropna()
+
+
+def load_history(paths):
+    """
+    Collect (texts, labels) from past dumps: CSV/Parquet/Arrow files, their
+    .car exports, or directories of them. Duplicate tweet texts keep their
+    mean label.
+    """
+    import pandas as pd
+
+    files = []
+    for p in paths:
+        if os.path.isdir(p):
+            for ext in ("*.csv", "*.parquet", "*.arrow", "*.car"):
+                files += glob.glob(os.path.join(p, ext))
+        else:
+            files.append(p)
+    frames = []
+    for f in sorted(set(files)):
+        try:
+            df = _read_labelled(f)
+        except Exception as e:
+            logging.warning(f"Skipping {f}: {e}")
+            continue
+        if df is not None and len(df):
+            frames.append(df)
+    if not frames:
+        return [], np.zeros(0)
+    data = pd.concat(frames, ignore_index=True).groupby("Content", sort=False).mean()
+    return data.index.tolist(), data["Deletion Likelihood"].to_numpy(dtype=np.float64)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
+    p = argparse.ArgumentParser(description="Train or run the local deletion-likelihood scorer")
+    sub = p.add_subparsers(dest="cmd", required=True)
+    t = sub.add_parser("train", help="fit on labelled dumps")
+    t.add_argument("paths", nargs="*", default=["./tweets"], help="dumps or folders (default ./tweets)")
+    t.add_argument("--out", default=MODEL_PATH)
+    t.add_argument("--epochs", type=int, default=300)
+    s = sub.add_parser("score", help="score texts with the configured scorer")
+    s.add_argument("texts", nargs="+")
+    s.add_argument("--scorer", default=None, help="llm / local / cascade")
+    args = p.parse_args()
+
+    if args.cmd == "train":
+        texts, labels = load_history(args.paths)
+        if not texts:
+            raise SystemExit("No labelled rows (Content + Deletion Likelihood) found")
+        model = LocalScorer().fit(texts, labels, epochs=args.epochs)
+        pred, conf = model.predict(texts)
+        mae = float(np.abs(pred - labels).mean())
+        print(f"Trained on {len(texts)} tweets: train MAE {mae:.3f}, "
+              f"mean confidence {conf.mean():.2f} → {model.save(args.out)}")
+    else:
+        scorer = get_scorer(args.scorer)
+        scores, conf, analyses = scorer.score_many(args.texts)
+        for text, sc, c, a in zip(args.texts, scores, conf, analyses):
+            print(f"{sc:.3f}  (confidence {c:.2f})  {text[:60]!r}  {a[:80]}")
@@ -2,58 +2,83 @@
 import os
 import sys
 import json
+import time
 import subprocess
+import threading
 import logging
 from pathlib import Path
 
 import requests
-from dotenv import load_dotenv
-from web3 import Web3
+
+import car
+import metrics
 
 logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
-load_dotenv()
 
 # ─── CONFIG ───────────────────────────────────────────────────────────────────
-PINATA_JWT   = os.getenv("PINATA_JWT")
-SPACE_DID    = os.getenv("W3UP_SPACE_DID")
-RPC_URL      = os.getenv("RPC_URL")
-PRIVATE_KEY  = os.getenv("PRIVATE_KEY")
-OWNER_ADDR   = os.getenv("OWNER_ADDRESS")
-CONTRACT_ADDR= os.getenv("CONTRACT_ADDR")
-
-for name, v in [
-    ("PINATA_JWT", PINATA_JWT),
-    ("W3UP_SPACE_DID", SPACE_DID),
-    ("RPC_URL", RPC_URL),
-    ("PRIVATE_KEY", PRIVATE_KEY),
-    ("OWNER_ADDRESS", OWNER_ADDR),
-    ("CONTRACT_ADDR", CONTRACT_ADDR),
-]:
-    if not v:
-        logging.critical(f"❌ Missing {name} in .env")
-        sys.exit(1)
+# Read on first use, not at import: scrape-only and dry runs import this
+# module without any Pinata / StorAcha / chain configuration.
+_loaded_env = False
+
+
+def _env(name):
+    global _loaded_env
+    if not _loaded_env:
+        from dotenv import load_dotenv
+        load_dotenv()
+        _loaded_env = True
+    value = os.getenv(name)
+    if not value:
+        raise EnvironmentError(f"❌ Missing {name} in .env")
+    return value
 
 # ─── WEB3 / CONTRACT SETUP ────────────────────────────────────────────────────
-w3 = Web3(Web3.HTTPProvider(RPC_URL))
-if not w3.is_connected():
-    logging.critical("❌ Cannot connect to RPC")
-    sys.exit(1)
+_chain = None
+_chain_lock = threading.Lock()
+# serialises nonce lookup → send across concurrent daemon jobs
+_tx_lock = threading.Lock()
 
-OWNER_ADDR   = w3.to_checksum_address(OWNER_ADDR)
-CONTRACT_ADDR= w3.to_checksum_address(CONTRACT_ADDR)
 
-with open("artifacts/AIDatasetRegistry.sol/AIDatasetRegistry.json") as f:
-    ABI = json.load(f)["abi"]
-contract = w3.eth.contract(address=CONTRACT_ADDR, abi=ABI)
+def get_chain():
+    """Return (w3, contract, owner_address, private_key), connecting once."""
+    global _chain
+    with _chain_lock:
+        if _chain is None:
+            import rpc
+
+            _env("RPC_URL")
+            # shared pooled provider; RPC_URL may list fallback endpoints
+            w3 = rpc.get_web3("RPC_URL")
+            if not w3.is_connected():
+                raise ConnectionError("❌ Cannot connect to RPC")
+            owner = w3.to_checksum_address(_env("OWNER_ADDRESS"))
+            address = w3.to_checksum_address(_env("CONTRACT_ADDR"))
+            with open("artifacts/AIDatasetRegistry.sol/AIDatasetRegistry.json") as f:
+                abi = json.load(f)["abi"]
+            _chain = (w3, w3.eth.contract(address=address, abi=abi), owner, _env("PRIVATE_KEY"))
+        return _chain
 
 # ─── HELPERS ─────────────────────────────────────────────────────────────────
 
+_store_headers = None
+_store_headers_lock = threading.Lock()
+
+
 def get_store_headers():
     """
-    Generate a fresh never-expiring UCAN for store/add, upload/add, deal/add.
+    Never-expiring UCAN headers for store/add, upload/add, deal/add,
+    generated once per process.
     """
+    global _store_headers
+    with _store_headers_lock:
+        if _store_headers is None:
+            _store_headers = _generate_store_headers()
+        return dict(_store_headers)
+
+@metrics.timed("w3.generate_tokens")
+def _generate_store_headers():
     cmd = [
-        "w3", "bridge", "generate-tokens", SPACE_DID,
+        "w3", "bridge", "generate-tokens", _env("W3UP_SPACE_DID"),
         "-c", "store/add", "-c", "upload/add", "-c", "deal/add", "-j"
     ]
     out = subprocess.check_output(cmd)
@@ -63,10 +88,11 @@ def get_store_headers():
         "Authorization": tokens["Authorization"]
     }
 
+@metrics.timed("pinata.pin_dataset")
 def pin_to_pinata(path: str) -> str:
     """Pin a file to IPFS via Pinata and return the CID."""
     url = "https://api.pinata.cloud/pinning/pinFileToIPFS"
-    headers = {"Authorization": f"Bearer {PINATA_JWT}"}
+    headers = {"Authorization": f"Bearer {_env('PINATA_JWT')}"}
     with open(path, "rb") as fp:
         r = requests.post(url, headers=headers, files={"file": (Path(path).name, fp)})
     r.raise_for_status()
@@ -75,87 +101,299 @@ def pin_to_pinata(path: str) -> str:
     return cid
 
 def make_car(path: str):
-    """ipfs add → root CID; ipfs dag export → CAR; ipfs-car hash → carCID."""
-    root = subprocess.check_output(["ipfs", "add", "-Q", path]).decode().strip()
+    """
+    CAR(s) for `path` → (root CID, [(carCID, car_path, size)]).
+    Files up to one shard: ipfs add → root CID; ipfs dag export → CAR;
+    ipfs-car hash → carCID. Larger files are split into CAR_SHARD_SIZE
+    shards built in a process pool (car.build_shards), root shard last.
+    """
+    shard_size = int(os.getenv("CAR_SHARD_SIZE", str(car.SHARD_SIZE)))
+    if _chunker() == "fastcdc":
+        return _make_cdc_car(path, shard_size)
+    if Path(path).stat().st_size > shard_size:
+        workers = int(os.getenv("CAR_WORKERS", "0")) or None
+        with metrics.timed("car.build_shards"):
+            root, shards = car.build_shards(path, shard_size=shard_size, workers=workers)
+        root = car.cid_to_str(root)
+        logging.info(f"🗂 {len(shards)} CAR shards ready: root={root}, "
+                     f"size={sum(size for *_, size in shards)}")
+        return root, shards
+
+    with metrics.timed("ipfs.add"):
+        root = subprocess.check_output(["ipfs", "add", "-Q", path]).decode().strip()
     car_path = f"{path}.car"
-    with open(car_path, "wb") as out:
+    with open(car_path, "wb") as out, metrics.timed("ipfs.dag_export"):
         subprocess.run(["ipfs", "dag", "export", root], check=True, stdout=out)
-    car_cid = subprocess.check_output(["ipfs-car", "hash", car_path]).decode().strip()
+    with metrics.timed("ipfs_car.hash"):
+        car_cid = subprocess.check_output(["ipfs-car", "hash", car_path]).decode().strip()
     size = Path(car_path).stat().st_size
     logging.info(f"🗂 CAR ready: root={root}, carCID={car_cid}, size={size}")
-    return root, car_cid, car_path, size
+    return root, [(car_cid, car_path, size)]
 
-def upload_car(root, car_cid, car_path, size):
-    """1) store/add 2) PUT CAR if needed 3) upload/add shards."""
-    headers = get_store_headers()
-    body = {"tasks":[["store/add", SPACE_DID, {"link":{"/":car_cid}, "size":size}]]}
-    resp = requests.post("https://up.storacha.network/bridge", headers=headers, json=body).json()
+def _chunker():
+    chunker = os.getenv("CAR_CHUNKER", "fixed").lower()
+    if chunker not in ("fixed", "fastcdc"):
+        raise ValueError(f"CAR_CHUNKER must be fixed or fastcdc, not {chunker!r}")
+    return chunker
+
+def _make_cdc_car(path, shard_size):
+    """
+    Content-defined CAR(s) of the file as is: FastCDC chunks as raw leaves
+    (CIDv1), and only blocks missing from the local block index written out.
+    Rows are put in Tweet ID order when the dataset is written, not here, so
+    the CAR holds the same bytes as the pinned file. CARs already holding the
+    other blocks are listed as shards too, with no local path: upload/add
+    still covers the whole DAG, but they are not stored or dealt again.
+    """
+    import blockindex
+
+    with open(path, "rb") as f:
+        data = f.read()
+    avg = int(os.getenv("CDC_AVG_SIZE", str(car.CDC_AVG_SIZE)))
+    with metrics.timed("car.fastcdc"):
+        root, blocks = car.build_file(car.fastcdc_chunks(data, avg), raw_leaves=True)
+    index = blockindex.get_index()
+    reused = index.stored_cars(cid for cid, _ in blocks)
+    fresh = list({cid: block for cid, block in blocks if cid not in reused}.items())
+    shards = car.write_shards(root, fresh, path, shard_size)
+    for car_cid, car_path, size, cids in shards:
+        index.add_car(car_cid, car_path, size, cids)
+    reused_bytes = sum(len(b) for cid, b in blocks if cid in reused)
+    metrics.inc("car.reused_bytes", reused_bytes)
+    root = car.cid_to_str(root)
+    logging.info(f"🗂 CDC CAR: root={root}, {len(fresh)} new / {len(blocks)} blocks, "
+                 f"{reused_bytes} bytes already stored")
+    old = [(c, None, index.car(c)[2]) for c in sorted(set(reused.values()))]
+    return root, old + [(car_cid, car_path, size) for car_cid, car_path, size, _ in shards]
+
+def new_shards(shards):
+    """Shards built by this make_car, i.e. not reused from an earlier upload; only these need deals."""
+    return [shard for shard in shards if shard[1] is not None]
+
+def _store_shard(space_did, headers, car_cid, car_path, size):
+    """store/add one CAR and PUT it if StorAcha has no copy yet."""
+    body = {"tasks":[["store/add", space_did, {"link":{"/":car_cid}, "size":size}]]}
+    with metrics.timed("storacha.store_add"):
+        resp = requests.post("https://up.storacha.network/bridge", headers=headers, json=body).json()
     out  = resp[0]["p"]["out"]
 
     # error handling
     if "error" in out:
         msg = out["error"].get("message", json.dumps(out["error"]))
-        logging.error("🚨 store/add failed:\n" + msg)
-        sys.exit(1)
+        raise RuntimeError(f"store/add {car_cid} failed: {msg}")
 
     ok = out.get("ok", {})
     if ok.get("url"):
-        logging.info("⬆️ Uploading CAR — new allocation")
+        logging.info(f"⬆️ Uploading CAR {car_cid} — new allocation")
         hdrs = ok.get("headers", {}) or {}
         hdrs.setdefault("Content-Length", str(size))
-        with open(car_path, "rb") as f:
+        with open(car_path, "rb") as f, metrics.timed("storacha.put_car"):
             r = requests.put(ok["url"], headers=hdrs, data=f)
         r.raise_for_status()
+        metrics.inc("storacha.bytes_uploaded", size)
     elif ok.get("status") == "done":
-        logging.info("🔁 CAR already stored — skipping upload")
+        logging.info(f"🔁 CAR {car_cid} already stored — skipping upload")
     else:
-        logging.critical("❌ Unexpected store/add OK payload:\n" + json.dumps(ok, indent=2))
-        sys.exit(1)
+        raise RuntimeError("Unexpected store/add OK payload:\n" + json.dumps(ok, indent=2))
 
-    # register shards
+def _store_with_retry(space_did, headers, shard, retries):
+    for attempt in range(retries + 1):
+        try:
+            return _store_shard(space_did, headers, *shard)
+        except Exception as e:
+            if attempt == retries:
+                raise
+            metrics.inc("storacha.shard_retries")
+            logging.warning(f"⚠️ Shard {shard[0]} failed ({e}); retry {attempt + 1}/{retries}")
+            time.sleep(2 ** attempt)
+
+def upload_car(root, shards):
+    """
+    1) store/add + PUT every new shard, UPLOAD_CONCURRENCY at a time, each
+    retried on its own up to UPLOAD_RETRIES times 2) one upload/add listing
+    all shards under the root, reused ones included.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    space_did = _env("W3UP_SPACE_DID")
+    # the UCANs never expire, so one set of headers serves every shard
     headers = get_store_headers()
-    body2 = {"tasks":[["upload/add", SPACE_DID, {"root":{"/":root}, "shards":[{"/":car_cid}] }]]}
-    r2 = requests.post("https://up.storacha.network/bridge", headers=headers, json=body2)
+    retries = int(os.getenv("UPLOAD_RETRIES", "3"))
+    fresh = new_shards(shards)
+    workers = min(int(os.getenv("UPLOAD_CONCURRENCY", "4")), len(fresh))
+    with ThreadPoolExecutor(max_workers=max(workers, 1)) as pool:
+        jobs = [pool.submit(_store_with_retry, space_did, headers, shard, retries) for shard in fresh]
+        errors = []
+        for shard, job in zip(fresh, jobs):
+            try:
+                job.result()
+            except Exception as e:
+                errors.append(f"{shard[0]}: {e}")
+    if errors:
+        logging.error("🚨 store/add failed:\n" + "\n".join(errors))
+        raise RuntimeError(f"{len(errors)} of {len(fresh)} CAR shards failed to upload")
+    if _chunker() == "fastcdc":
+        # their blocks can now be left out of later CARs
+        import blockindex
+        blockindex.get_index().mark_stored([cid for cid, *_ in fresh])
+
+    # register shards
+    body2 = {"tasks":[["upload/add", space_did, {"root":{"/":root},
+                                                 "shards":[{"/":cid} for cid, *_ in shards]}]]}
+    with metrics.timed("storacha.upload_add"):
+        r2 = requests.post("https://up.storacha.network/bridge", headers=headers, json=body2)
     r2.raise_for_status()
-    logging.info("✅ CAR registered on StorAcha")
+    logging.info(f"✅ {len(shards)} CAR shard(s) registered on StorAcha")
 
+@metrics.timed("storacha.deal_add")
 def create_deal(root, car_cid, miner=None, duration=None):
     """Start a Filecoin deal via StorAcha."""
     headers = get_store_headers()
     payload = {"root":{"/":root}, "car":{"/":car_cid}}
     if miner:    payload["miner"]   = miner
     if duration: payload["duration"] = duration
-    body = {"tasks":[["deal/add", SPACE_DID, payload]]}
+    body = {"tasks":[["deal/add", _env("W3UP_SPACE_DID"), payload]]}
     resp = requests.post("https://up.storacha.network/bridge", headers=headers, json=body).json()
     logging.info("🎯 Deal response: " + json.dumps(resp, indent=2))
     return resp
 
+@metrics.timed("rpc.register_on_chain")
 def register_on_chain(root_cid, size, deal_id, title, description, price, preview):
     """Call addDataset once per CID (skips if already exists)."""
+    w3, contract, owner, private_key = get_chain()
     # skip duplicates
     _,_,_,_,_,_,_, exists = contract.functions.datasets(root_cid).call()
     if exists:
         logging.info("ℹ️ Dataset already on-chain → skipping")
         return
 
-    nonce = w3.eth.get_transaction_count(OWNER_ADDR)
     data_input = (title, root_cid, size, description, price, deal_id, preview)
+    with _tx_lock:
+        nonce = w3.eth.get_transaction_count(owner, "pending")
 
-    txp = {
-        "from": OWNER_ADDR,
-        "nonce": nonce,
-        "gasPrice": w3.to_wei("50", "gwei")
-    }
-    est = contract.functions.addDataset(root_cid, data_input).estimate_gas(txp)
-    gas_limit = int(est * 1.2)
-    txp["gas"] = gas_limit
-    logging.info(f"🔧 gas est={est}, using limit={gas_limit}")
-
-    tx = contract.functions.addDataset(root_cid, data_input).build_transaction(txp)
-    signed = w3.eth.account.sign_transaction(tx, PRIVATE_KEY)
-    txh    = w3.eth.send_raw_transaction(signed.raw_transaction)
+        txp = {
+            "from": owner,
+            "nonce": nonce,
+            "gasPrice": w3.to_wei("50", "gwei")
+        }
+        est = contract.functions.addDataset(root_cid, data_input).estimate_gas(txp)
+        gas_limit = int(est * 1.2)
+        txp["gas"] = gas_limit
+        logging.info(f"🔧 gas est={est}, using limit={gas_limit}")
+
+        tx = contract.functions.addDataset(root_cid, data_input).build_transaction(txp)
+        signed = w3.eth.account.sign_transaction(tx, private_key)
+        txh    = w3.eth.send_raw_transaction(signed.raw_transaction)
     print("✅ On-chain tx:", txh.hex())
 
+
+_mirror = None
+_mirror_lock = threading.Lock()
+
+
+def get_mirror():
+    """Local mirror of registered dataset IDs (registry.RegistryMirror), built once."""
+    global _mirror
+    with _mirror_lock:
+        if _mirror is None:
+            from registry import RegistryMirror
+            _mirror = RegistryMirror(get_chain()[1])
+        return _mirror
+
+
+@metrics.timed("rpc.register_many")
+def register_many(entries, gas_price_gwei=50):
+    """
+    Register many datasets with a constant number of round trips. `entries`
+    are dicts with the register_on_chain arguments (root_cid, size, deal_id,
+    title, description, price, preview). IDs already on chain are dropped
+    using the local mirror; the rest are gas-estimated in one JSON-RPC batch,
+    signed with consecutive nonces and sent in another (send_many). Returns
+    {root_cid: tx hash, or None if it was skipped or rejected}.
+    """
+    contract = get_chain()[1]
+    mirror = get_mirror()
+    mirror.sync()
+    by_id = {}
+    for e in entries:
+        by_id.setdefault(e["root_cid"], e)
+    todo = mirror.unregistered(by_id)
+    results = {cid: None for cid in by_id}
+    if len(todo) < len(by_id):
+        logging.info(f"ℹ️ {len(by_id) - len(todo)} dataset(s) already on-chain → skipping")
+    if not todo:
+        return results
+
+    datas = []
+    for cid in todo:
+        e = by_id[cid]
+        data_input = (e["title"], cid, e["size"], e["description"], e["price"], e["deal_id"], e["preview"])
+        datas.append(contract.functions.addDataset(cid, data_input)._encode_transaction_data())
+
+    sent = send_many(datas, [f"addDataset({cid})" for cid in todo], gas_price_gwei)
+    results.update(zip(todo, sent))
+    metrics.inc("registry.registered", sum(1 for h in sent if h))
+    logging.info(f"✅ Sent {sum(1 for h in sent if h)} registrations in one batch")
+    return results
+
+
+def send_many(datas, labels, gas_price_gwei=50, gas=None):
+    """
+    Send owner transactions to the registry (calldata `datas`) in two JSON-RPC
+    round trips: one batch for the pending nonce, chain ID and every gas
+    estimate, one for the signed raw transactions with consecutive nonces.
+    A transaction whose estimate fails is skipped. A fixed `gas` limit skips
+    the estimates, for uniform calls that cannot revert. Returns one tx hash,
+    or None, per entry; `labels` name them in the logs. Once one send is
+    rejected, the later ones sit behind its nonce gap and come back as None
+    too, so callers retry them instead of counting them as sent.
+    """
+    import rpc
+
+    w3, contract, owner, private_key = get_chain()
+    results = [None] * len(datas)
+    with _tx_lock:
+        estimates = rpc.send_batch(w3, [
+            ("eth_getTransactionCount", [owner, "pending"]),
+            ("eth_chainId", []),
+            *[("eth_estimateGas", [{"from": owner, "to": contract.address, "data": d}])
+              for d in (datas if gas is None else [])],
+        ])
+        for method, response in zip(("eth_getTransactionCount", "eth_chainId"), estimates):
+            if "error" in response:
+                raise ConnectionError(f"{method} failed: {response['error'].get('message', 'error')}")
+        nonce = int(estimates[0]["result"], 16)
+        chain_id = int(estimates[1]["result"], 16)
+        signed = []
+        for k, data in enumerate(datas):
+            if gas is None:
+                est = estimates[2 + k]
+                if "error" in est:
+                    # a revert here (e.g. registered since the sync) would only burn gas
+                    logging.warning(f"⚠️ {labels[k]} would fail: {est['error'].get('message')}; skipping")
+                    continue
+                limit = int(int(est["result"], 16) * 1.2)
+            else:
+                limit = gas
+            tx = {"to": contract.address, "data": data, "value": 0, "nonce": nonce,
+                  "gas": limit,
+                  "gasPrice": w3.to_wei(gas_price_gwei, "gwei"), "chainId": chain_id}
+            signed.append((k, w3.eth.account.sign_transaction(tx, private_key)))
+            nonce += 1
+        sent = rpc.send_batch(w3, [("eth_sendRawTransaction", [w3.to_hex(tx.raw_transaction)])
+                                   for _, tx in signed]) if signed else []
+    gap = None
+    for (k, _), response in zip(signed, sent):
+        if gap is not None:
+            # queued behind the rejected nonce: never mined unless it is filled
+            logging.warning(f"⚠️ {labels[k]} is stuck behind rejected {labels[gap]}; not counted as sent")
+        elif "error" in response:
+            logging.error(f"🚨 {labels[k]} rejected: {response['error'].get('message')}")
+            gap = k
+        else:
+            results[k] = response["result"]
+    return results
+
 # ─── CLI ENTRYPOINT ────────────────────────────────────────────────────────────
 
 if __name__ == "__main__":
@@ -176,14 +414,15 @@ if __name__ == "__main__":
     # 1) Pin to IPFS
     root_cid = pin_to_pinata(args.file)
 
-    # 2) CAR + upload
-    root, car_cid, car_path, size = make_car(args.file)
-    upload_car(root, car_cid, car_path, size)
+    # 2) CAR shard(s) + upload
+    root, shards = make_car(args.file)
+    upload_car(root, shards)
+    size = sum(s for *_, s in shards)
 
-    # 3) Deal
-    deal = create_deal(root, car_cid, miner=args.miner, duration=args.duration)
+    # 3) Deals, one per CAR
+    deals = [create_deal(root, cid, miner=args.miner, duration=args.duration) for cid, *_ in new_shards(shards)]
     try:
-        deal_id = deal[0]["p"]["out"]["dealId"]
+        deal_id = deals[0][0]["p"]["out"]["dealId"]
     except:
         logging.warning("⚠️ Couldn't parse dealId; defaulting to 0")
         deal_id = 0
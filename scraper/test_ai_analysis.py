@@ -0,0 +1,71 @@
+import pytest
+
+from ai_analysis import ScoreFormatError, analyze_tweet, parse_score, score_tool
+
+
+class Scripted:
+    """Returns canned answers in order, recording what it was sent."""
+
+    def __init__(self, *answers):
+        self.answers = list(answers)
+        self.calls = []
+
+    def invoke(self, messages):
+        self.calls.append(messages)
+        return self.answers.pop(0)
+
+
+def test_parse_accepts_args_dict_and_json():
+    assert parse_score({"score": 0.1, "reason": "fine"}) == (0.1, "fine")
+    assert parse_score('{"score": "0.35"}') == (0.35, "")
+
+
+@pytest.mark.parametrize("bad", ["Score: 0.1.", {"reason": "x"}, {"score": 1.5},
+                                 {"score": "high"}, "[]"])
+def test_parse_rejects_malformed(bad):
+    with pytest.raises(ScoreFormatError):
+        parse_score(bad)
+
+
+def test_parse_tool_call_message():
+    messages = pytest.importorskip("langchain_core.messages")
+    msg = messages.AIMessage(content="", tool_calls=[
+        {"name": "submit_score", "args": {"score": 0.7, "reason": "scam"}, "id": "c1"}])
+    assert parse_score(msg) == (0.7, "scam")
+    with pytest.raises(ScoreFormatError):
+        parse_score(messages.AIMessage(content="Score: 0.1."))
+
+
+def test_retries_malformed_answers_then_succeeds():
+    agent = Scripted("Score: 0.1.", {"score": 0.1, "reason": "mild"})
+    assert analyze_tweet("gm", agent_executor=agent) == (0.1, "mild")
+    assert len(agent.calls) == 2
+    assert "Invalid answer" in agent.calls[1][-1][1]
+
+
+def test_gives_up_after_retries():
+    agent = Scripted(*["nope"] * 3)
+    score, analysis = analyze_tweet("gm", agent_executor=agent)
+    assert score == 0.0 and analysis.startswith("unscored")
+    assert len(agent.calls) == 3
+
+
+def test_fast_mode_schema_has_no_reason():
+    fast = score_tool(explain=False)["function"]["parameters"]
+    assert fast["required"] == ["score"] and "reason" not in fast["properties"]
+    assert score_tool()["function"]["parameters"]["required"] == ["score", "reason"]
+
+
+def test_batch_scores_are_aligned_and_split_on_bad_answers():
+    from ai_analysis import analyze_tweets
+
+    class Batch:
+        def invoke(self, messages):
+            lines = [l for l in messages[-1][1].split("\n\n")]
+            if len(lines) > 1 and any("scam" in l for l in lines):
+                return {"results": [{"i": 0, "score": 0.2}]}  # drops tweets
+            return {"results": [{"i": k, "score": 0.9 if "scam" in l else 0.1, "reason": "r"}
+                                for k, l in enumerate(lines)][::-1]}
+
+    out = analyze_tweets(["gm", "free airdrop scam", "wagmi"], agent_executor=Batch())
+    assert out == [(0.1, "r"), (0.9, "r"), (0.1, "r")]
@@ -0,0 +1,82 @@
+import random
+
+import pandas as pd
+
+from analytics import coin_aggregates, load_dump, parse_counts
+
+
+def legacy_rows(rows):
+    """The per-coin loop save_to_csv used before analytics.py (well-formed counts only)."""
+    groups = {}
+    for coin, score, followers in rows:
+        groups.setdefault(coin, []).append((score, followers))
+    out = {}
+    for coin, items in groups.items():
+        scores = [s for s, _ in items]
+        norm = int(sum(scores) / len(scores) * 100)
+        total_followers = sum(int(f) if f.isdigit() else 0 for _, f in items)
+        out[coin] = (norm, len(items) * total_followers)
+    return out
+
+
+def test_parse_counts_is_vectorized_parse_count():
+    s = parse_counts(["0", "12", "1,234", "1.2K", "12.3K", "3M", "", "n/a", None])
+    assert s.tolist() == [0, 12, 1234, 1200, 12300, 3_000_000, 0, 0, 0]
+    assert str(s.dtype) == "int64"
+
+
+def test_matches_legacy_output_for_well_formed_counts():
+    rng = random.Random(7)
+    rows = [(rng.choice(["testETH", "testBTC", "testSOL"]),
+             rng.choice([0.0, 0.1, 0.25, 0.5, 0.8, 0.95]),
+             str(rng.randint(0, 50_000))) for _ in range(500)]
+    df = pd.DataFrame(rows, columns=["coin", "score", "followers"])
+    df["followers"] = parse_counts(df["followers"])
+    agg = coin_aggregates(df)
+    for coin, (norm, strength) in legacy_rows(rows).items():
+        assert agg.at[coin, "norm_score"] == norm
+        assert agg.at[coin, "strength"] == strength
+
+
+def test_weighted_score_and_buckets():
+    df = pd.DataFrame({
+        "coin": ["A", "A", "B"],
+        "score": [0.1, 0.9, 0.5],
+        "likes": [0, 8, 0],
+    })
+    agg = coin_aggregates(df)
+    # weights are 1 + engagement → 1 and 9
+    assert abs(agg.at["A", "weighted_score"] - (0.1 * 1 + 0.9 * 9) / 10) < 1e-12
+    assert agg.at["A", "share_low"] == 0.5 and agg.at["A", "share_high"] == 0.5
+    assert agg.at["B", "share_medium"] == 1.0
+    assert agg.at["A", "likes"] == 8
+
+
+def test_frame_without_coin_column_is_one_group():
+    agg = coin_aggregates(pd.DataFrame({"score": [0.2, 0.4]}))
+    assert list(agg.index) == ["ALL"]
+    assert agg.at["ALL", "norm_score"] == 30
+
+
+def test_cluster_column_adds_spam_signal():
+    df = pd.DataFrame({
+        "coin":    ["testETH"] * 4 + ["testBTC"] * 2,
+        "score":   [0.9, 0.9, 0.9, 0.1, 0.2, 0.4],
+        "cluster": [0, 0, 0, 3, 4, 5],
+    })
+    agg = coin_aggregates(df)
+    assert agg.at["testETH", "clusters"] == 2
+    assert agg.at["testETH", "dup_share"] == 0.5
+    # the three copies count once: (0.9 + 0.1) / 2
+    assert abs(agg.at["testETH", "dedup_score"] - 0.5) < 1e-9
+    assert agg.at["testBTC", "dup_share"] == 0.0
+    assert "dup_share" not in coin_aggregates(df.drop(columns="cluster"))
+
+
+def test_dump_without_followers_reports_no_strength(tmp_path):
+    path = tmp_path / "dump.csv"
+    pd.DataFrame({"Content": ["a", "b"], "Likes": ["1.2K", "3"], "Deletion Likelihood": [0.2, 0.4],
+                  "Coin": ["testETH", "testETH"]}).to_csv(path, index=False)
+    agg = coin_aggregates(load_dump(path))
+    assert agg.at["testETH", "likes"] == 1203
+    assert "strength" not in agg and "followers" not in agg
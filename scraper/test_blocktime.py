@@ -0,0 +1,63 @@
+from types import SimpleNamespace
+
+from blocktime import BlockTimes
+
+
+class FakeChain:
+    """Blocks every 30 s from t=1000; the RPC refuses lookbacks below `oldest`."""
+
+    def __init__(self, head=1000, oldest=0):
+        self.head = head
+        self.oldest = oldest
+        self.batches = []
+
+    def make_batch_request(self, requests):
+        self.batches.append(requests)
+        out = []
+        for i, (_, (tag, _full)) in enumerate(requests):
+            n = self.head if tag == "latest" else int(tag, 16)
+            if n < self.oldest:
+                out.append({"id": i, "error": {"code": -32000, "message": "lookback too far"}})
+            elif n > self.head:
+                out.append({"id": i, "result": None})
+            else:
+                out.append({"id": i, "result": {"number": hex(n), "timestamp": hex(1000 + 30 * n)}})
+        return out
+
+
+def _times(chain, path):
+    return BlockTimes(SimpleNamespace(provider=chain), path=str(path), chain_id=314159)
+
+
+def test_fetches_once_then_serves_from_disk(tmp_path):
+    chain = FakeChain()
+    times = _times(chain, tmp_path / "b.sqlite")
+    assert times.timestamps([10, 20]) == {10: (1300, True), 20: (1600, True)}
+    assert len(chain.batches) == 1 and len(chain.batches[0]) == 3  # two blocks + head
+    times.close()
+
+    again = _times(chain, tmp_path / "b.sqlite")
+    head = {"number": 1000, "timestamp": 31000}
+    assert again.timestamps([10, 20], head=head)[20] == (1600, True)
+    assert len(chain.batches) == 1
+
+
+def test_refused_and_future_blocks_are_estimated(tmp_path):
+    chain = FakeChain(head=1000, oldest=500)
+    times = _times(chain, tmp_path / "b.sqlite")
+    times.timestamps([600, 800])
+    out = times.timestamps([100, 700, 1100])
+    assert out[700] == (1000 + 30 * 700, True)
+    # refused lookback: extrapolated back at the cached average block time
+    assert out[100] == (1000 + 30 * 100, False)
+    # future block: extrapolated from the head
+    assert out[1100] == (1000 + 30 * 1100, False)
+    # estimates are not stored as facts
+    assert 100 not in times.cached([100])
+
+
+def test_interpolates_between_known_blocks(tmp_path):
+    times = _times(FakeChain(), tmp_path / "b.sqlite")
+    times.add_many({100: 5000, 200: 6000})
+    assert times.estimate(150) == 5500
+    assert times.average_block_time() == 10.0
@@ -0,0 +1,92 @@
+import threading
+
+from bulk_publish import BulkPublisher, Manifest, find_unpublished
+
+
+class FakeStore:
+    """Records every call; `flaky` paths fail their first upload."""
+
+    def __init__(self, flaky=()):
+        self.calls = []
+        self.flaky = set(flaky)
+        self.registered = set()
+        self._lock = threading.Lock()
+
+    def _log(self, *call):
+        with self._lock:
+            self.calls.append(call)
+
+    def pin_to_pinata(self, path):
+        self._log("pin", path)
+        return "Qm" + path.rsplit("/", 1)[-1]
+
+    def make_car(self, path):
+        self._log("car", path)
+        # two new shards and one reused from an earlier upload (no local path)
+        return "bafyroot" + path[-5:], [["bagold", None, 20], ["bagcar1", path + ".car", 10],
+                                         ["bagcar2", path + ".1.car", 5]]
+
+    def new_shards(self, shards):
+        return [s for s in shards if s[1] is not None]
+
+    def upload_car(self, root, shards):
+        self._log("upload", root)
+        for path in list(self.flaky):
+            if root.endswith(path[-5:]):
+                self.flaky.discard(path)
+                raise ConnectionError("storacha 503")
+
+    def create_deal(self, root, car_cid):
+        self._log("deal", car_cid)
+        return [{"p": {"out": {"dealId": 7}}}]
+
+    def register_many(self, entries):
+        self._log("register", len(entries))
+        self.registered.update(e["root_cid"] for e in entries)
+        return {e["root_cid"]: "0xtx" for e in entries}
+
+    def get_mirror(self):
+        return self.registered
+
+
+def _dumps(tmp_path, n):
+    for i in range(n):
+        (tmp_path / f"dump{i}.csv").write_text(f"Name,Content\nuser{i},gm {i}\n")
+    (tmp_path / "dump0.csv.car").write_bytes(b"not a dataset")
+
+
+def test_bulk_publish_resumes_at_the_failed_step(tmp_path):
+    _dumps(tmp_path, 3)
+    manifest = Manifest(str(tmp_path / "manifest.jsonl"))
+    paths = find_unpublished(str(tmp_path), manifest)
+    assert [p.rsplit("/", 1)[-1] for p in paths] == ["dump0.csv", "dump1.csv", "dump2.csv"]
+
+    store = FakeStore(flaky=[paths[1]])
+    report = BulkPublisher(manifest, store).run(paths)
+    assert report["files"] == 3 and report["published"] == 2
+    assert list(report["failed"]) == [paths[1]] and report["failed"][paths[1]].startswith("upload")
+    assert report["bytes"] > 0 and report["files_per_min"] > 0
+    assert sum(1 for c in store.calls if c[0] == "deal") == 4  # two new shards each, none for the reused one
+    manifest.close()
+
+    # rerun: only the failed file is left, and its pin/CAR are reused
+    manifest = Manifest(str(tmp_path / "manifest.jsonl"))
+    paths = find_unpublished(str(tmp_path), manifest)
+    assert [p.rsplit("/", 1)[-1] for p in paths] == ["dump1.csv"]
+    store.calls.clear()
+    report = BulkPublisher(manifest, store).run(paths)
+    assert report["published"] == 1 and not report["failed"]
+    assert [c[0] for c in store.calls] == ["upload", "deal", "deal", "register"]
+    assert find_unpublished(str(tmp_path), manifest) == []
+
+
+def test_manifest_follows_content_not_names(tmp_path):
+    _dumps(tmp_path, 1)
+    manifest = Manifest(str(tmp_path / "m.jsonl"))
+    path = str(tmp_path / "dump0.csv")
+    sha = manifest.sha256(path)
+    manifest.record("step", sha256=sha, step="register", path=path, result="0xtx")
+    (tmp_path / "dump0.csv").rename(tmp_path / "renamed.csv")
+    assert find_unpublished(str(tmp_path), manifest) == []
+    (tmp_path / "renamed.csv").write_text("Name,Content\nedited,row\n")
+    assert len(find_unpublished(str(tmp_path), manifest)) == 1
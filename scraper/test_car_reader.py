@@ -0,0 +1,78 @@
+import io
+import os
+
+import pandas as pd
+import pytest
+
+import car
+import car_reader
+from car_reader import CarReader
+
+
+def _csv(rows):
+    return pd.DataFrame({
+        "Tweet ID": [str(10_000 + i) for i in range(rows)],
+        "Content": [f"tweet {i} " + "gm " * (i % 40) for i in range(rows)],
+        "Deletion Likelihood": [i % 100 / 100 for i in range(rows)],
+    }).to_csv(index=False).encode()
+
+
+@pytest.fixture
+def big_car(tmp_path):
+    data = _csv(40_000)
+    root, blocks = car.build_file(car.fixed_chunks(data))
+    path = str(tmp_path / "dump.csv.car")
+    car.write_car(path, [root], blocks)
+    assert len(blocks) > 10
+    return path, data
+
+
+def test_head_reads_touch_only_the_first_blocks(big_car, monkeypatch):
+    path, data = big_car
+    touched = []
+    leaf_data = CarReader.leaf_data
+    monkeypatch.setattr(CarReader, "leaf_data", lambda self, cid: touched.append(cid) or leaf_data(self, cid))
+    with CarReader(path) as reader:
+        head = reader.read_frame(nrows=5)
+    assert list(head["Tweet ID"]) == [10_000, 10_001, 10_002, 10_003, 10_004]
+    assert len(set(touched)) == 1
+
+
+def test_streamed_frames_match_the_file(big_car):
+    path, data = big_car
+    expected = pd.read_csv(io.BytesIO(data))
+    with CarReader(path) as reader:
+        frames = list(reader.iter_frames(chunksize=7_000))
+        with reader.open() as f:
+            f.seek(len(data) - 10)
+            assert f.read() == data[-10:]
+    assert len(frames) == 6 and max(len(f) for f in frames) == 7_000
+    pd.testing.assert_frame_equal(pd.concat(frames, ignore_index=True), expected)
+
+
+def test_index_sidecar_is_reused(big_car, monkeypatch):
+    path, _ = big_car
+    with CarReader(path) as first:
+        index = first.index
+    assert os.path.exists(path + ".idx")
+    assert car_reader.decode_index(car_reader.encode_index(index)) == index
+    monkeypatch.setattr(CarReader, "build_index", lambda self: pytest.fail("index rebuilt"))
+    with CarReader(path) as again:
+        assert again.index == index
+        root = again.roots[0]
+        assert root in again and bytes(again.block(root)) == car.read_car(path)[1][root]
+
+
+def test_raw_leaf_and_parquet_payloads(tmp_path):
+    pytest.importorskip("pyarrow")
+    df = pd.DataFrame({"Content": [f"row {i}" for i in range(5_000)], "Likes": range(5_000)})
+    parquet = tmp_path / "dump.parquet"
+    df.to_parquet(parquet, row_group_size=1_000)
+    data = parquet.read_bytes()
+    root, blocks = car.build_file(car.fastcdc_chunks(data, avg_size=1024), raw_leaves=True)
+    path = str(tmp_path / "dump.parquet.car")
+    car.write_car(path, [root], blocks)
+    with CarReader(path) as reader:
+        assert reader.format() == "parquet"
+        assert list(reader.read_frame(nrows=3, columns=["Likes"])["Likes"]) == [0, 1, 2]
+        pd.testing.assert_frame_equal(reader.read_frame(), df)
@@ -0,0 +1,67 @@
+import json
+
+import pandas as pd
+import pytest
+
+from dataset_io import SCHEMA_COLUMNS, detect_format, preview_json, read_dataset, write_dataset
+
+pytest.importorskip("pyarrow")
+
+
+def sample():
+    return pd.DataFrame({
+        "Name": ["TUX", "Bot"],
+        "Handle": ["@magicaltux_op", "@bot"],
+        "Timestamp": ["2025-04-27T01:34:40.000Z", "2025-04-27T01:35:00.000Z"],
+        "Verified": [True, False],
+        "Content": ["Levered $ETH", "#TRUMP/USDT signal"],
+        "Comments": [0, 3],
+        "Retweets": [0, 1],
+        "Likes": [0, 1200],
+        "Analytics": [10, 0],
+        "Tags": [[], ["#TRUMP"]],
+        "Mentions": [[], []],
+        "Profile Image": ["https://pbs.twimg.com/a.jpg", ""],
+        "Tweet Link": ["https://x.com/a/status/1", "https://x.com/b/status/2"],
+        "Tweet ID": ["tweet_id:1", "tweet_id:2"],
+        "IPFS Screenshot": ["", ""],
+        "Deletion Likelihood": [0.1, 0.8],
+        "Coin": ["testETH", "testBTC"],
+    })
+
+
+@pytest.mark.parametrize("fmt", ["parquet", "arrow"])
+def test_columnar_round_trip_with_fixed_schema(tmp_path, fmt):
+    path = write_dataset(sample(), str(tmp_path / "dump"), fmt)
+    assert path.endswith("." + fmt) and detect_format(path) == fmt
+    df = read_dataset(path)
+    assert list(df.columns) == [name for name, _ in SCHEMA_COLUMNS]
+    assert list(df.loc[1, "Tags"]) == ["#TRUMP"]
+    assert read_dataset(path, columns=["Coin"]).columns.tolist() == ["Coin"]
+
+
+def test_csv_reloaded_frame_converts_to_parquet(tmp_path):
+    csv_path = write_dataset(sample(), str(tmp_path / "dump"), "csv")
+    reloaded = pd.read_csv(csv_path)
+    path = write_dataset(reloaded.drop(columns=["Coin"]), str(tmp_path / "again"), "parquet")
+    df = read_dataset(path)
+    assert list(df.loc[1, "Tags"]) == ["#TRUMP"]
+    assert df["Coin"].isna().all()
+
+
+def test_preview_records_format():
+    preview = json.loads(preview_json(sample(), "parquet"))
+    assert preview["format"] == "parquet"
+    assert preview["rows"][0]["Handle"] == "@magicaltux_op"
+
+
+def test_sort_rows_is_stable_and_numeric():
+    from dataset_io import sort_rows
+
+    df = pd.DataFrame({"Tweet ID": ["tweet_id:100", "tweet_id:9", "tweet_id:100", None, "9"],
+                       "Content": ["a, b", "multi\nline", "second", "no id", "bare"]})
+    out = sort_rows(df)
+    assert out["Content"].tolist() == ["multi\nline", "bare", "a, b", "second", "no id"]
+    assert out.index.tolist() == list(range(5))
+    names = pd.DataFrame({"Name": ["b", "a"]})
+    assert sort_rows(names) is names
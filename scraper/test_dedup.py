@@ -0,0 +1,36 @@
+from dedup import NearDupIndex, normalize, shingles
+
+SIGNALS = [
+    "#TRUMP/USDT\n\nLong\nLeverage : Cross 25× \n\nEntry : 15.60 - 15.20\nTargets : 16.0 - 16.5 - 17.2 @trader https://t.co/abc",
+    "#TRUMP/USDT\n\nLong\nLeverage : Cross 20× \n\nEntry : 15.10 - 14.90\nTargets : 15.8 - 16.3 - 17.0 @other https://t.co/xyz",
+    "#TRUMP/USDT Long Leverage: Cross 25x Entry: 15.55 - 15.25 Targets: 16.1 - 16.6 - 17.3",
+]
+OTHER = [
+    "Ethereum, the pioneer of smart contracts, continues to drive innovation in #DeFi",
+    "I would join this just to get alpha on the next generation of apps built on Ethereum.",
+    "123 años de Real ¡Felicidades a toda la familia madridista! ¡Hala Madrid!",
+]
+
+
+def test_normalize_folds_numbers_links_and_mentions():
+    assert normalize("Entry: 15.60 @bob https://t.co/x BUY!") == "entry 0 buy"
+    assert shingles("a") == {"a"}
+    assert shingles("") == set()
+
+
+def test_signal_variants_share_a_cluster():
+    index = NearDupIndex()
+    ids = [index.add(i, t) for i, t in enumerate(SIGNALS + OTHER)]
+    assert ids[:3] == [0, 0, 0]
+    assert ids[3:] == [3, 4, 5]
+    assert index.is_representative(0) and not index.is_representative(2)
+    assert index.size(1) == 3 and index.size(4) == 1
+
+
+def test_add_is_idempotent_and_empty_text_is_its_own_cluster():
+    index = NearDupIndex()
+    assert index.add(7, SIGNALS[0]) == 7
+    assert index.add(7, OTHER[0]) == 7
+    assert index.add(8, "") == 8
+    assert index.add(9, "") == 9
+    assert len(index) == 3
@@ -0,0 +1,52 @@
+import pytest
+
+import governance
+import multicall
+import rpc
+from blocktime import BlockTimes
+
+
+def test_status_of_many_proposals_in_one_round_trip(dev_rpc, governor, tmp_path):
+    gov, ids = governor
+    times = BlockTimes(gov.w3, path=str(tmp_path / "blocks.sqlite"))
+    multicall.is_deployed(gov.w3)  # one-off code check, cached per provider
+    dev_rpc.requests.clear()
+    rows = governance.status(gov, ids + [12345], times=times)
+    assert len(dev_rpc.requests) == 1  # future snapshot/deadline blocks need no fetch
+
+    first, second, unknown = rows
+    assert (first["handle"], first["state"]) == ("flarenetworks", "Pending")
+    assert second["handle"] == "filecoin" and unknown["state"] is None
+    assert first["snapshot"] > first["head"] and first["deadline"] > first["snapshot"]
+    ts, exact = first["snapshot_time"]
+    assert not exact and ts > 0
+    assert governance.proposal_ids(gov, 0) == ids
+
+
+def test_simulated_multicall3_decodes_like_direct_calls(dev_rpc, governor, monkeypatch):
+    gov, ids = governor
+    w3 = gov.w3
+    real = rpc.send_batch
+
+    def aggregate3(w3_, requests):
+        # stand-in for the Multicall3 contract: run each inner call, re-encode
+        call = requests[0][1][0]
+        agg = w3.eth.contract(address=call["to"], abi=[multicall.AGGREGATE3_ABI])
+        _, params = agg.decode_function_input(call["data"])
+        out = []
+        for c in params["calls"]:
+            try:
+                out.append((True, bytes(w3.eth.call({"to": c["target"], "data": c["callData"]}))))
+            except Exception:
+                out.append((False, b""))
+        encoded = "0x" + w3.codec.encode(["(bool,bytes)[]"], [out]).hex()
+        return [{"jsonrpc": "2.0", "id": 0, "result": encoded}] + real(w3_, requests[1:])
+
+    monkeypatch.setattr(rpc, "send_batch", aggregate3)
+    calls = [gov.functions.state(ids[0]), gov.functions.twitterProposals(ids[1]),
+             gov.functions.state(999)]
+    values, head = multicall.read(calls, latest_block=True, allow_failure=True, use_multicall=True)
+    assert values == [0, ["filecoin", 0, 0, 0], None]
+    assert head["number"] == w3.eth.block_number
+    with pytest.raises(multicall.MulticallError):
+        multicall.read(calls, use_multicall=True)
@@ -0,0 +1,121 @@
+import json
+import os
+
+import pytest
+
+import logscan
+from govindex import GovernanceIndex
+
+ABI = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "artifacts", "Governor.sol",
+                   "TruthAnchorGovernor.json")
+
+
+def test_sync_lists_proposals_and_resumes_from_the_cursor(dev_rpc, governor, tmp_path):
+    gov, ids = governor
+    index = GovernanceIndex(gov, path=str(tmp_path / "gov.sqlite"), start_block=0, confirmations=0)
+    dev_rpc.requests.clear()
+    assert index.sync() == 2
+    assert len(dev_rpc.requests) == 2  # head block + one eth_getLogs batch for the whole chain
+
+    rows = index.proposals()
+    assert [(p["id"], p["handle"], p["phase"]) for p in rows] == \
+        [(ids[0], "flarenetworks", "Pending"), (ids[1], "filecoin", "Pending")]
+    assert rows[0]["votes_for"] == 0 and rows[0]["vote_end"] > rows[0]["vote_start"] > rows[0]["block"]
+
+    # a new proposal: only the blocks after the cursor are scanned
+    head = index.cursor()
+    me = dev_rpc.w3.eth.accounts[0]
+    local = dev_rpc.w3.eth.contract(address=gov.address, abi=gov.abi)
+    local.functions.proposeTwitterHandle("ipfs").transact({"from": me})
+    dev_rpc.requests.clear()
+    assert index.sync() == 1
+    scanned = [r["params"][0] for r in dev_rpc.requests[1]]
+    assert int(scanned[0]["fromBlock"], 16) == head + 1
+    assert index.proposals()[-1]["handle"] == "ipfs"
+
+    # queries are local
+    dev_rpc.requests.clear()
+    assert index.proposal(ids[1])["handle"] == "filecoin" and index.proposal(12345) is None
+    assert dev_rpc.requests == []
+    index.close()
+
+
+@pytest.fixture
+def history(monkeypatch):
+    """A governor without a chain: synthetic logs served through a stubbed send_batch."""
+    from web3 import Web3
+
+    w3 = Web3()
+    with open(ABI) as f:
+        gov = w3.eth.contract(address="0x" + "11" * 20, abi=json.load(f)["abi"])
+    events = {e.event_name: e for e in (gov.events.ProposalCreated(), gov.events.VoteCast(),
+                                        gov.events.VoteCastWithParams(), gov.events.ProposalQueued(),
+                                        gov.events.ProposalExecuted())}
+    logs, requests = [], []
+
+    def emit(block, name, *args, voter=None):
+        event = events[name]
+        types = [i["type"] for i in event.abi["inputs"] if not i["indexed"]]
+        topics = [event.topic] + (["0x" + "00" * 12 + voter[2:].lower()] if voter else [])
+        logs.append({"address": gov.address, "topics": topics, "data": "0x" + w3.codec.encode(types, args).hex(),
+                     "blockNumber": hex(block), "logIndex": hex(len(logs)), "transactionIndex": "0x0",
+                     "transactionHash": "0x" + "22" * 32, "blockHash": "0x" + "33" * 32, "removed": False})
+
+    def send_batch(w3_, reqs):
+        requests.append(reqs)
+        out = []
+        for _, [f] in reqs:
+            start, end = int(f["fromBlock"], 16), int(f["toBlock"], 16)
+            out.append({"result": [log for log in logs if start <= int(log["blockNumber"], 16) <= end
+                                   and log["topics"][0] in f["topics"][0]]})
+        return out
+
+    monkeypatch.setattr(logscan.rpc, "send_batch", send_batch)
+    return gov, emit, requests
+
+
+def test_tallies_phases_and_voter_history_from_events(history, tmp_path):
+    gov, emit, requests = history
+    alice, bob = "0x" + "aa" * 20, "0x" + "bb" * 20
+    noop = [[gov.address], [0], [""], [bytes.fromhex("5c36b186")]]
+    emit(10, "ProposalCreated", 1, alice, *noop, 100, 200, "Proposal for Twitter handle: flarenetworks")
+    emit(12, "ProposalCreated", 2, bob, *noop, 102, 202, "Proposal for Twitter handle: filecoin")
+    emit(150, "VoteCast", 1, 1, 8 * 10**23, "", voter=alice)
+    emit(151, "VoteCast", 1, 0, 10**23, "too early", voter=bob)
+    emit(160, "VoteCastWithParams", 2, 2, 3 * 10**23, "", b"\x01", voter=alice)
+    emit(250, "ProposalQueued", 1, 1_700_000_000)
+    emit(420, "ProposalExecuted", 1)
+
+    path = str(tmp_path / "gov.sqlite")
+    index = GovernanceIndex(gov, path=path, start_block=0, window=100)
+    assert index.sync(to_block=180) == 5
+    first, second = index.proposals()
+    assert (first["votes_for"], first["votes_against"], first["voters"]) == (8 * 10**23, 10**23, 2)
+    assert (second["votes_abstain"], second["phase"]) == (3 * 10**23, "Active")
+
+    index.close()
+    index = GovernanceIndex(gov, path=path, start_block=0, window=100)
+    seen = len(requests)
+    index.sync(to_block=300)
+    assert int(requests[seen][0][1][0]["fromBlock"], 16) == 181  # resumed from the cursor
+    assert index.proposal(1)["phase"] == "Queued" and index.proposal(1)["eta"] == 1_700_000_000
+    assert index.proposal(2)["phase"] == "Closed"
+    index.sync(to_block=500)
+    assert index.proposal(1)["phase"] == "Executed"
+    assert index.proposal(1)["votes_for"] == 8 * 10**23  # nothing counted twice
+
+    history_ = index.voter_history(alice)
+    assert [(v["proposal"], v["handle"], v["support"]) for v in history_] == \
+        [(1, "flarenetworks", "for"), (2, "filecoin", "abstain")]
+    assert [v["reason"] for v in index.votes(1)] == ["", "too early"]
+    index.close()
+
+
+def test_votes_before_start_block_still_tally(history, tmp_path):
+    gov, emit, _ = history
+    emit(5, "ProposalCreated", 7, "0x" + "aa" * 20, [gov.address], [0], [""], [b""], 6, 9, "plain")
+    emit(8, "VoteCast", 7, 1, 42, "", voter="0x" + "cc" * 20)
+    index = GovernanceIndex(gov, path=":memory:", start_block=7, window=100)
+    index.sync(to_block=20)
+    (p,) = index.proposals()
+    assert (p["id"], p["votes_for"], p["handle"], p["phase"]) == (7, 42, None, None)
@@ -0,0 +1,51 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+# Scrape-only startup budget for `import twitter_scraper` (cumulative µs as
+# reported by -X importtime). Override on slow machines with IMPORT_BUDGET_MS.
+BUDGET_MS = float(os.getenv("IMPORT_BUDGET_MS", "1000"))
+HEAVY = ("langchain", "langchain_openai", "langgraph", "openai", "web3", "pandas", "webdriver_manager")
+CHAIN_ENV = ("FLARE_RPC_URL", "FLARE_PRIVATE_KEY", "TWITTER_FTSO_ADDR", "COSTON2_RPC_URL",
+             "FTSO_CONSUMER_ADDRESS", "PINATA_API_KEY", "PINATA_API_SECRET", "PINATA_JWT",
+             "RPC_URL", "PRIVATE_KEY", "OWNER_ADDRESS", "CONTRACT_ADDR", "W3UP_SPACE_DID")
+
+
+def _import(module, code=""):
+    env = {k: v for k, v in os.environ.items() if k not in CHAIN_ENV}
+    return subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}, sys\n{code}"],
+        cwd=HERE, env=env, capture_output=True, text=True, timeout=120,
+    )
+
+
+def _cumulative_us(stderr, module):
+    for line in stderr.splitlines():
+        if line.startswith("import time:") and line.rstrip().endswith(f"| {module}"):
+            return int(line.split("|")[1])
+    raise AssertionError(f"{module} not in -X importtime output")
+
+
+def test_scraper_import_is_light_and_needs_no_config():
+    pytest.importorskip("selenium")
+    check = f"heavy = [m for m in sys.modules if m.split('.')[0] in {HEAVY!r}]\nprint(heavy)"
+    proc = _import("twitter_scraper", check)
+    assert proc.returncode == 0, proc.stderr[-2000:]
+    assert proc.stdout.strip() == "[]"
+    took_ms = _cumulative_us(proc.stderr, "twitter_scraper") / 1000
+    assert took_ms < BUDGET_MS, f"import twitter_scraper took {took_ms:.0f} ms (budget {BUDGET_MS:.0f} ms)"
+
+
+@pytest.mark.parametrize("module", ["ftso_push", "ftso_price", "store", "ipfs_screenshot",
+                                    "ai_analysis", "ai_coin_identifier"])
+def test_modules_import_without_env(module):
+    proc = _import(module)
+    assert proc.returncode == 0, proc.stderr[-2000:]
+
+
+def test_missing_chain_config_raises_on_first_use():
+    proc = _import("ftso_push", "\ntry:\n    ftso_push.get_client()\nexcept EnvironmentError as e:\n    print('raised', e)")
+    assert "raised FLARE_RPC_URL" in proc.stdout
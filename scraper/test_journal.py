@@ -0,0 +1,40 @@
+from journal import Journal
+
+
+def test_replay_restores_rows_scores_and_steps(tmp_path):
+    path = tmp_path / "run.jsonl"
+    j = Journal(str(path))
+    j.record("config", config={"query": "ETH", "tweets": 2})
+    j.record("tweet", idx=0, row={"name": "a", "content": "gm", "ipfs_screenshot": ""})
+    j.record("tweet", idx=1, row={"name": "b", "content": "wagmi", "ipfs_screenshot": ""})
+    j.record("pin", idx=1, url="https://gateway.pinata.cloud/ipfs/Qm1")
+    j.record("score", idx=0, score=0.25, analysis="Score: 0.25")
+    j.record("step", name="pinata", result="QmRoot")
+    j.close()
+
+    state = Journal(str(path)).state
+    assert state.config == {"query": "ETH", "tweets": 2}
+    rows = state.ordered_rows()
+    assert [r["name"] for r in rows] == ["a", "b"]
+    assert rows[1]["ipfs_screenshot"] == "https://gateway.pinata.cloud/ipfs/Qm1"
+    assert state.scores == {0: 0.25}
+    assert state.steps == {"pinata": "QmRoot"}
+
+
+def test_torn_last_line_is_ignored(tmp_path):
+    path = tmp_path / "run.jsonl"
+    j = Journal(str(path))
+    j.record("score", idx=0, score=0.5)
+    j.close()
+    with open(path, "a") as f:
+        f.write('{"kind": "score", "idx": 1, "sc')
+    assert Journal.replay(str(path)).scores == {0: 0.5}
+
+
+def test_append_after_torn_line_starts_a_new_record(tmp_path):
+    path = tmp_path / "run.jsonl"
+    path.write_text('{"kind": "score", "idx": 0, "score": 0.5}\n{"kind": "sc')
+    j = Journal(str(path))
+    j.record("score", idx=1, score=0.75)
+    j.close()
+    assert Journal.replay(str(path)).scores == {0: 0.5, 1: 0.75}
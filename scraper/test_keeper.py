@@ -0,0 +1,116 @@
+import pytest
+
+import rpc
+import store
+from keeper import AccessKeeper
+from registry import RegistryMirror
+
+KEY = "0x" + "00" * 31 + "01"  # eth-tester's first account
+PRICE = 10**15
+KEY_ADDRESS = "0x7E5F4552091A69125d5DfCb7b8C2659029395Bdf"
+
+
+@pytest.fixture
+def market(dev_rpc, tmp_path, monkeypatch):
+    """Registry with 20 priced datasets, a keeper on the HTTP client, and its state path."""
+    deployed = dev_rpc.deploy("artifacts/AIDatasetRegistry.sol/AIDatasetRegistry.json")
+    http = rpc.get_web3(urls=[dev_rpc.url])
+    contract = http.eth.contract(address=deployed.address, abi=deployed.abi)
+    monkeypatch.setattr(store, "_chain", (http, contract, http.eth.account.from_key(KEY).address, KEY))
+    owner = dev_rpc.w3.eth.accounts[0]
+    for i in range(20):
+        deployed.functions.addDataset(f"QmSet{i}", ("t", f"QmSet{i}", 1, "d", PRICE, 0, "p")).transact(
+            {"from": owner, "gas": 500_000})  # eth-tester's estimates are slow
+    mirror = RegistryMirror(contract, path=str(tmp_path / "registry.sqlite"))
+    path = str(tmp_path / "keeper.sqlite")
+    start = dev_rpc.w3.eth.block_number + 1
+
+    def keeper(**kw):
+        kw.setdefault("mirror", mirror)
+        return AccessKeeper(contract, path=path, confirmations=0, start_block=start, **kw)
+    return deployed, keeper
+
+
+def _request_all(registry, buyers, datasets):
+    for buyer in buyers:
+        for d in datasets:
+            registry.functions.requestDatasetAccess(d).transact({"from": buyer, "value": PRICE, "gas": 200_000})
+
+
+def test_keeper_grants_all_requests_in_constant_round_trips(dev_rpc, market):
+    registry, keeper = market
+    buyers = dev_rpc.w3.eth.accounts[1:4]
+    datasets = [f"QmSet{i}" for i in range(20)]
+    _request_all(registry, buyers, datasets)
+
+    k = keeper()
+    dev_rpc.requests.clear()
+    assert k.tick() == {"sent": 60}
+    # head, logs, Multicall3 code check, prices, nonce, sends
+    assert len(dev_rpc.requests) <= 6
+    assert dev_rpc.calls().count("eth_sendRawTransaction") == 60
+    dev_rpc.requests.clear()
+    assert k.tick() == {"granted": 60}
+    assert dev_rpc.calls().count("eth_getTransactionReceipt") == 60 and len(dev_rpc.requests) <= 3
+    granted = registry.events.DatasetAccessGranted.get_logs(from_block=0)
+    assert {(g["args"]["datasetId"], g["args"]["requester"]) for g in granted} == \
+        {(d, b) for b in buyers for d in datasets}
+
+    # a second keeper resumes from the stored cursor; a repeat request is not granted again
+    k.close()
+    registry.functions.requestDatasetAccess("QmSet0").transact({"from": buyers[0], "value": PRICE})
+    k = keeper()
+    dev_rpc.requests.clear()
+    assert k.tick() == {"duplicate": 1}
+    assert "eth_sendRawTransaction" not in dev_rpc.calls()
+    assert k.counts() == {"granted": 60, "duplicate": 1}
+
+
+def test_keeper_skips_underpaid_requests_and_retries_failed_sends(dev_rpc, market):
+    registry, keeper = market
+    buyers = dev_rpc.w3.eth.accounts[1:3]
+    for b in buyers:
+        registry.functions.requestDatasetAccess("QmSet1").transact({"from": b, "value": PRICE})
+    registry.functions.requestDatasetAccess("QmSet2").transact({"from": buyers[0], "value": PRICE})
+
+    class Mirror:
+        chain_id = 131277322940537  # eth-tester
+
+        def prices(self, ids):
+            return {"QmSet1": PRICE, "QmSet2": 2 * PRICE}  # QmSet2's cached price is higher
+
+    outcomes = iter([[None, None], ["0xtx", None]])
+    k = keeper(mirror=Mirror(), send=lambda datas, labels, gas: next(outcomes)[:len(datas)])
+    assert k.tick() == {"underpaid": 1, "pending": 2}
+    assert k.tick() == {"sent": 1, "pending": 1}
+
+
+def test_keeper_resends_a_reverted_grant(dev_rpc, market):
+    registry, keeper = market
+    buyer = dev_rpc.w3.eth.accounts[1]
+    _request_all(registry, [buyer], ["QmSet3"])
+
+    k = keeper(gas=30_000)  # past the intrinsic cost, out of gas in the call
+    assert k.tick() == {"sent": 1}
+    registry.functions.requestDatasetAccess("QmSet3").transact({"from": buyer, "value": PRICE})
+    k.gas = 100_000
+    # the revert puts it back to pending and it is sent again; the repeat waits for that receipt
+    assert k.tick() == {"pending": 1, "sent": 1}
+    assert k.counts() == {"pending": 1, "sent": 1}
+    assert k.tick() == {"granted": 1, "duplicate": 1}
+    granted = registry.events.DatasetAccessGranted.get_logs(from_block=0)
+    assert [(g["args"]["datasetId"], g["args"]["requester"]) for g in granted] == [("QmSet3", buyer)]
+
+
+def test_keeper_resends_a_grant_without_receipt(market, monkeypatch):
+    _, keeper = market
+    k = keeper(receipt_blocks=5, send=lambda datas, labels, gas: ["0x" + "ab" * 32] * len(datas))
+    k._db.execute("INSERT INTO requests (registry, block, log_index, dataset, requester, fee, status, attempts, "
+                  "tx, sent_block) VALUES (?, 1, 0, 'QmSet4', ?, ?, 'sent', 1, ?, 10)",
+                  (k.key, KEY_ADDRESS, str(PRICE), "0x" + "cd" * 32))
+    monkeypatch.setattr(rpc, "send_batch", lambda w3, requests: [{"result": None}] * len(requests))
+    k.head = 14
+    assert k.confirm() == {}  # still within receipt_blocks
+    k.head = 15
+    assert k.confirm() == {"pending": 1}
+    assert k.grant() == {"sent": 1}
@@ -0,0 +1,58 @@
+import pytest
+
+from llm_batch import BatchFormatError, align, count_tokens, pack, run_batched
+
+
+def test_pack_respects_budget_and_item_cap():
+    assert pack([10, 10, 10, 10], budget=40, max_items=10) == [[0, 1], [2, 3]]
+    assert pack([1] * 5, budget=1000, max_items=2) == [[0, 1], [2, 3], [4]]
+    # an oversized item gets its own batch instead of blocking the rest
+    assert pack([5, 500, 5], budget=40, max_items=10) == [[0], [1], [2]]
+
+
+def test_count_tokens_grows_with_text():
+    assert 0 < count_tokens("gm") < count_tokens("gm " * 50)
+
+
+def test_align_requires_each_index_once():
+    assert [x["v"] for x in align([{"i": 1, "v": "b"}, {"i": 0, "v": "a"}], 2)] == ["a", "b"]
+    for bad in ([{"i": 0}], [{"i": 0}, {"i": 0}], [{"i": 0}, {"i": 5}], [{"v": 1}], None):
+        with pytest.raises(BatchFormatError):
+            align(bad, 2)
+
+
+def test_failed_batches_are_split_and_results_stay_aligned():
+    calls = []
+
+    def call(batch):
+        calls.append(len(batch))
+        if "poison" in batch and len(batch) > 1:
+            raise BatchFormatError("model lost track")
+        if batch == ["poison"]:
+            return ["??"]
+        return [t.upper() for t in batch]
+
+    texts = ["a", "b", "poison", "c", "d"]
+    assert run_batched(texts, call, budget=10_000) == ["A", "B", "??", "C", "D"]
+    assert calls[0] == 5 and max(calls[1:]) < 5
+
+
+def test_tweet_that_never_succeeds_becomes_none():
+    def call(batch):
+        if "bad" in batch:
+            return []  # misaligned answer
+        return batch
+
+    assert run_batched(["x", "bad", "y"], call, budget=10_000) == ["x", None, "y"]
+
+
+def test_transport_errors_are_raised_not_split():
+    calls = []
+
+    def call(batch):
+        calls.append(len(batch))
+        raise ConnectionError("429 Too Many Requests")
+
+    with pytest.raises(ConnectionError):
+        run_batched([f"t{i}" for i in range(8)], call, budget=10_000)
+    assert calls == [8]
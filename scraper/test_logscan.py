@@ -0,0 +1,45 @@
+import logscan
+
+
+def test_get_logs_chunks_batches_and_splits_refused_ranges(monkeypatch):
+    batches = []
+
+    def send_batch(w3, requests):
+        batches.append(requests)
+        out = []
+        for _, [f] in requests:
+            start, end = int(f["fromBlock"], 16), int(f["toBlock"], 16)
+            if end - start >= 10:
+                out.append({"error": {"message": "query exceeds max results"}})
+            else:
+                out.append({"result": [{"blockNumber": hex(b), "logIndex": "0x0"} for b in range(start, end + 1)
+                                       if b % 7 == 0]})
+        return out
+
+    monkeypatch.setattr(logscan.rpc, "send_batch", send_batch)
+    logs = logscan.get_logs(None, "0xabc", ["0xtopic"], 5, 100, span=30, batch=2)
+    assert [int(log["blockNumber"], 16) for log in logs] == list(range(7, 101, 7))
+    assert len(batches[0]) == 2 and batches[0][0][1][0]["address"] == ["0xabc"]
+    assert all(len(b) <= 2 for b in batches)
+
+
+def test_get_logs_keeps_several_batches_in_flight(monkeypatch):
+    import time
+    import threading
+
+    lock = threading.Lock()
+    flight = {"now": 0, "max": 0}
+
+    def send_batch(w3, requests):
+        with lock:
+            flight["now"] += 1
+            flight["max"] = max(flight["max"], flight["now"])
+        time.sleep(0.05)
+        with lock:
+            flight["now"] -= 1
+        return [{"result": [{"blockNumber": f["fromBlock"], "logIndex": "0x0"}]} for _, [f] in requests]
+
+    monkeypatch.setattr(logscan.rpc, "send_batch", send_batch)
+    logs = logscan.get_logs(None, "0xabc", ["0xtopic"], 0, 299, span=10, batch=2, concurrency=4)
+    assert [int(log["blockNumber"], 16) for log in logs] == list(range(0, 300, 10))
+    assert flight["max"] == 4
@@ -0,0 +1,40 @@
+import json
+
+import pytest
+
+from metrics import Registry, export, timed
+
+
+def test_timer_decorator_and_context_manager_record_latency():
+    reg = Registry()
+
+    @timed("rpc.call", registry=reg)
+    def call(x):
+        return x * 2
+
+    assert call(2) == 4
+    with timed("rpc.call", registry=reg):
+        pass
+    with pytest.raises(ValueError):
+        with timed("rpc.call", registry=reg):
+            raise ValueError("boom")
+    summary = reg.summary()
+    assert summary["timers"]["rpc.call"]["count"] == 3
+    assert summary["counters"] == {"rpc.call.errors": 1}
+
+
+def test_prometheus_and_json_export(tmp_path):
+    reg = Registry()
+    reg.inc("tweets.scraped", 5)
+    reg.observe("llm.analyze_tweet", 0.2)
+    reg.observe("llm.analyze_tweet", 3.0)
+    text = reg.prometheus()
+    assert "scraper_tweets_scraped_total 5" in text
+    assert 'scraper_llm_analyze_tweet_seconds_bucket{le="0.25"} 1' in text
+    assert 'scraper_llm_analyze_tweet_seconds_bucket{le="+Inf"} 2' in text
+
+    export(str(tmp_path / "run.json"), registry=reg)
+    data = json.loads((tmp_path / "run.json").read_text())
+    assert data["timers"]["llm.analyze_tweet"]["max"] == 3.0
+    export(str(tmp_path / "run.prom"), registry=reg)
+    assert (tmp_path / "run.prom").read_text() == text
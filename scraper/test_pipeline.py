@@ -0,0 +1,100 @@
+import threading
+import time
+
+from pipeline import Pipeline, stage_settings
+
+
+def test_items_flow_through_every_stage():
+    seen = []
+    lock = threading.Lock()
+
+    def sink(x):
+        with lock:
+            seen.append(x)
+
+    p = (
+        Pipeline()
+        .add("double", lambda x: x * 2, workers=3, maxsize=4)
+        .add("inc", lambda x: x + 1, workers=2, maxsize=4)
+        .add("sink", sink, workers=1, maxsize=4)
+        .start()
+    )
+    for i in range(50):
+        p.put(i)
+    p.close()
+    assert sorted(seen) == [i * 2 + 1 for i in range(50)]
+
+
+def test_failing_item_is_forwarded_and_recorded():
+    out = []
+
+    def boom(x):
+        if x == 3:
+            raise ValueError("bad tweet")
+        return x
+
+    p = Pipeline().add("boom", boom, workers=1).add("sink", out.append, workers=1).start()
+    for i in range(5):
+        p.put(i)
+    p.close()
+    assert sorted(out) == [0, 1, 2, 3, 4]
+    assert [(name, item) for name, item, _ in p.errors()] == [("boom", 3)]
+
+
+def test_bounded_inbox_blocks_producer():
+    gate = threading.Event()
+    p = Pipeline().add("slow", lambda x: gate.wait(), workers=1, maxsize=1).start()
+    p.put(0)  # taken by the worker
+    p.put(1)  # fills the inbox
+    t = threading.Thread(target=p.put, args=(2,))
+    t.start()
+    time.sleep(0.1)
+    assert t.is_alive()
+    gate.set()
+    t.join(timeout=2)
+    assert not t.is_alive()
+    p.close()
+
+
+def test_stage_settings_env_override(monkeypatch):
+    monkeypatch.setenv("PIPELINE_SCORE_WORKERS", "8")
+    monkeypatch.setenv("PIPELINE_SCORE_QUEUE", "5")
+    assert stage_settings("score") == (8, 5)
+    assert stage_settings("unknown") == (1, 0)
+
+
+def test_batched_stage_gets_lists_and_forwards_items():
+    batches = []
+    out = []
+    lock = threading.Lock()
+
+    def square_all(items):
+        with lock:
+            batches.append(len(items))
+        return [x * x for x in items]
+
+    def sink(x):
+        with lock:
+            out.append(x)
+
+    p = (Pipeline().add("square", square_all, workers=1, batch=4, linger=0.05)
+         .add("sink", sink, workers=1).start())
+    for i in range(10):
+        p.put(i)
+    p.close()
+    assert sorted(out) == [i * i for i in range(10)]
+    assert sum(batches) == 10 and max(batches) <= 4
+
+
+def test_failing_batch_forwards_its_items():
+    out = []
+
+    def boom(items):
+        raise ValueError("rate limited")
+
+    p = Pipeline().add("boom", boom, workers=1, batch=8, linger=0.05).add("sink", out.append).start()
+    for i in range(3):
+        p.put(i)
+    p.close()
+    assert sorted(out) == [0, 1, 2]
+    assert sorted(item for _, item, _ in p.errors()) == [0, 1, 2]
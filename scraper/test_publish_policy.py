@@ -0,0 +1,95 @@
+import json
+
+import ftso_push
+import publish_policy
+from publish_policy import PublishPolicy
+
+
+class Clock:
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def test_deviation_and_heartbeat(tmp_path):
+    clock = Clock()
+    policy = PublishPolicy(path=str(tmp_path / "p.json"), deviation=2, heartbeat=600, clock=clock)
+    assert policy.decide("f", 50) == (True, "first publish")
+    policy.record("f", 50, "0xaa")
+
+    publish, reason = policy.decide("f", 51)
+    assert not publish and "heartbeat due in 600s" in reason
+    assert policy.decide("f", 52)[0] and policy.decide("f", 48)[0]
+
+    clock.now += 600
+    publish, reason = policy.decide("f", 50)
+    assert publish and reason.startswith("heartbeat")
+
+
+def test_state_survives_restart_and_chain_wins(tmp_path):
+    path = str(tmp_path / "p.json")
+    clock = Clock()
+    PublishPolicy(path=path, clock=clock).record("f", 40, "0xaa")
+    assert json.load(open(path))["f"]["value"] == 40
+
+    again = PublishPolicy(path=path, heartbeat=600, clock=clock)
+    again.verify("f", 40)
+    assert again.last("f")["tx"] == "0xaa" and not again.decide("f", 40)[0]
+
+    # a reverted or foreign update: adopt the chain value, heartbeat is due
+    again.verify("f", 70)
+    assert again.last("f") == {"value": 70, "published_at": 0, "tx": None}
+    assert again.decide("f", 70)[0]
+
+
+def test_publish_score_skips_small_moves_on_chain(dev_rpc, tmp_path, monkeypatch):
+    w3 = dev_rpc.w3
+    account = w3.eth.account.from_key("0x" + "00" * 31 + "01")
+    ftso = dev_rpc.deploy("artifacts/MockFTSO.sol/MockTwitterFTSO.json", account.address)
+    clock = Clock()
+    policy = PublishPolicy(path=str(tmp_path / "p.json"), deviation=2, heartbeat=600, clock=clock)
+    monkeypatch.setattr(ftso_push, "_client", (w3, account, ftso))
+    monkeypatch.setattr(ftso_push, "_claims", {})
+    monkeypatch.setattr(publish_policy, "_policy", policy)
+
+    # chain holds 0 with no local record: the heartbeat is due straight away
+    assert ftso_push.publish_score(1)
+    assert ftso.functions.tweetScore().call() == 1
+    sent = w3.eth.get_block_number()
+
+    assert ftso_push.publish_score(2) is None
+    assert w3.eth.get_block_number() == sent
+    assert ftso_push.publish_score(2, force=True)
+    assert ftso_push.publish_score(9)
+    clock.now += 600
+    assert ftso_push.publish_score(9)
+    assert ftso.functions.tweetScore().call() == 9
+    assert policy.last(f"tweetScore@{ftso.address}")["published_at"] == clock.now
+
+
+def test_each_job_publishes_to_its_own_feed(dev_rpc, tmp_path, monkeypatch, caplog):
+    w3 = dev_rpc.w3
+    account = w3.eth.account.from_key("0x" + "00" * 31 + "01")
+    btc, eth = (dev_rpc.deploy("artifacts/MockFTSO.sol/MockTwitterFTSO.json", account.address)
+                for _ in range(2))
+    policy = PublishPolicy(path=str(tmp_path / "p.json"), deviation=2, heartbeat=600, clock=Clock())
+    monkeypatch.setattr(ftso_push, "_client", (w3, account, btc))
+    monkeypatch.setattr(ftso_push, "_contracts", {})
+    monkeypatch.setattr(ftso_push, "_claims", {})
+    monkeypatch.setattr(publish_policy, "_policy", policy)
+
+    assert ftso_push.publish_score(50, feed="BTC")
+    assert ftso_push.publish_score(10, feed="ETH", address=eth.address)
+    # BTC's deviation is measured against BTC's last push, not ETH's
+    assert ftso_push.publish_score(51, feed="BTC") is None
+    assert ftso_push.publish_score(11, feed="ETH", address=eth.address) is None
+    assert (btc.functions.tweetScore().call(), eth.functions.tweetScore().call()) == (50, 10)
+    assert policy.last(f"tweetScore:BTC@{btc.address}")["value"] == 50
+    assert policy.last(f"tweetScore:ETH@{eth.address}")["value"] == 10
+
+    # a job without its own contract still keeps its own state, with a warning
+    assert ftso_push.publish_score(80, feed="FLR")
+    assert "both push to" in caplog.text
+    assert ftso_push.publish_score(81, feed="FLR") is None
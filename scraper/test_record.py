@@ -0,0 +1,56 @@
+from record import TweetBuffer, TweetRecord, parse_count
+
+
+def make(i, **kw):
+    fields = dict(name=f"user{i}", handle=f"@user{i}", timestamp="2025-04-27T01:34:40.000Z",
+                  verified=i % 2 == 0, content=f"tweet {i}", likes="1.2K", followers="3M",
+                  tags=["#ETH"], tweet_id=str(i))
+    fields.update(kw)
+    return TweetRecord(**fields)
+
+
+def test_parse_count_handles_abbreviations():
+    assert parse_count("0") == 0
+    assert parse_count("") == 0
+    assert parse_count("1,234") == 1234
+    assert parse_count("1.2K") == 1200
+    assert parse_count("12.3k") == 12300
+    assert parse_count("3M") == 3_000_000
+    assert parse_count("n/a") == 0
+    assert parse_count(7) == 7
+
+
+def test_buffer_grows_in_chunks_and_round_trips_records():
+    buf = TweetBuffer(chunk_size=4)
+    for i in range(10):
+        assert buf.append(make(i)) == i
+    assert len(buf) == 10
+    rec = buf[9]
+    assert rec.name == "user9" and rec.likes == 1200 and rec.followers == 3_000_000
+    assert rec.tags == ["#ETH"]
+    buf.set(5, "ipfs_screenshot", "https://gateway.pinata.cloud/ipfs/Qm5")
+    assert buf.get(5, "ipfs_screenshot").endswith("Qm5")
+    assert list(buf.column("followers")) == [3_000_000] * 10
+
+
+def test_to_frame_matches_csv_layout():
+    buf = TweetBuffer(chunk_size=3)
+    for i in range(5):
+        buf.append(make(i))
+    df = buf.to_frame()
+    assert list(df.columns) == [
+        "Name", "Handle", "Timestamp", "Verified", "Content", "Comments", "Retweets",
+        "Likes", "Analytics", "Tags", "Mentions", "Profile Image", "Tweet Link",
+        "Tweet ID", "IPFS Screenshot",
+    ]
+    assert df["Tweet ID"].tolist() == [f"tweet_id:{i}" for i in range(5)]
+    assert df["Likes"].dtype == "int64"
+    assert df["Verified"].tolist() == [True, False, True, False, True]
+
+
+def test_single_chunk_column_is_a_view():
+    buf = TweetBuffer(chunk_size=8)
+    buf.append(make(0))
+    col = buf.column("likes")
+    col[0] = 99
+    assert buf.get(0, "likes") == 99
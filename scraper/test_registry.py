@@ -0,0 +1,90 @@
+import pytest
+
+import rpc
+import store
+from registry import RegistryMirror
+
+KEY = "0x" + "00" * 31 + "01"  # eth-tester's first account
+
+
+def _entry(cid, i=0):
+    return {"root_cid": cid, "size": 1000 + i, "deal_id": i, "title": f"dump {i}",
+            "description": "backfill", "price": 0, "preview": "[]"}
+
+
+@pytest.fixture
+def registry(dev_rpc, tmp_path, monkeypatch):
+    deployed = dev_rpc.deploy("artifacts/AIDatasetRegistry.sol/AIDatasetRegistry.json")
+    http = rpc.get_web3(urls=[dev_rpc.url])
+    contract = http.eth.contract(address=deployed.address, abi=deployed.abi)
+    owner = http.eth.account.from_key(KEY).address
+    monkeypatch.setattr(store, "_chain", (http, contract, owner, KEY))
+    monkeypatch.setattr(store, "_mirror", RegistryMirror(contract, path=str(tmp_path / "r.sqlite")))
+    return deployed, contract
+
+
+def test_mirror_syncs_incrementally(dev_rpc, registry, tmp_path):
+    registry, http = registry
+    me = dev_rpc.w3.eth.accounts[0]
+    for cid in ("QmA", "QmB"):
+        registry.functions.addDataset(cid, ("t", cid, 1, "d", 0, 0, "p")).transact({"from": me})
+    path = str(tmp_path / "m.sqlite")
+    mirror = RegistryMirror(http, path=path)
+    assert mirror.sync() == 2 and mirror.ids() == ["QmA", "QmB"]
+    assert mirror.unregistered(["QmB", "QmC", "QmC", "QmA"]) == ["QmC"]
+
+    registry.functions.addDataset("QmC", ("t", "QmC", 1, "d", 0, 0, "p")).transact({"from": me})
+    reopened = RegistryMirror(http, path=path)
+    assert reopened.sync() == 1 and "QmC" in reopened and len(reopened) == 3
+
+
+def test_register_many_in_constant_round_trips(dev_rpc, registry):
+    registry, _ = registry
+    me = dev_rpc.w3.eth.accounts[0]
+    registry.functions.addDataset("QmOld", ("t", "QmOld", 1, "d", 0, 0, "p")).transact({"from": me})
+    entries = [_entry(f"QmNew{i}", i) for i in range(6)] + [_entry("QmOld"), _entry("QmNew0")]
+
+    dev_rpc.requests.clear()
+    sent = store.register_many(entries)
+    # count, Multicall3 code check, the new IDs, estimates, sends
+    assert len(dev_rpc.requests) <= 5
+    assert dev_rpc.calls().count("eth_sendRawTransaction") == 6
+    assert sent["QmOld"] is None and all(sent[f"QmNew{i}"] for i in range(6))
+
+    assert registry.functions.getDatasetCount().call() == 7
+    title, cid, size, *_, exists = registry.functions.datasets("QmNew5").call()
+    assert (title, cid, size, exists) == ("dump 5", "QmNew5", 1005, True)
+
+    # a rerun finds everything in the mirror after one sync
+    dev_rpc.requests.clear()
+    assert not any(store.register_many(entries).values())
+    assert "eth_sendRawTransaction" not in dev_rpc.calls() and "eth_estimateGas" not in dev_rpc.calls()
+
+
+def test_send_many_drops_transactions_behind_a_rejected_nonce(registry, monkeypatch):
+    _, contract = registry
+    real = rpc.send_batch
+
+    def send_batch(w3, requests):
+        if requests[0][0] != "eth_sendRawTransaction":
+            return real(w3, requests)
+        # the node takes the first, refuses the second; the rest only queue behind the gap
+        return [{"result": "0x" + "aa" * 32}, {"error": {"message": "intrinsic gas too low"}},
+                {"result": "0x" + "bb" * 32}, {"result": "0x" + "cc" * 32}]
+
+    monkeypatch.setattr(rpc, "send_batch", send_batch)
+    datas = [contract.functions.getDatasetCount()._encode_transaction_data()] * 4
+    assert store.send_many(datas, [f"tx{i}" for i in range(4)], gas=100000) == \
+        ["0x" + "aa" * 32, None, None, None]
+
+
+def test_send_many_surfaces_a_failed_nonce_lookup(registry, monkeypatch):
+    _, contract = registry
+
+    def send_batch(w3, requests):
+        return [{"error": {"message": "header not found"}}, {"result": "0x10"}]
+
+    monkeypatch.setattr(rpc, "send_batch", send_batch)
+    data = contract.functions.getDatasetCount()._encode_transaction_data()
+    with pytest.raises(ConnectionError, match="eth_getTransactionCount failed: header not found"):
+        store.send_many([data], ["tx"], gas=100000)
@@ -0,0 +1,79 @@
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+from conftest import LocalGateway
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "crypto_pricing_agent"))
+import retrieve  # noqa: E402
+
+
+def _frame(n):
+    return pd.DataFrame({
+        "Tweet ID": range(n),
+        "Content": [f"tweet {i} " + os.urandom(100).hex() for i in range(n)],
+        "Deletion Likelihood": [i % 100 / 100 for i in range(n)],
+    })
+
+
+@pytest.mark.parametrize("car", [True, False])
+def test_preview_fetches_only_the_head_of_a_csv(tmp_path, car):
+    gw = LocalGateway(car=car)
+    try:
+        path = tmp_path / "dump.csv"
+        _frame(40_000).to_csv(path, index=False)
+        data = path.read_bytes()
+        cid = gw.add(data)
+
+        df, fetched = retrieve.preview(cid, rows=5, gateways=[gw.template])
+        assert list(df["Tweet ID"]) == [0, 1, 2, 3, 4]
+        assert len(data) > 8_000_000 and fetched < 1_000_000 and gw.sent < 1_000_000
+        ranged = [q for _, q, rng in gw.requests if "entity-bytes" in q or rng]
+        assert ranged  # never a full GET
+    finally:
+        gw.close()
+
+
+def test_preview_reads_selected_parquet_columns_from_raw_leaf_dag(tmp_path):
+    gw = LocalGateway()
+    try:
+        path = tmp_path / "dump.parquet"
+        _frame(40_000).to_parquet(path, index=False, row_group_size=10_000)
+        data = path.read_bytes()
+        cid = gw.add(data, raw_leaves=True)
+
+        df, fetched = retrieve.preview(cid, rows=3, columns=["Deletion Likelihood"], gateways=[gw.template])
+        assert list(df.columns) == ["Deletion Likelihood"] and list(df.iloc[:, 0]) == [0.0, 0.01, 0.02]
+        assert fetched < len(data) / 4
+    finally:
+        gw.close()
+
+
+def test_car_fetcher_rejects_tampered_blocks(tmp_path):
+    gw = LocalGateway()
+    try:
+        cid = gw.add(b"a,b\n" + b"1,2\n" * 100_000)
+        root, blocks, data = gw.dags[cid]
+        leaf = next(c for c in blocks if c != root)
+        blocks[leaf] = blocks[leaf][:-1] + b"!"
+        fetcher = retrieve.CarRangeFetcher(gw.template.format(cid), cid)
+        with pytest.raises(ValueError, match="does not match"):
+            fetcher(0, 100)
+    finally:
+        gw.close()
+
+
+def test_missing_car_block_is_reported_as_runtime_error():
+    class MissingBlock:
+        fetched = 0
+
+        def size(self):
+            return 1000
+
+        def __call__(self, start, end):
+            raise KeyError("bafkreimissing")
+
+    with pytest.raises(RuntimeError, match="bafkreimissing"):
+        retrieve.RemoteFile(MissingBlock()).read(10)
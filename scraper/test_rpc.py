@@ -0,0 +1,79 @@
+import json
+import os
+
+import pytest
+
+import metrics
+import rpc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEAD = "http://127.0.0.1:1"
+
+
+def _deploy_ftso(w3):
+    with open(os.path.join(ROOT, "artifacts/MockFTSO.sol/MockTwitterFTSO.json")) as f:
+        art = json.load(f)
+    acct = w3.eth.account.from_key("0x" + "00" * 31 + "01")
+    factory = w3.eth.contract(abi=art["abi"], bytecode=art["bytecode"])
+    tx = factory.constructor(acct.address).build_transaction({
+        "from": acct.address, "nonce": w3.eth.get_transaction_count(acct.address),
+        "gasPrice": w3.to_wei(30, "gwei"), "chainId": w3.eth.chain_id,
+    })
+    txh = w3.eth.send_raw_transaction(acct.sign_transaction(tx).raw_transaction)
+    address = w3.eth.wait_for_transaction_receipt(txh).contractAddress
+    return w3.eth.contract(address=address, abi=art["abi"])
+
+
+def test_endpoints_parse_comma_separated_urls(monkeypatch):
+    monkeypatch.setenv("TEST_RPC_URLS", " http://a:8545 , http://b:8545,")
+    assert rpc.endpoints("TEST_RPC_URLS") == ["http://a:8545", "http://b:8545"]
+    monkeypatch.delenv("TEST_RPC_URLS")
+    with pytest.raises(EnvironmentError):
+        rpc.endpoints("TEST_RPC_URLS")
+
+
+def test_clients_share_one_provider(dev_rpc):
+    w3 = rpc.get_web3(urls=[dev_rpc.url])
+    assert rpc.get_web3(urls=[dev_rpc.url]) is w3
+    assert rpc.get_async_web3(urls=[dev_rpc.url]).provider is w3.provider.provider
+
+
+def test_failover_skips_dead_and_failing_endpoints(dev_rpc):
+    w3 = rpc.get_web3(urls=[DEAD, dev_rpc.url])
+    before = metrics.REGISTRY.counters.get("rpc.failovers", 0)
+    assert w3.eth.block_number == 0
+    assert metrics.REGISTRY.counters["rpc.failovers"] > before
+    # the dead endpoint cools down and is tried last from now on
+    assert w3.provider.provider.endpoint_order()[-1] == DEAD
+
+    dev_rpc.fail = 1
+    with pytest.raises(ConnectionError):
+        rpc.get_web3(urls=[dev_rpc.url]).eth.chain_id
+
+
+def test_client_errors_are_raised_without_failover(dev_rpc):
+    import aiohttp
+
+    w3 = rpc.get_web3(urls=[dev_rpc.url, DEAD])
+    before = metrics.REGISTRY.counters.get("rpc.failovers", 0)
+    dev_rpc.fail, dev_rpc.fail_status = 1, 401
+    with pytest.raises(aiohttp.ClientResponseError) as e:
+        w3.eth.chain_id
+    assert e.value.status == 401
+    assert metrics.REGISTRY.counters.get("rpc.failovers", 0) == before
+    assert w3.provider.provider.endpoint_order() == [dev_rpc.url, DEAD]  # nothing marked failed
+
+
+def test_batch_call_sends_one_json_rpc_array(dev_rpc):
+    w3 = rpc.get_web3(urls=[dev_rpc.url])
+    ftso = _deploy_ftso(w3)
+    dev_rpc.requests.clear()
+    score, keeper = rpc.batch_call([ftso.functions.tweetScore(), ftso.functions.keeper()])
+    assert score == 0 and keeper == w3.eth.account.from_key("0x" + "00" * 31 + "01").address
+    assert len(dev_rpc.requests) == 1 and isinstance(dev_rpc.requests[0], list)
+
+
+def test_async_reads_run_concurrently_from_sync_code(dev_rpc):
+    aw3 = rpc.get_async_web3(urls=[dev_rpc.url])
+    block, chain_id = rpc.gather(aw3.eth.get_block(0), aw3.eth.chain_id)
+    assert block["number"] == 0 and chain_id == rpc.get_web3(urls=[dev_rpc.url]).eth.chain_id
@@ -0,0 +1,124 @@
+import json
+import random
+import threading
+import time
+
+import pytest
+
+from scheduler import Job, Scheduler, load_jobs, next_run_time
+
+
+class FakeWorker:
+    created = 0
+    closed = 0
+    lock = threading.Lock()
+
+    def __init__(self, delay=0.02, fail_on=(), break_on=()):
+        with FakeWorker.lock:
+            FakeWorker.created += 1
+        self.delay = delay
+        self.fail_on = fail_on
+        self.break_on = break_on
+        self.broken = False
+        self.ran = []
+
+    def run(self, job):
+        self.ran.append(job.name)
+        time.sleep(self.delay)
+        if job.name in self.break_on:
+            self.broken = True
+        if job.name in self.fail_on:
+            raise RuntimeError("scrape failed")
+
+    def close(self):
+        with FakeWorker.lock:
+            FakeWorker.closed += 1
+
+
+@pytest.fixture(autouse=True)
+def reset_counts():
+    FakeWorker.created = FakeWorker.closed = 0
+
+
+def test_load_jobs_merges_defaults(tmp_path):
+    path = tmp_path / "jobs.json"
+    path.write_text(json.dumps({
+        "defaults": {"interval": 60, "jitter": 5, "tweets": 10},
+        "jobs": [{"name": "BTC", "query": "bitcoin"},
+                 {"name": "ETH", "query": "ethereum", "interval": 30, "tweets": 20}],
+    }))
+    btc, eth = load_jobs(str(path))
+    assert (btc.name, btc.interval, btc.jitter) == ("BTC", 60, 5)
+    assert btc.params == {"tweets": 10, "query": "bitcoin"}
+    assert (eth.interval, eth.params["tweets"]) == (30, 20)
+
+
+def test_load_jobs_rejects_duplicate_names(tmp_path):
+    path = tmp_path / "jobs.json"
+    path.write_text(json.dumps({"jobs": [{"name": "BTC"}, {"name": "BTC"}]}))
+    with pytest.raises(ValueError):
+        load_jobs(str(path))
+
+
+def test_next_run_keeps_cadence_with_bounded_jitter():
+    job = Job("BTC", {}, interval=100, jitter=10)
+    rng = random.Random(1)
+    for _ in range(100):
+        due = next_run_time(job, started=1000, now=1030, rng=rng)
+        assert 1100 <= due <= 1110
+    # a run that overran its interval is not fired back-to-back from the past
+    due = next_run_time(job, started=1000, now=1500, rng=rng)
+    assert 1500 <= due <= 1510
+
+
+def test_concurrency_limit_and_worker_reuse():
+    jobs = [Job(f"coin{i}", {}, interval=0.05, jitter=0) for i in range(5)]
+    sched = Scheduler(jobs, lambda: FakeWorker(delay=0.03), concurrency=2)
+    sched.run(max_runs=3)
+    assert all(j.runs == 3 for j in jobs)
+    assert sched.peak_active <= 2
+    # one warm worker per slot, reused for all 15 runs
+    assert FakeWorker.created <= 2
+    assert FakeWorker.closed == FakeWorker.created
+
+
+def test_job_never_overlaps_itself():
+    running = set()
+    overlaps = []
+
+    class Tracking(FakeWorker):
+        def run(self, job):
+            if job.name in running:
+                overlaps.append(job.name)
+            running.add(job.name)
+            time.sleep(0.05)
+            running.discard(job.name)
+
+    job = Job("BTC", {}, interval=0.01, jitter=0)
+    Scheduler([job], Tracking, concurrency=4).run(max_runs=4)
+    assert job.runs == 4
+    assert overlaps == []
+
+
+def test_failures_are_counted_and_broken_workers_rebuilt():
+    jobs = [Job("ok", {}, interval=0.02, jitter=0),
+            Job("bad", {}, interval=0.02, jitter=0)]
+    sched = Scheduler(jobs, lambda: FakeWorker(fail_on=("bad",), break_on=("bad",)), concurrency=1)
+    sched.run(max_runs=2)
+    status = {row["job"]: row for row in sched.status()}
+    assert status["ok"]["runs"] == 2 and status["ok"]["failures"] == 0
+    assert status["bad"]["failures"] == 2
+    assert "scrape failed" in status["bad"]["last_error"]
+    assert FakeWorker.created >= 2  # rebuilt after each broken run
+
+
+def test_stop_event_ends_the_loop():
+    stop = threading.Event()
+    job = Job("BTC", {}, interval=0.01, jitter=0)
+    t = threading.Thread(target=Scheduler([job], FakeWorker).run, args=(stop,))
+    t.start()
+    time.sleep(0.2)
+    stop.set()
+    t.join(timeout=3)
+    assert not t.is_alive()
+    assert job.runs >= 1
@@ -0,0 +1,84 @@
+import os
+
+import numpy as np
+import pytest
+
+from scorer import CascadeScorer, LocalScorer, Scorer, featurize, get_scorer, load_history
+
+RISKY = ["this token is a scam rug pull", "devs rugged, total scam, exit scam",
+         "scam alert rug pull incoming", "rug pull confirmed scam devs gone"]
+SAFE = ["gm builders shipping on ethereum", "great ethereum builders gm",
+        "gm frens ethereum builders keep shipping", "shipping great stuff gm"]
+
+
+def trained():
+    return LocalScorer(n_features=1 << 12).fit(RISKY + SAFE, [0.9] * 4 + [0.0] * 4)
+
+
+def test_featurize_is_stable_csr():
+    indptr, indices, values = featurize(["a b", "", "a"], n_features=64)
+    assert indptr.tolist() == [0, 3, 3, 4]  # "a", "b", "a b" | nothing | "a"
+    assert indices[0] == indices[3]
+    assert np.all(indices < 64)
+
+
+def test_local_model_learns_soft_labels():
+    model = trained()
+    scores, conf = model.predict(["scam rug pull", "gm builders", ""])
+    assert scores[0] > 0.7 and scores[1] < 0.2
+    assert conf[0] > 0.3 and conf[1] > 0.5
+    assert conf[2] == 0.0  # nothing known about an empty tweet
+
+
+def test_unfamiliar_text_has_low_confidence():
+    _, conf = trained().predict(["quantum zebra parliament"])
+    assert conf[0] == 0.0
+
+
+def test_save_load_round_trip(tmp_path):
+    model = trained()
+    path = model.save(str(tmp_path / "m.npz"))
+    again = LocalScorer.load(path)
+    texts = RISKY + SAFE + ["unseen words"]
+    np.testing.assert_allclose(again.predict(texts)[0], model.predict(texts)[0])
+
+
+class Recorder(Scorer):
+    name = "recorder"
+
+    def __init__(self):
+        self.seen = []
+
+    def score_many(self, texts):
+        self.seen += list(texts)
+        return np.full(len(texts), 0.5), np.ones(len(texts)), ["llm"] * len(texts)
+
+
+def test_cascade_sends_only_unsure_tweets_to_fallback():
+    fallback = Recorder()
+    cascade = CascadeScorer(trained(), fallback, min_confidence=0.3)
+    scores, conf, analyses = cascade.score_many(["scam rug pull", "quantum zebra", "gm builders"])
+    assert fallback.seen == ["quantum zebra"]
+    assert scores[1] == 0.5 and analyses[1] == "llm"
+    assert analyses[0].startswith("local model")
+
+
+def test_get_scorer_auto_falls_back_to_llm_without_model(tmp_path):
+    assert get_scorer("auto", model_path=str(tmp_path / "missing.npz")).name == "llm"
+    path = trained().save(str(tmp_path / "m.npz"))
+    assert get_scorer("auto", model_path=path).name == "cascade"
+    assert get_scorer("local", model_path=path).name == "local"
+    with pytest.raises(ValueError):
+        get_scorer("nope", model_path=path)
+
+
+def test_load_history_reads_sample_cars():
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    texts, labels = load_history([os.path.join(root, "tweets")])
+    assert len(texts) == len(labels) > 0
+    assert ((labels >= 0) & (labels <= 1)).all()
+
+
+def test_scorer_base_is_abstract():
+    with pytest.raises(TypeError):
+        Scorer()
@@ -0,0 +1,102 @@
+import store
+
+
+class Response:
+    def __init__(self, body=None):
+        self.body = body
+
+    def json(self):
+        return self.body
+
+    def raise_for_status(self):
+        pass
+
+
+def test_upload_car_retries_a_failed_shard_and_lists_all_shards(tmp_path, monkeypatch):
+    shards = []
+    for i in range(3):
+        path = tmp_path / f"dump.{i}.car"
+        path.write_bytes(b"x" * (10 + i))
+        shards.append((f"bagshard{i}", str(path), 10 + i))
+    posts, puts, failures = [], [], {"bagshard1": 1}
+
+    def post(url, headers, json):
+        posts.append(json["tasks"][0])
+        verb, _, args = json["tasks"][0]
+        if verb == "store/add":
+            cid = args["link"]["/"]
+            if failures.get(cid):
+                failures[cid] -= 1
+                return Response([{"p": {"out": {"error": {"message": "busy"}}}}])
+            return Response([{"p": {"out": {"ok": {"url": f"https://put/{cid}"}}}}])
+        return Response()
+
+    monkeypatch.setattr(store, "_env", lambda name: "did:key:space")
+    monkeypatch.setattr(store, "get_store_headers", lambda: {"Authorization": "t"})
+    monkeypatch.setattr(store.time, "sleep", lambda s: None)
+    monkeypatch.setattr(store.requests, "post", post)
+    monkeypatch.setattr(store.requests, "put", lambda url, headers, data: puts.append(url) or Response())
+
+    store.upload_car("bafyroot", shards)
+    assert sorted(puts) == [f"https://put/bagshard{i}" for i in range(3)]
+    assert [t[0] for t in posts].count("store/add") == 4  # bagshard1 twice
+    verb, _, args = posts[-1]
+    assert verb == "upload/add"
+    assert args == {"root": {"/": "bafyroot"}, "shards": [{"/": f"bagshard{i}"} for i in range(3)]}
+
+
+def test_upload_car_only_stores_new_shards_but_lists_reused_ones(monkeypatch, tmp_path):
+    import blockindex
+
+    path = tmp_path / "dump.car"
+    path.write_bytes(b"x" * 10)
+    posts, puts = [], []
+
+    def post(url, headers, json):
+        posts.append(json["tasks"][0])
+        if json["tasks"][0][0] == "store/add":
+            return Response([{"p": {"out": {"ok": {"url": "https://put/new"}}}}])
+        return Response()
+
+    monkeypatch.setenv("CAR_CHUNKER", "fastcdc")
+    monkeypatch.setattr(blockindex, "_index", blockindex.BlockIndex(":memory:"))
+    monkeypatch.setattr(store, "_env", lambda name: "did:key:space")
+    monkeypatch.setattr(store, "get_store_headers", lambda: {"Authorization": "t"})
+    monkeypatch.setattr(store.requests, "post", post)
+    monkeypatch.setattr(store.requests, "put", lambda url, headers, data: puts.append(url) or Response())
+
+    # the reused CAR's file is long gone; it is never opened
+    store.upload_car("bafyroot", [("bagold", None, 99), ("bagnew", str(path), 10)])
+    assert puts == ["https://put/new"]
+    assert [(t[0], t[2].get("link")) for t in posts[:-1]] == [("store/add", {"/": "bagnew"})]
+    assert posts[-1][2]["shards"] == [{"/": "bagold"}, {"/": "bagnew"}]
+
+
+def test_fastcdc_car_leaves_out_blocks_already_stored(tmp_path, monkeypatch):
+    import blockindex
+    import car
+
+    monkeypatch.setenv("CAR_CHUNKER", "fastcdc")
+    monkeypatch.setenv("CDC_AVG_SIZE", "1024")
+    monkeypatch.setattr(blockindex, "_index", blockindex.BlockIndex(str(tmp_path / "idx.sqlite")))
+    header = "Tweet ID,Content\n"
+    rows = [f"{1000 + i},tweet number {i} {'x' * (i % 50)}\n" for i in range(2000)]
+    first = tmp_path / "run1.csv"
+    first.write_text(header + "".join(rows[:1500]))  # datasets are written in Tweet ID order
+    second = tmp_path / "run2.csv"
+    second.write_text(header + "".join(rows[500:]))  # overlaps run1 on 1000 rows
+
+    _, shards1 = store.make_car(str(first))
+    blockindex.get_index().mark_stored([cid for cid, *_ in shards1])  # as upload_car does
+    root2, shards2 = store.make_car(str(second))
+
+    old_cid, old_path, old_size = shards1[0]
+    assert (old_cid, None, old_size) in shards2  # the earlier CAR is listed for the shared blocks, by CID only
+    new = store.new_shards(shards2)
+    assert len(new) == len(shards2) - 1
+    assert sum(size for *_, size in new) < 0.6 * second.stat().st_size
+    blocks = dict(car.read_car(old_path)[1])
+    for _, path, _ in new:
+        blocks.update(car.read_car(path)[1])
+    data = car.file_bytes(car.cid_from_str(root2), blocks).decode()
+    assert data.splitlines()[1].startswith("1500,") and len(data.splitlines()) == 1501
@@ -6,6 +6,8 @@ from selenium.common.exceptions import (
 from selenium.webdriver.chrome.webdriver import WebDriver
 from selenium.webdriver.common.action_chains import ActionChains
 
+from record import TweetRecord
+
 
 class Tweet:
     def __init__(
@@ -17,7 +19,7 @@ class Tweet:
     ) -> None:
         self.card = card
         self.error = False
-        self.tweet = None
+        self.record = None
 
         try:
             self.user = card.find_element(
@@ -253,25 +255,25 @@ class Tweet:
             if ext_hover_card and ext_following and ext_followers:
                 actions.reset_actions()
 
-        self.tweet = (
-            self.user,
-            self.handle,
-            self.date_time,
-            self.verified,
-            self.content,
-            self.reply_cnt,
-            self.retweet_cnt,
-            self.like_cnt,
-            self.analytics_cnt,
-            self.tags,
-            self.mentions,
-            self.emojis,
-            self.profile_img,
-            self.tweet_link,
-            self.tweet_id,
-            self.user_id,
-            self.following_cnt,
-            self.followers_cnt,
+        self.record = TweetRecord(
+            name=self.user,
+            handle=self.handle,
+            timestamp=self.date_time,
+            verified=self.verified,
+            content=self.content,
+            comments=self.reply_cnt,
+            retweets=self.retweet_cnt,
+            likes=self.like_cnt,
+            analytics=self.analytics_cnt,
+            tags=self.tags,
+            mentions=self.mentions,
+            emojis=self.emojis,
+            profile_image=self.profile_img,
+            tweet_link=self.tweet_link,
+            tweet_id=self.tweet_id,
+            user_id=self.user_id,
+            following=self.following_cnt,
+            followers=self.followers_cnt,
         )
 
         pass
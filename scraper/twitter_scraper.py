@@ -1,12 +1,16 @@
 import os
 import sys
-import pandas as pd
 from progress import Progress
 from scroller import Scroller
 from tweet import Tweet
-from ipfs_screenshot import screenshot_and_pin
+from record import TweetRecord, TweetBuffer
+import metrics
+from pipeline import Pipeline, stage_batch
+from dedup import NearDupIndex
+from ipfs_screenshot import screenshot_element, pin_file_to_ipfs
 
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 from fake_headers import Headers
 from time import sleep
 
@@ -25,19 +29,14 @@ from selenium.webdriver.firefox.options import Options as FirefoxOptions
 from selenium.webdriver.firefox.service import Service as FirefoxService
 from selenium.webdriver.support.ui import WebDriverWait
 
-from webdriver_manager.chrome import ChromeDriverManager
-from webdriver_manager.firefox import GeckoDriverManager
-
-# NEW: Import AI analysis tool for tweet deletion likelihood evaluation
-from ai_analysis import analyze_tweet
-
-# NEW: Import FTSO & price helpers
-from ftso_push import push_aggregated_score
-from ftso_price import get_price_for
-from ai_coin_identifier import identify_coin
+# The LLM (ai_analysis, ai_coin_identifier), chain (ftso_push, ftso_price),
+# pandas-backed output (analytics, dataset_io) and webdriver_manager modules
+# are imported where they are first used, so `--scrape-only` / `--dry-run`
+# start quickly and need no OpenAI or blockchain configuration.
 
 import logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s [%(levelname)s] %(message)s')
+logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO").upper(),
+                    format='%(asctime)s [%(levelname)s] %(message)s')
 
 TWITTER_LOGIN_URL = "https://twitter.com/i/flow/login"
 
@@ -45,7 +44,8 @@ class Twitter_Scraper:
     def __init__(self, mail, username, password, headlessState, max_tweets=50,
                  scrape_username=None, scrape_hashtag=None, scrape_query=None,
                  scrape_bookmarks=False, scrape_poster_details=False,
-                 scrape_latest=True, scrape_top=False, proxy=None):
+                 scrape_latest=True, scrape_top=False, proxy=None, journal=None,
+                 output_format="csv", analyze=True, publish=True):
         print("Initializing Twitter Scraper...")
         logging.info("Initializing Twitter Scraper...")
         self.mail = mail
@@ -53,8 +53,26 @@ class Twitter_Scraper:
         self.password = password
         self.headlessState = headlessState
         self.interrupted = False
+        self.journal = journal
+        self.output_format = output_format
+        # FTSO feed the aggregated score goes to: name (job/coin) and contract
+        # address; None for both is the single TWITTER_FTSO_ADDR feed
+        self.feed = None
+        self.ftso_address = None
+        # analyze=False: no LLM scoring/classification; publish=False: nothing
+        # is pinned, pushed or registered (the dataset is only written locally)
+        self.analyze = analyze
+        self.publish = publish
+        self.completed = {}
         self.tweet_ids = set()
-        self.data = []
+        self.tweet_links = set()
+        self.data = TweetBuffer()
+        self.clusters = NearDupIndex()
+        self.scores = {}
+        self.analyses = {}
+        self.coins = {}
+        self.pipeline = None
+        self.scorer = None
         self.tweet_cards = []
         self.scraper_details = {
             "type": None,
@@ -78,8 +96,14 @@ class Twitter_Scraper:
                         scrape_bookmarks=False, scrape_query=None, scrape_latest=True,
                         scrape_top=False, scrape_poster_details=False):
         logging.info("Configuring scraper parameters...")
+        self.completed = {}
         self.tweet_ids = set()
-        self.data = []
+        self.tweet_links = set()
+        self.data = TweetBuffer()
+        self.clusters = NearDupIndex()
+        self.scores = {}
+        self.analyses = {}
+        self.coins = {}
         self.tweet_cards = []
         self.max_tweets = max_tweets
         self.progress = Progress(0, max_tweets)
@@ -136,6 +160,7 @@ class Twitter_Scraper:
             return driver
         except WebDriverException:
             try:
+                from webdriver_manager.firefox import GeckoDriverManager
                 logging.info("Downloading FirefoxDriver...")
                 path = GeckoDriverManager().install()
                 service = FirefoxService(executable_path=path)
@@ -149,6 +174,7 @@ class Twitter_Scraper:
                 logging.error(f"Error setting up WebDriver: {e}")
                 sys.exit(1)
 
+    @metrics.timed("browser.login")
     def login(self):
         print("Logging in to Twitter...")
         logging.info("Logging in to Twitter...")
@@ -285,7 +311,8 @@ class Twitter_Scraper:
                              scrape_query, scrape_latest, scrape_top, scrape_poster_details)
         if router is None:
             router = self.router
-        router()
+        with metrics.timed("browser.navigate"):
+            router()
         d = self.scraper_details
         if d["type"] == "Username":
             print(f"Scraping Tweets from @{d['username']}...")
@@ -306,8 +333,16 @@ class Twitter_Scraper:
         except NoSuchElementException:
             pass
 
-        self.progress.print_progress(0, False, 0, no_tweets_limit)
+        self._start_pipeline()
+        self._restore_journal()
+        if "scrape" in self.completed:
+            print(f"Scraping already complete in journal ({len(self.data)} tweets)")
+            return
+        if len(self.data) >= self.max_tweets and not no_tweets_limit:
+            self.scroller.scrolling = False
+        self.progress.print_progress(len(self.data), False, 0, no_tweets_limit)
         refresh_count = added = empty = retry = 0
+        failed = False
         while self.scroller.scrolling:
             try:
                 self.get_tweet_cards()
@@ -319,21 +354,30 @@ class Twitter_Scraper:
                             self.tweet_ids.add(cid)
                             if not d["poster_details"]:
                                 self.driver.execute_script("arguments[0].scrollIntoView();", card)
-                            tw = Tweet(card=card, driver=self.driver,
-                                       actions=self.actions,
-                                       scrape_poster_details=d["poster_details"])
-                            if tw and not tw.error and tw.tweet and not tw.is_ad:
-                                try:
-                                    ipfs = screenshot_and_pin(card)
-                                    ipfs_url = f"https://gateway.pinata.cloud/ipfs/{ipfs}"
-                                    print(f"Tweet screenshot pinned to IPFS: {ipfs_url}")
-                                except Exception as e:
-                                    print(f"Error pinning tweet screenshot: {e}")
-                                    ipfs_url = ""
-                                row = list(tw.tweet) + [ipfs_url]
-                                self.data.append(tuple(row))
+                            with metrics.timed("browser.extract_tweet"):
+                                tw = Tweet(card=card, driver=self.driver,
+                                           actions=self.actions,
+                                           scrape_poster_details=d["poster_details"])
+                            if tw and not tw.error and tw.record and not tw.is_ad:
+                                if tw.tweet_link and tw.tweet_link in self.tweet_links:
+                                    continue
+                                self.tweet_links.add(tw.tweet_link)
+                                # Only the capture needs the live card; pinning,
+                                # scoring and classification run in the pipeline.
+                                shot = None
+                                if self.publish:
+                                    try:
+                                        shot = screenshot_element(card)
+                                    except Exception as e:
+                                        print(f"Error capturing tweet screenshot: {e}")
+                                idx = self.data.append(tw.record)
+                                self.clusters.add(idx, tw.record.content)
+                                if self.journal:
+                                    self.journal.record("tweet", idx=idx, row=tw.record.to_dict())
+                                self.pipeline.put((idx, shot))
                                 added += 1
-                                print(f"Tweet scraped: {tw.tweet}")
+                                metrics.inc("tweets.scraped")
+                                logging.debug(f"Tweet scraped: {tw.record}")
                                 self.progress.print_progress(len(self.data), False, 0, no_tweets_limit)
                                 if len(self.data) >= self.max_tweets and not no_tweets_limit:
                                     self.scroller.scrolling = False
@@ -369,11 +413,15 @@ class Twitter_Scraper:
             except KeyboardInterrupt:
                 print("\nKeyboard Interrupt")
                 self.interrupted = True
+                failed = True
                 break
             except Exception as e:
                 print(f"\nError scraping tweets: {e}")
+                failed = True
                 break
 
+        if not failed:
+            self._mark_step("scrape", len(self.data))
         print("")
         if len(self.data) >= self.max_tweets or no_tweets_limit:
             print("Scraping Complete")
@@ -382,7 +430,189 @@ class Twitter_Scraper:
         if not no_tweets_limit:
             print(f"Tweets: {len(self.data)} out of {self.max_tweets}")
 
-    def save_to_csv(self):
+    # ------------------------- Streaming pipeline -------------------------
+
+    def _start_pipeline(self):
+        """Pin, score and classify tweets on worker threads while scrolling continues."""
+        self.pipeline = Pipeline().add("pin", self._pin_stage)
+        if self.analyze:
+            self._get_scorer()
+            self.pipeline.add("score", self._score_stage, batch=stage_batch("score"))
+            self.pipeline.add("classify", self._classify_stage, batch=stage_batch("classify"))
+        self.pipeline.start()
+
+    def _pin_stage(self, item):
+        idx, shot = item
+        if shot:
+            try:
+                ipfs = pin_file_to_ipfs(shot)
+                ipfs_url = f"https://gateway.pinata.cloud/ipfs/{ipfs}"
+                self.data.set(idx, "ipfs_screenshot", ipfs_url)
+                if self.journal:
+                    self.journal.record("pin", idx=idx, url=ipfs_url)
+                logging.debug(f"Tweet screenshot pinned to IPFS: {ipfs_url}")
+            except Exception as e:
+                print(f"Error pinning tweet screenshot: {e}")
+            finally:
+                os.remove(shot)
+        return idx
+
+    def _get_scorer(self):
+        if self.scorer is None:
+            from scorer import get_scorer
+            self.scorer = get_scorer()
+            logging.info(f"Scoring tweets with the '{self.scorer.name}' scorer")
+        return self.scorer
+
+    def _score_stage(self, idxs):
+        # near-duplicates wait for their representative's score (see _drain_pipeline)
+        todo = [i for i in idxs if i not in self.scores and self.clusters.is_representative(i)]
+        if todo:
+            self._score_rows(todo)
+        return idxs
+
+    def _score_rows(self, idxs):
+        """Score rows in one scorer call (the local model is vectorized)."""
+        contents = [self.data.get(i, "content") for i in idxs]
+        todo = [k for k, c in enumerate(contents) if c.strip()]
+        results = {k: (0.0, "No content provided.") for k in range(len(idxs))}
+        if todo:
+            scores, _, analyses = self._get_scorer().score_many([contents[k] for k in todo])
+            for k, score, analysis in zip(todo, scores, analyses):
+                results[k] = (float(score), analysis)
+        for k, idx in enumerate(idxs):
+            score, analysis = results[k]
+            logging.debug(f"Tweet analysis: {analysis}")
+            self.scores[idx] = score
+            self.analyses[idx] = analysis
+            if self.journal:
+                self.journal.record("score", idx=idx, score=score, analysis=analysis)
+
+    def _classify_stage(self, idxs):
+        self._classify_rows([i for i in idxs
+                             if i not in self.coins and self.clusters.is_representative(i)])
+        return None
+
+    def _classify_rows(self, idxs):
+        """Label rows with one batched identify_coins call (results stay aligned)."""
+        if not idxs:
+            return
+        from ai_coin_identifier import identify_coins
+        coins = identify_coins([self.data.get(i, "content") for i in idxs])
+        for idx, coin in zip(idxs, coins):
+            self.coins[idx] = coin
+            if self.journal:
+                self.journal.record("coin", idx=idx, coin=coin)
+
+    # --------------------------- Resume journal ---------------------------
+
+    def _restore_journal(self):
+        """Reload rows, scores and finished steps from the journal of an earlier run."""
+        if self.journal is None:
+            return
+        state = self.journal.state
+        if not state.rows and not state.steps:
+            return
+        for row in state.ordered_rows():
+            idx = self.data.append(TweetRecord.from_dict(row))
+            self.clusters.add(idx, row.get("content", ""))
+            if row.get("tweet_link"):
+                self.tweet_links.add(row["tweet_link"])
+        self.scores = dict(state.scores)
+        self.analyses = dict(state.analyses)
+        self.coins = dict(state.coins)
+        self.completed = dict(state.steps)
+        print(f"Resumed {len(self.data)} tweets, {len(self.scores)} scores and "
+              f"{len(self.completed)} completed steps from {self.journal.path}")
+        # rows captured but never scored/classified go back through the pipeline
+        for idx in range(len(self.data) if self.analyze else 0):
+            if idx not in self.scores or idx not in self.coins:
+                self.pipeline.put((idx, None))
+
+    def _mark_step(self, name, result=None):
+        self.completed[name] = result
+        if self.journal:
+            self.journal.record("step", name=name, result=result)
+
+    def _step(self, name, fn, *args, **kwargs):
+        """Run one publishing step unless the journal says it already finished."""
+        if name in self.completed:
+            logging.info(f"↩️ Skipping '{name}' (already done in journal)")
+            return self.completed[name]
+        result = fn(*args, **kwargs)
+        self._mark_step(name, result)
+        return result
+
+    def _drain_pipeline(self):
+        """Wait for in-flight tweets, then process anything the pipeline missed inline."""
+        if self.pipeline is not None:
+            print("Waiting for scoring pipeline to drain...")
+            self.pipeline.close()
+            self.pipeline = None
+        if not self.analyze:
+            return
+        rep_of = self.clusters.cluster_of
+        missing = [idx for idx in range(len(self.data))
+                   if idx not in self.scores and rep_of.get(idx, idx) == idx]
+        if missing:
+            self._score_rows(missing)
+        self._classify_rows([idx for idx in range(len(self.data))
+                             if rep_of.get(idx, idx) == idx and idx not in self.coins])
+        self._share_cluster_results()
+
+    def _share_cluster_results(self):
+        """Copy each representative's score and coin to its near-duplicates."""
+        shared = 0
+        for idx in range(len(self.data)):
+            rep = self.clusters.cluster_of.get(idx, idx)
+            if rep == idx:
+                continue
+            if idx not in self.scores:
+                self.scores[idx] = self.scores[rep]
+                self.analyses[idx] = f"[cluster {rep}] {self.analyses.get(rep, '')}"
+                if self.journal:
+                    self.journal.record("score", idx=idx, score=self.scores[idx],
+                                        analysis=self.analyses[idx])
+                shared += 1
+            if idx not in self.coins:
+                self.coins[idx] = self.coins[rep]
+                if self.journal:
+                    self.journal.record("coin", idx=idx, coin=self.coins[idx])
+        if shared:
+            logging.info(f"Reused cluster scores for {shared} near-duplicate tweets")
+
+    # ------------------------------ Output -------------------------------
+
+    def save_to_csv(self, publish_dataset=True):
+        from dataset_io import read_dataset
+        from merkle import dataset_root
+        self._drain_pipeline()
+        if not self.analyze:
+            # scrape-only: raw tweets, no scores to aggregate or publish
+            self._step("dataset", lambda: self._write_dataset(None)[0])
+            return
+        deletion_scores = [self.scores[i] for i in range(len(self.data))]
+
+        # Score publishing only needs the scores, so it overlaps with writing
+        # the dataset and with the Filecoin pipeline below.
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            scores_job = pool.submit(self._publish_scores, deletion_scores)
+            if "dataset" in self.completed:
+                path = self.completed["dataset"]
+                df = read_dataset(path)
+                merkle_root = dataset_root(path)  # from <path>.merkle.json, written with the dataset
+                print(f"Dataset already saved: {path}")
+            else:
+                path, df, merkle_root = self._write_dataset(deletion_scores)
+                self._mark_step("dataset", path)
+            if publish_dataset and self.publish:
+                pool.submit(self._publish_dataset, path, df, merkle_root).result()
+            scores_job.result()
+
+    def _write_dataset(self, deletion_scores):
+        import pandas as pd
+        from dataset_io import sort_rows, write_dataset
+        from merkle import dataset_root
         print("Saving Tweets to CSV...")
         now = datetime.now()
         folder = "./tweets/"
@@ -390,96 +620,99 @@ class Twitter_Scraper:
             os.makedirs(folder)
             print(f"Created Folder: {folder}")
 
-        data = {
-            "Name": [t[0] for t in self.data],
-            "Handle": [t[1] for t in self.data],
-            "Timestamp": [t[2] for t in self.data],
-            "Verified": [t[3] for t in self.data],
-            "Content": [t[4] for t in self.data],
-            "Comments": [t[5] for t in self.data],
-            "Retweets": [t[6] for t in self.data],
-            "Likes": [t[7] for t in self.data],
-            "Analytics": [t[8] for t in self.data],
-            "Tags": [t[9] for t in self.data],
-            "Mentions": [t[10] for t in self.data],
-            "Profile Image": [t[12] for t in self.data],
-            "Tweet Link": [t[13] for t in self.data],
-            "Tweet ID": [f"tweet_id:{t[14]}" for t in self.data],
-            "IPFS Screenshot": [t[-1] for t in self.data],
-        }
-
-        # Analyze tweets for deletion likelihood
-        deletion_scores = []
-        print("Analyzing tweets for deletion likelihood (this may take a while)...")
-        for t in self.data:
-            content = t[4]
-            if not content.strip():
-                score = 0.0
-                analysis = "No content provided."
-            else:
-                score, analysis = analyze_tweet(content)
-            print(f"Tweet analysis: {analysis}")
-            deletion_scores.append(score)
-        data["Deletion Likelihood"] = deletion_scores
-
         # Build DataFrame & save
-        df = pd.DataFrame(data)
+        df = self.data.to_frame()
+        df["Cluster ID"] = self._cluster_ids()
+        if deletion_scores is not None:
+            df["Deletion Likelihood"] = deletion_scores
+            df["Coin"] = [self.coins.get(i, "") for i in range(len(self.data))]
+        # sorted once here, so the local file, the pin, the CAR and the Merkle
+        # root all cover the same bytes
+        df = sort_rows(df)
         timestamp = now.strftime("%Y-%m-%d_%H-%M-%S")
-        path = f"{folder}{timestamp}_tweets_1-{len(self.data)}.csv"
+        base = f"{folder}{timestamp}_tweets_1-{len(self.data)}"
         pd.set_option("display.max_colwidth", None)
-        df.to_csv(path, index=False, encoding="utf-8")
+        path = write_dataset(df, base, "csv")
         print(f"CSV Saved: {path}")
-
+        # the CSV stays as the local copy; the published file is in the chosen format
+        if self.output_format != "csv":
+            path = write_dataset(df, base, self.output_format)
+            print(f"{self.output_format.capitalize()} Saved: {path}")
+        root = dataset_root(path)
+        print(f"Merkle root: {root}")
+        return path, df, root
+
+    def _cluster_ids(self):
+        return [self.clusters.cluster_of.get(i, i) for i in range(len(self.data))]
+
+    def _publish_dataset(self, path, df, merkle_root):
         # --- Filecoin pipeline ---
         import store
+        from dataset_io import preview_json
         logging.info("➡️ Beginning Filecoin pipeline…")
-        root_cid = store.pin_to_pinata(path)
-        root, car_cid, car_path, car_size = store.make_car(path)
-        store.upload_car(root, car_cid, car_path, car_size)
-        deal_resp = store.create_deal(root, car_cid)
+        root_cid = self._step("pinata", store.pin_to_pinata, path)
+        root, shards = self._step("car", store.make_car, path)
+        self._step("upload", store.upload_car, root, shards)
+        car_size = sum(size for *_, size in shards)
+        # one deal per new CAR (reused ones already have theirs); the first one's ID goes on chain
+        deals = [self._step("deal" if n == 0 else f"deal:{car_cid}", store.create_deal, root, car_cid)
+                 for n, (car_cid, *_) in enumerate(store.new_shards(shards))]
         try:
-            deal_id = deal_resp[0]["p"]["out"]["dealId"]
+            deal_id = deals[0][0]["p"]["out"]["dealId"]
         except:
             logging.warning("⚠️ Could not parse dealId; defaulting to 0")
             deal_id = 0
         title = f"Twitter dump {os.path.basename(path)}"
-        desc = f"{len(self.data)} tweets @ {datetime.now().isoformat()}"
+        desc = f"{len(df)} tweets @ {datetime.now().isoformat()}"
         price = int(os.getenv("DATASET_PRICE_WEI", "0"))
-        preview = df.head(2).to_json(orient="records")
-        store.register_on_chain(root_cid, car_size, deal_id, title, desc, price, preview)
+        preview = preview_json(df, self.output_format, merkle_root=merkle_root)
+        self._step("register", store.register_on_chain,
+                   root_cid, car_size, deal_id, title, desc, price, preview)
         print(f"✅ Pipeline done: rootCID={root_cid}, deal={deal_id}")
 
+    def _publish_scores(self, deletion_scores):
+        from analytics import coin_aggregates
         # --- Aggregated overall score → FTSO push ---
         avg = sum(deletion_scores) / len(deletion_scores) if deletion_scores else 0.0
         norm = int(avg * 100)
         print(f"Normalized aggregated tweet deletion-likelihood score: {norm}")
-        tx = push_aggregated_score(norm)
-        print(f"Pushed aggregated score {norm}, tx hash {tx}")
+        feeds_job = None
+        if self.publish:
+            import rpc
+            from ftso_price import fetch_all_feeds_async
+            from ftso_push import publish_score
+            # the price-feed read overlaps with the score push and aggregation
+            feeds_job = rpc.submit(fetch_all_feeds_async())
+            tx = self._step("ftso_push", publish_score, norm, feed=self.feed, address=self.ftso_address)
+            if tx:
+                print(f"Pushed aggregated score {norm}, tx hash {tx}")
+            else:
+                print(f"Score {norm} within deviation of the last push; not sent")
 
         # ------------- Multi-coin grouping & output ----------------
         import csv
         ts_run = datetime.utcnow().isoformat() + "Z"
-        pairs = list(zip(self.data, deletion_scores))
-        groups = {}
-        for td, sc in pairs:
-            coin = identify_coin([td[4]])
-            groups.setdefault(coin, []).append((td, sc))
-
-        for coin, items in groups.items():
-            # sentiment
-            scores = [s for (_td, s) in items]
-            avg_sc = sum(scores) / len(scores) if scores else 0.0
-            norm_sc = int(avg_sc * 100)
+        frame = self.data.to_frame(all_fields=True)
+        frame["score"] = deletion_scores
+        frame["coin"] = [self.coins[i] for i in range(len(self.data))]
+        frame["cluster"] = self._cluster_ids()
+        # sentiment, strength = (# tweets) * (sum followers), engagement, score buckets
+        per_coin = coin_aggregates(frame)
+        logging.info("Per-coin aggregates:\n" + per_coin.to_string())
+        if not self.publish:
+            print("Dry run: per-coin aggregates\n" + per_coin.to_string())
+            return
+        # one feed read serves every coin in this run
+        pending = [c for c in per_coin.index if f"final:{c}" not in self.completed]
+        feeds = feeds_job.result() if pending else {}
+        for coin in pending:
+            norm_sc = int(per_coin.at[coin, "norm_score"])
+            strength = int(per_coin.at[coin, "strength"])
             # price
-            try:
-                price_ftso, ts_ftso = get_price_for(coin)
-            except KeyError:
+            if coin not in feeds:
                 print(f"⚠️ {coin} not in feed; skipping")
                 continue
-            # strength = (# tweets) * (sum followers)
-            num = len(items)
-            total_followers = sum(int(td[17]) if td[17].isdigit() else 0 for (td, _s) in items)
-            strength = num * total_followers
+            price_ftso, ts_ftso = feeds[coin]
             # write CSV
             fname = f"./FINAL_{coin}.csv"
             need_hdr = not os.path.exists(fname)
@@ -488,6 +721,7 @@ class Twitter_Scraper:
                 if need_hdr:
                     w.writerow(["timestamp", "score", "price", "strength"])
                 w.writerow([ts_run, norm_sc, price_ftso, strength])
+            self._mark_step(f"final:{coin}", [ts_run, norm_sc, price_ftso, strength])
             print(f"→ Wrote {coin}: {ts_run}, {norm_sc}, {price_ftso}, {strength}")
         # -------------------------------------------------------------
 